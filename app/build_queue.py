@@ -0,0 +1,123 @@
+"""Postgres-backed queue of book builds.
+
+The web routes only insert a build_job row and return its id; build workers
+(build_worker.py) claim queued jobs, run them and record the result.  Any
+number of app nodes can run workers against the same database: at most
+config.BUILD_CONCURRENCY jobs run at once across all of them, and at most
+one of each type, since builds of one type write the same files.
+"""
+from sqlalchemy import text
+
+import config
+from models import db, BuildJob
+
+# Script run for each job type
+JOB_SCRIPTS = {
+    'book': 'generate_book.py',
+    'pdf': 'generate_pdf.py',
+}
+
+# Output kept per job; the tail is where errors are
+MAX_OUTPUT_CHARS = 20000
+
+
+def enqueue_build(job_type):
+    """Queue a build and return its BuildJob.
+
+    Requests coalesce: while a build of this type is still waiting, new
+    requests return that job instead of queueing another, so clicks made
+    during a running build lead to at most one follow-up build.
+    """
+    if job_type not in JOB_SCRIPTS:
+        raise ValueError(f"Unknown build type: {job_type}")
+    # Retry if the waiting job is claimed between the insert and the lookup
+    for _ in range(3):
+        row = db.session.execute(text("""
+            INSERT INTO scm_terran_society.build_job (job_type) VALUES (:job_type)
+            ON CONFLICT (job_type) WHERE status = 'queued' DO NOTHING
+            RETURNING job_id
+        """), {'job_type': job_type}).first()
+        if row is None:
+            row = db.session.execute(text("""
+                SELECT job_id FROM scm_terran_society.build_job
+                 WHERE job_type = :job_type AND status = 'queued'
+            """), {'job_type': job_type}).first()
+        db.session.commit()
+        if row is not None:
+            return db.session.get(BuildJob, row.job_id)
+    raise RuntimeError(f"Could not queue a {job_type} build")
+
+
+def claim_job(worker, limit=None):
+    """Claim the oldest queued job for worker, or return None.
+
+    Returns (job_id, job_type).  A job waits while another of its type runs.
+    Running jobs whose worker stopped sending heartbeats are failed first
+    and their build queued again.  The advisory lock makes the "fewer than
+    limit running" check and the claim one step across all nodes; SKIP
+    LOCKED keeps a claim from waiting on rows another transaction holds.
+    """
+    limit = config.BUILD_CONCURRENCY if limit is None else limit
+    try:
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext('ts_book_build_queue'))"))
+        lost = db.session.execute(text("""
+            UPDATE scm_terran_society.build_job
+               SET status = 'failed', output = 'Build worker stopped responding', finished_at = now()
+             WHERE status = 'running'
+               AND heartbeat_at < now() - make_interval(secs => :stale)
+            RETURNING job_type
+        """), {'stale': config.BUILD_HEARTBEAT_TIMEOUT}).scalars().all()
+        for job_type in set(lost):
+            db.session.execute(text("""
+                INSERT INTO scm_terran_society.build_job (job_type) VALUES (:job_type)
+                ON CONFLICT (job_type) WHERE status = 'queued' DO NOTHING
+            """), {'job_type': job_type})
+        running = db.session.execute(text(
+            "SELECT count(*) FROM scm_terran_society.build_job WHERE status = 'running'"
+        )).scalar()
+        if running >= limit:
+            db.session.commit()
+            return None
+        row = db.session.execute(text("""
+            UPDATE scm_terran_society.build_job
+               SET status = 'running', worker = :worker, started_at = now(), heartbeat_at = now()
+             WHERE job_id = (
+                   SELECT job_id FROM scm_terran_society.build_job
+                    WHERE status = 'queued'
+                      AND job_type NOT IN (SELECT job_type FROM scm_terran_society.build_job
+                                            WHERE status = 'running')
+                    ORDER BY job_id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1)
+            RETURNING job_id, job_type
+        """), {'worker': worker}).first()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return (row.job_id, row.job_type) if row else None
+
+
+def heartbeat(job_id, worker):
+    """Mark a running job as still alive."""
+    db.session.execute(text("""
+        UPDATE scm_terran_society.build_job SET heartbeat_at = now()
+         WHERE job_id = :job_id AND worker = :worker AND status = 'running'
+    """), {'job_id': job_id, 'worker': worker})
+    db.session.commit()
+
+
+def finish_job(job_id, worker, returncode, output):
+    """Record a job's exit status and output."""
+    db.session.execute(text("""
+        UPDATE scm_terran_society.build_job
+           SET status = :status, returncode = :returncode, output = :output, finished_at = now()
+         WHERE job_id = :job_id AND worker = :worker
+    """), {
+        'status': 'succeeded' if returncode == 0 else 'failed',
+        'returncode': returncode,
+        'output': output[-MAX_OUTPUT_CHARS:],
+        'job_id': job_id,
+        'worker': worker,
+    })
+    db.session.commit()
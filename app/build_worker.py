@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Build worker: runs the book builds queued by the web app.
+
+Each thread claims one job at a time from scm_terran_society.build_job,
+runs its script (on the warm render worker when it is up, see
+render_client.py) and records the result.  Start one per app node:
+
+    python3 app/build_worker.py [--threads N]
+
+--threads bounds this node; config.BUILD_CONCURRENCY (TS_BOOK_BUILD_CONCURRENCY)
+bounds the running jobs across all nodes.
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+from tsbook import app
+from build_queue import JOB_SCRIPTS, claim_job, finish_job, heartbeat
+from render_client import run_script
+import config
+
+
+def keep_alive(job_id, worker, done):
+    """Refresh the job's heartbeat until done is set."""
+    with app.app_context():
+        while not done.wait(config.BUILD_HEARTBEAT_INTERVAL):
+            try:
+                heartbeat(job_id, worker)
+            except Exception as e:
+                print(f"[{worker}] heartbeat for job {job_id} failed: {e}")
+
+
+def run_job(job_id, job_type, worker):
+    done = threading.Event()
+    beat = threading.Thread(target=keep_alive, args=(job_id, worker, done), daemon=True)
+    beat.start()
+    start = time.time()
+    try:
+        # Progress events from the script are stored against this job
+        result = run_script(JOB_SCRIPTS[job_type], env={'TS_BOOK_JOB_ID': str(job_id)})
+        returncode, output = result.returncode, (result.stdout or '') + (result.stderr or '')
+    except Exception as e:
+        returncode, output = 1, f"Error running build: {e}"
+    finally:
+        done.set()
+        beat.join()
+    finish_job(job_id, worker, returncode, output)
+    status = 'succeeded' if returncode == 0 else f'failed ({returncode})'
+    print(f"[{worker}] job {job_id} ({job_type}) {status} in {time.time() - start:.1f}s")
+
+
+def work(worker, stop):
+    """Claim and run jobs until stop is set."""
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                job = claim_job(worker)
+            except Exception as e:
+                print(f"[{worker}] could not claim a job: {e}")
+                job = None
+            if job is None:
+                stop.wait(config.BUILD_POLL_INTERVAL)
+                continue
+            run_job(*job, worker)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run queued book builds.')
+    parser.add_argument('--threads', type=int, default=1, metavar='N',
+                        help='jobs this node runs at once (default: 1)')
+    args = parser.parse_args(argv)
+
+    stop = threading.Event()
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [threading.Thread(target=work, args=(f"{host}/{i}", stop)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    print(f"Build worker {host} running {args.threads} thread(s), "
+          f"at most {config.BUILD_CONCURRENCY} job(s) across all nodes")
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping after the running jobs finish...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
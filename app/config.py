@@ -5,10 +5,11 @@ from pathlib import Path
 # Base directory
 BASE_DIR = Path(__file__).parent.parent
 
-# Database configuration
+# Database configuration (TS_BOOK_DATABASE selects another database, e.g. a
+# synthetic one from scripts/synthetic_data.py for benchmarks and load tests)
 DATABASE_CONFIG = {
     'host': 'localhost',
-    'database': 'db_terran_society',
+    'database': os.environ.get('TS_BOOK_DATABASE', 'db_terran_society'),
     'user': 'rock',
     'password': 'river'
 }
@@ -22,6 +23,33 @@ SQLALCHEMY_TRACK_MODIFICATIONS = False
 BOOK_OUTPUT_DIR = BASE_DIR / 'book'
 SCRIPTS_DIR = BASE_DIR / 'scripts'
 GENERATE_SCRIPT = SCRIPTS_DIR / 'generate_book.py'
+# Unix socket of the warm render worker (scripts/render_worker.py)
+RENDER_WORKER_SOCKET = BOOK_OUTPUT_DIR / '.render_worker.sock'
+
+# Build queue (build_worker.py): jobs running at once across all app nodes,
+# and how often workers poll for jobs and report that a job is still alive
+BUILD_CONCURRENCY = int(os.environ.get('TS_BOOK_BUILD_CONCURRENCY', 2))
+BUILD_POLL_INTERVAL = 2
+BUILD_HEARTBEAT_INTERVAL = 15
+BUILD_HEARTBEAT_TIMEOUT = 120
+# Seconds between checks for new progress events on an open SSE stream
+BUILD_EVENTS_POLL_INTERVAL = 1
+# Seconds one SSE response may stay open before the browser is told to
+# reconnect (keeps slow builds from pinning a gunicorn thread), and the
+# reconnect delay in milliseconds
+BUILD_EVENTS_STREAM_SECONDS = 20
+BUILD_EVENTS_RETRY_MS = 1000
+# Generated documents shown in the dashboard's build time trend
+BUILD_HISTORY_LIMIT = 15
+
+# Rows per page of the roles and institutions lists (more load as you scroll)
+LIST_PAGE_SIZE = 50
+# Tier, branch and institution dropdown options (reference_cache.py): seconds
+# a list is reused at most, seconds between checks of the shared change
+# counters, and the longest list that is cached at all
+REFERENCE_CACHE_TTL = int(os.environ.get('TS_BOOK_REFERENCE_CACHE_TTL', 300))
+REFERENCE_CACHE_CHECK_SECONDS = 2
+REFERENCE_CACHE_MAX_ROWS = 10000
 
 # Book metadata
 BOOK_TITLE = "Terran Society: A New Social Contract"
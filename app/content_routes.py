@@ -5,6 +5,7 @@ from models import db, ContentBlock, MediaAsset, EntityContent
 import os
 from datetime import datetime
 import config
+from loading_profiles import ENTITY_CONTENT
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'pdf', 'doc', 'docx'}
 UPLOAD_FOLDER = 'static/uploads'
@@ -13,8 +14,8 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def get_entity_content(entity_type, entity_id):
-    """Get all content blocks for an entity."""
-    links = EntityContent.query.filter_by(
+    """Get all content blocks for an entity, in one query."""
+    links = EntityContent.query.options(*ENTITY_CONTENT).filter_by(
         entity_type=entity_type,
         entity_id=entity_id
     ).order_by(EntityContent.section_name, EntityContent.sort_order).all()
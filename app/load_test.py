@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the web app.
+
+Starts the app (gunicorn when installed, as in production, otherwise the
+threaded Werkzeug server) against the database named by TS_BOOK_DATABASE,
+optionally filling it first with scripts/synthetic_data.py, then drives it
+with --clients concurrent clients for --duration seconds.  Each client
+picks requests from MIX: the dashboard, list and detail pages, and the
+HTMX duty create/edit/delete calls the role page makes.  Clients only
+edit and delete the duties they created, and delete them at the end.
+
+Reports requests, errors, p50/p95/p99 latency and requests per second for
+each route, and writes them as JSON with --output:
+
+    TS_BOOK_DATABASE=db_terran_society_bench python3 app/load_test.py --scale medium --clients 32
+
+Pass --url to test a server that is already running instead.
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent
+SCRIPTS_DIR = APP_DIR.parent / 'scripts'
+
+# (route, weight): how often each kind of request is made
+MIX = (
+    ('GET /', 10),
+    ('GET /roles', 10),
+    ('GET /roles?institution=<id>', 10),
+    ('GET /institutions', 10),
+    ('GET /institutions/<id>', 15),
+    ('GET /roles/<id>', 15),
+    ('GET /tiers/<id>', 5),
+    ('GET /roles/new', 5),
+    ('POST /duties/new', 10),
+    ('PUT /duties/<id>/edit', 5),
+    ('DELETE /duties/<id>/delete', 5),
+)
+
+# Duties a client keeps before it deletes instead of creating
+MAX_OWN_DUTIES = 5
+
+DUTY_ID = re.compile(r'id="duty-(\d+)"')
+
+
+def target_ids():
+    """Ids of the rows requests are made against, read through the app's models."""
+    from tsbook import app
+    from models import Institution, Role, Tier
+
+    with app.app_context():
+        return {
+            'institution': [i for (i,) in Institution.query.with_entities(Institution.institution_id)],
+            'role': [r for (r,) in Role.query.with_entities(Role.role_id)],
+            'tier': [t for (t,) in Tier.query.with_entities(Tier.tier_id)],
+        }
+
+
+class Client:
+    """One simulated user on its own keep-alive connection."""
+
+    def __init__(self, base_url, ids, seed):
+        url = urllib.parse.urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.conn = None
+        self.ids = ids
+        self.rng = random.Random(seed)
+        self.duties = []
+
+    def request(self, method, path, form=None, htmx=False):
+        headers = {}
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if htmx:
+            headers['HX-Request'] = 'true'
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                return response.status, response.read().decode('utf-8', 'replace')
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the keep-alive connection; retry on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+    def pick(self):
+        routes, weights = zip(*MIX)
+        route = self.rng.choices(routes, weights)[0]
+        if route.startswith(('PUT', 'DELETE')) and not self.duties:
+            route = 'POST /duties/new'
+        if route == 'POST /duties/new' and len(self.duties) >= MAX_OWN_DUTIES:
+            route = 'DELETE /duties/<id>/delete'
+        return route
+
+    def run(self, route):
+        """Make one request for route; returns True on success."""
+        choice = self.rng.choice
+        if route == 'GET /roles?institution=<id>':
+            status, _ = self.request('GET', f"/roles?institution={choice(self.ids['institution'])}")
+        elif route.startswith('GET') and '<id>' in route:
+            table = route.split('/')[1][:-1]  # 'GET /roles/<id>' -> 'role'
+            status, _ = self.request('GET', route[4:].replace('<id>', str(choice(self.ids[table]))))
+        elif route.startswith('GET'):
+            status, _ = self.request('GET', route[4:])
+        elif route == 'POST /duties/new':
+            status, body = self.request('POST', '/duties/new', htmx=True, form={
+                'role_id': choice(self.ids['role']), 'duty_header': 'Load test duty',
+                'duty_desc': 'Created by app/load_test.py', 'sort_order': 99})
+            match = DUTY_ID.search(body)
+            if status == 200 and match:
+                self.duties.append(int(match.group(1)))
+        elif route == 'PUT /duties/<id>/edit':
+            status, _ = self.request('PUT', f'/duties/{choice(self.duties)}/edit', htmx=True, form={
+                'duty_header': 'Load test duty (edited)', 'duty_desc': 'Edited by app/load_test.py'})
+        else:
+            duty_id = self.duties.pop(self.rng.randrange(len(self.duties)))
+            status, _ = self.request('DELETE', f'/duties/{duty_id}/delete', htmx=True)
+        return status < 400
+
+    def clean_up(self):
+        for duty_id in self.duties:
+            self.request('DELETE', f'/duties/{duty_id}/delete', htmx=True)
+        self.duties = []
+
+
+def drive(client, deadline, warmup_until, samples, lock):
+    while time.perf_counter() < deadline:
+        route = client.pick()
+        start = time.perf_counter()
+        try:
+            ok = client.run(route)
+        except Exception:
+            ok = False
+        end = time.perf_counter()
+        if start >= warmup_until:
+            with lock:
+                samples.setdefault(route, []).append((end - start, ok))
+    client.clean_up()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def summarise(samples, seconds):
+    report = {}
+    everything = []
+    for route, _ in MIX:
+        results = samples.get(route, [])
+        if not results:
+            continue
+        latencies = sorted(latency for latency, _ in results)
+        everything.extend(latencies)
+        report[route] = stats(latencies, sum(1 for _, ok in results if not ok), seconds)
+    if everything:
+        report['all'] = stats(sorted(everything), sum(r['errors'] for r in report.values()), seconds)
+    return report
+
+
+def stats(latencies, errors, seconds):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'rps': round(len(latencies) / seconds, 1),
+    }
+
+
+def start_server(port, workers):
+    """Start the app on port; returns the process."""
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', '4',
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'tsbook:app']
+    except ImportError:
+        print("gunicorn not installed - using the threaded Werkzeug server")
+        cmd = [sys.executable, str(Path(__file__).resolve()), '--serve', str(port)]
+    return subprocess.Popen(cmd, cwd=str(APP_DIR))
+
+
+def wait_until_up(base_url, process, timeout=30):
+    url = urllib.parse.urlsplit(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("the app exited while starting")
+        try:
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+            conn.request('GET', '/')
+            if conn.getresponse().status < 500:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"the app did not come up on {base_url}")
+
+
+def serve(port):
+    """Run the app on the threaded Werkzeug server (used when gunicorn is missing)."""
+    from werkzeug.serving import make_server
+    from tsbook import app
+
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the web app.')
+    parser.add_argument('--url', help='test this running server instead of starting one')
+    parser.add_argument('--port', type=int, default=5055, help='port for the started app (default: 5055)')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers (default: 4)')
+    parser.add_argument('--scale', help='fill the database with synthetic_data.py at this scale first')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for data and clients (default: 1)')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients (default: 16)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to measure (default: 30)')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds before measuring (default: 5)')
+    parser.add_argument('--output', type=Path, help='write the report as JSON')
+    parser.add_argument('--serve', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve:
+        serve(args.serve)
+        return 0
+
+    if args.scale:
+        result = subprocess.run([sys.executable, str(SCRIPTS_DIR / 'synthetic_data.py'),
+                                 '--scale', args.scale, '--seed', str(args.seed), '--replace'])
+        if result.returncode != 0:
+            return result.returncode
+
+    process = None
+    base_url = args.url or f'http://127.0.0.1:{args.port}'
+    if not args.url:
+        process = start_server(args.port, args.workers)
+    try:
+        wait_until_up(base_url, process)
+        ids = target_ids()
+        if not all(ids.values()):
+            print("Error: the database needs tiers, institutions and roles (try --scale small)")
+            return 1
+
+        samples = {}
+        lock = threading.Lock()
+        now = time.perf_counter()
+        warmup_until = now + args.warmup
+        deadline = warmup_until + args.duration
+        clients = [Client(base_url, ids, args.seed * 1000 + i) for i in range(args.clients)]
+        threads = [threading.Thread(target=drive, args=(client, deadline, warmup_until, samples, lock))
+                   for client in clients]
+        print(f"{args.clients} clients against {base_url} for {args.warmup:.0f}s warm-up "
+              f"+ {args.duration:.0f}s...")
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = summarise(samples, args.duration)
+    print(f"\n{'route':<30} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for route, row in report.items():
+        print(f"{route:<30} {row['requests']:>9} {row['errors']:>7} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['rps']:>8.1f}")
+    if args.output:
+        args.output.write_text(json.dumps({'clients': args.clients, 'duration': args.duration,
+                                           'routes': report}, indent=2), encoding='utf-8')
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Loading profiles for the list and detail pages.
+
+Each profile names every relationship its template touches, loaded with
+joinedload (many-to-one) or selectinload (collections; one extra query
+each), so a page costs the same few queries however many roles, duties
+or institutions it shows.  test_query_counts.py checks the counts.
+
+Templates read child counts from the trigger-maintained counter columns
+(role.duty_count, institution.role_count), so collections that are only
+counted are not loaded at all.
+
+List profiles go the other way: they load only the columns the list
+templates render, leaving descriptions and headers to the detail pages.
+(Form dropdowns read (id, name) rows from reference_cache.py.)
+"""
+from sqlalchemy.orm import contains_eager, joinedload, load_only, selectinload
+
+from models import Branch, ContentBlock, EntityContent, Institution, Role, Tier
+
+TIER_DETAIL = (
+    selectinload(Tier.tier_explains),
+    selectinload(Tier.institutions).joinedload(Institution.branch),
+)
+
+BRANCH_DETAIL = (
+    selectinload(Branch.institutions).joinedload(Institution.tier),
+)
+
+INSTITUTION_DETAIL = (
+    joinedload(Institution.tier),
+    joinedload(Institution.branch),
+    selectinload(Institution.institution_explains),
+    selectinload(Institution.roles),
+)
+
+ROLE_DETAIL = (
+    joinedload(Role.institution).joinedload(Institution.tier),
+    joinedload(Role.institution).joinedload(Institution.branch),
+    selectinload(Role.duties),
+    selectinload(Role.role_explains),
+)
+
+# Content blocks linked to an entity, with their media assets
+ENTITY_CONTENT = (
+    joinedload(EntityContent.content_block).joinedload(ContentBlock.asset),
+)
+
+# Rows of the roles table and the dashboard's recent roles
+_ROLE_SUMMARY = load_only(Role.role_id, Role.role_name, Role.institution_id, Role.sort_order,
+                          Role.duty_count, Role.modified_at)
+_INSTITUTION_NAME = (Institution.institution_id, Institution.institution_name)
+
+# Roles list; the query joins Institution for sorting, so the row takes it from the join
+ROLE_LIST = (
+    _ROLE_SUMMARY,
+    contains_eager(Role.institution).load_only(*_INSTITUTION_NAME),
+)
+
+RECENT_ROLES = (
+    _ROLE_SUMMARY,
+    joinedload(Role.institution).load_only(*_INSTITUTION_NAME),
+)
+
+# Institution cards: the description is shown truncated, the header not at all
+INSTITUTION_LIST = (
+    load_only(Institution.institution_id, Institution.institution_name, Institution.institution_desc,
+              Institution.tier_id, Institution.branch_id, Institution.sort_order, Institution.role_count),
+    joinedload(Institution.tier).load_only(Tier.tier_id, Tier.tier_name),
+    joinedload(Institution.branch).load_only(Branch.branch_id, Branch.branch_name),
+)
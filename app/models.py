@@ -1,5 +1,6 @@
 """SQLAlchemy models for Terran Society database."""
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -11,6 +12,9 @@ class Tier(db.Model):
     tier_id = db.Column(db.Integer, primary_key=True)
     tier_name = db.Column(db.String(50), nullable=False, unique=True)
     sort_order = db.Column(db.Integer)
+    # Kept by database triggers (scripts/add_child_counters.sql)
+    institution_count = db.Column(db.Integer, nullable=False, server_default='0')
+    explain_count = db.Column(db.Integer, nullable=False, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -27,6 +31,8 @@ class Branch(db.Model):
     branch_header = db.Column(db.String(100))
     branch_desc = db.Column(db.Text)
     sort_order = db.Column(db.Integer)
+    # Kept by database triggers (scripts/add_child_counters.sql)
+    institution_count = db.Column(db.Integer, nullable=False, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -44,6 +50,9 @@ class Institution(db.Model):
     tier_id = db.Column(db.Integer, db.ForeignKey('scm_terran_society.tier.tier_id'), nullable=False)
     branch_id = db.Column(db.Integer, db.ForeignKey('scm_terran_society.branch.branch_id'))
     sort_order = db.Column(db.Integer)
+    # Kept by database triggers (scripts/add_child_counters.sql)
+    role_count = db.Column(db.Integer, nullable=False, server_default='0')
+    explain_count = db.Column(db.Integer, nullable=False, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -62,6 +71,9 @@ class Role(db.Model):
     role_desc = db.Column(db.Text)
     institution_id = db.Column(db.Integer, db.ForeignKey('scm_terran_society.institution.institution_id'), nullable=False)
     sort_order = db.Column(db.Integer)
+    # Kept by database triggers (scripts/add_child_counters.sql)
+    duty_count = db.Column(db.Integer, nullable=False, server_default='0')
+    explain_count = db.Column(db.Integer, nullable=False, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -142,6 +154,29 @@ class Process(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class DashboardStats(db.Model):
+    """Table totals for the dashboard; one row, kept by database triggers."""
+    __tablename__ = 'dashboard_stats'
+    __table_args__ = {'schema': 'scm_terran_society'}
+
+    stats_id = db.Column(db.Integer, primary_key=True)
+    tiers = db.Column(db.Integer, nullable=False, server_default='0')
+    branches = db.Column(db.Integer, nullable=False, server_default='0')
+    institutions = db.Column(db.Integer, nullable=False, server_default='0')
+    roles = db.Column(db.Integer, nullable=False, server_default='0')
+    duties = db.Column(db.Integer, nullable=False, server_default='0')
+    processes = db.Column(db.Integer, nullable=False, server_default='0')
+
+class ReferenceVersion(db.Model):
+    """Change counters of the cached dropdown lists; one row, kept by database triggers."""
+    __tablename__ = 'reference_version'
+    __table_args__ = {'schema': 'scm_terran_society'}
+
+    version_id = db.Column(db.Integer, primary_key=True)
+    tiers = db.Column(db.BigInteger, nullable=False, server_default='0')
+    branches = db.Column(db.BigInteger, nullable=False, server_default='0')
+    institutions = db.Column(db.BigInteger, nullable=False, server_default='0')
+
 class MediaAsset(db.Model):
     __tablename__ = 'media_asset'
     __table_args__ = {'schema': 'scm_terran_society'}
@@ -223,3 +258,64 @@ class BookAuthor(db.Model):
     sort_order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     modified_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class BuildJob(db.Model):
+    __tablename__ = 'build_job'
+    __table_args__ = {'schema': 'scm_terran_society'}
+    
+    job_id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Text, nullable=False, default='queued')
+    worker = db.Column(db.Text)
+    returncode = db.Column(db.Integer)
+    output = db.Column(db.Text)
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+class BuildJobEvent(db.Model):
+    __tablename__ = 'build_job_event'
+    __table_args__ = {'schema': 'scm_terran_society'}
+    
+    event_id = db.Column(db.BigInteger, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('scm_terran_society.build_job.job_id'), nullable=False)
+    event = db.Column(db.Text, nullable=False)
+    payload = db.Column(JSONB, nullable=False, default=dict)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class GeneratedDocument(db.Model):
+    __tablename__ = 'generated_document'
+    __table_args__ = {'schema': 'scm_terran_society'}
+    
+    doc_id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, nullable=False)
+    format = db.Column(db.Text, nullable=False)
+    file_path = db.Column(db.Text)
+    file_size = db.Column(db.BigInteger)
+    checksum = db.Column(db.Text)
+    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    generated_by = db.Column(db.Text)
+    metadata_ = db.Column('metadata', JSONB)
+    input_hash = db.Column(db.Text)
+    wall_seconds = db.Column(db.Numeric(10, 3))
+    cpu_seconds = db.Column(db.Numeric(10, 3))
+    peak_rss_mb = db.Column(db.Numeric(10, 1))
+    stage_timings = db.Column(JSONB)
+    job_id = db.Column(db.Integer)
+    
+    # Stages that do not overlap, in build order; glossary_links runs inside postprocess
+    TREND_STAGES = ('db_load', 'render', 'assemble', 'pandoc_ast', 'pandoc',
+                    'glossary_links', 'postprocess', 'weasyprint')
+    
+    def stage_walls(self):
+        """[(stage, wall seconds)] with postprocess excluding its glossary linking."""
+        timings = self.stage_timings or {}
+        walls = {name: timing.get('wall', 0) for name, timing in timings.items()}
+        if 'postprocess' in walls:
+            walls['postprocess'] = max(walls['postprocess'] - walls.get('glossary_links', 0), 0)
+        return [(name, walls[name]) for name in self.TREND_STAGES if walls.get(name)]
@@ -0,0 +1,56 @@
+"""Keyset (seek) pagination for the list pages.
+
+A page is the rows that sort after the last row of the previous page,
+found with a row comparison on the sort keys instead of OFFSET, so a
+page deep into the list costs the same as the first.  The cursor passed
+between pages is that last row's sort key, encoded for the URL.
+"""
+import base64
+import json
+
+from flask import abort
+from sqlalchemy import func, tuple_
+
+# Stands in for NULL sort orders, which PostgreSQL sorts last
+NULLS_LAST = 2 ** 31 - 1
+
+
+def sort_key(column):
+    """column with NULLs replaced so it can take part in a row comparison."""
+    return func.coalesce(column, NULLS_LAST)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    """Sort key values from a cursor; aborts with 400 on a malformed one.
+
+    Each value must have the Python type of its key (str for a name, int
+    for a sort order or id), so a tampered cursor never reaches the row
+    comparison in SQL.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        abort(400)
+    if not isinstance(values, list) or len(values) != len(keys):
+        abort(400)
+    for value, key in zip(values, keys):
+        if isinstance(value, bool) or not isinstance(value, key.type.python_type):
+            abort(400)
+    return values
+
+
+def keyset_page(query, keys, cursor, size):
+    """(rows, next cursor or None) for the page of query after cursor.
+
+    keys are the sort key expressions, the last of them unique (the primary
+    key) so no two rows tie; query must select a single model.
+    """
+    if cursor:
+        query = query.filter(tuple_(*keys) > tuple_(*decode_cursor(cursor, keys)))
+    rows = query.add_columns(*keys).order_by(*keys).limit(size + 1).all()
+    next_cursor = encode_cursor(list(rows[size - 1][1:])) if len(rows) > size else None
+    return [row[0] for row in rows[:size]], next_cursor
@@ -0,0 +1,115 @@
+"""In-process cache of the tier, branch and institution dropdown options.
+
+Forms and list filters show every tier, branch and institution as a
+<select>; those tables change rarely, so their (id, name) rows are kept
+here for at most REFERENCE_CACHE_TTL seconds instead of being queried on
+every render.  Changes made by any process (another gunicorn worker,
+scripts/synthetic_data.py) bump a per-list counter in the single
+reference_version row (scripts/add_reference_version.sql); that row is
+read by primary key at most every REFERENCE_CACHE_CHECK_SECONDS, and a
+list whose counter moved is reloaded.  A commit through the app's own
+session drops the matching list at once (SQLAlchemy session events).
+Lists longer than REFERENCE_CACHE_MAX_ROWS are not cached.
+
+Cached rows are plain SQLAlchemy Row tuples with attribute access
+(tier.tier_id, tier.tier_name), safe to share between requests.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import config
+from models import Branch, Institution, ReferenceVersion, Tier, db
+
+# List name -> (model, columns, sort order)
+LISTS = {
+    'tiers': (Tier, (Tier.tier_id, Tier.tier_name), Tier.sort_order),
+    'branches': (Branch, (Branch.branch_id, Branch.branch_name), Branch.sort_order),
+    'institutions': (Institution, (Institution.institution_id, Institution.institution_name),
+                     Institution.institution_name),
+}
+LIST_OF_MODEL = {model: name for name, (model, _, _) in LISTS.items()}
+
+_entries = {}  # list name -> (expires at, version, rows)
+_versions = {'checked_until': 0, 'lists': {}}  # last read of reference_version
+_lock = threading.Lock()
+
+
+def _list_versions():
+    """List name -> change counter, re-read at most every REFERENCE_CACHE_CHECK_SECONDS."""
+    now = time.monotonic()
+    with _lock:
+        if _versions['checked_until'] > now:
+            return _versions['lists']
+    row = (db.session.query(*(getattr(ReferenceVersion, name) for name in LISTS))
+           .filter(ReferenceVersion.version_id == 1).first())
+    lists = dict(zip(LISTS, row)) if row else {}
+    with _lock:
+        _versions.update(checked_until=now + config.REFERENCE_CACHE_CHECK_SECONDS, lists=lists)
+    return lists
+
+
+def options(name):
+    """Rows of list name, from the cache while fresh and unchanged."""
+    now = time.monotonic()
+    version = _list_versions().get(name)
+    with _lock:
+        entry = _entries.get(name)
+    if entry and entry[0] > now and entry[1] == version:
+        return entry[2]
+    _, columns, order = LISTS[name]
+    rows = db.session.query(*columns).order_by(order).all()
+    if len(rows) <= config.REFERENCE_CACHE_MAX_ROWS:
+        with _lock:
+            _entries[name] = (now + config.REFERENCE_CACHE_TTL, version, rows)
+    return rows
+
+
+def invalidate(*names):
+    """Drop the named lists, or every list when none are named.
+
+    The change counters are re-read on the next lookup, so the reloaded
+    list is stored against the version the commit produced.
+    """
+    with _lock:
+        for name in names or list(_entries):
+            _entries.pop(name, None)
+        _versions['checked_until'] = 0
+
+
+def warm(app):
+    """Load every list at startup; a database that is not reachable yet is skipped."""
+    with app.app_context():
+        try:
+            for name in LISTS:
+                options(name)
+        except SQLAlchemyError as e:
+            print(f"Reference cache not warmed: {e}")
+        finally:
+            db.session.remove()
+
+
+def _changed_lists(session):
+    return {LIST_OF_MODEL[type(obj)]
+            for obj in (*session.new, *session.dirty, *session.deleted)
+            if type(obj) in LIST_OF_MODEL}
+
+
+def register_invalidation():
+    """Drop cached lists when a session commits changes to their tables."""
+    @event.listens_for(Session, 'after_flush')
+    def note_changes(session, flush_context):
+        session.info.setdefault('reference_lists', set()).update(_changed_lists(session))
+
+    @event.listens_for(Session, 'after_commit')
+    def drop_changed(session):
+        changed = session.info.pop('reference_lists', None)
+        if changed:
+            invalidate(*changed)
+
+    @event.listens_for(Session, 'after_soft_rollback')
+    def forget_changes(session, previous_transaction):
+        session.info.pop('reference_lists', None)
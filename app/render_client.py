@@ -0,0 +1,52 @@
+"""Run book build scripts on the warm render worker, or in a subprocess if it is not running."""
+import json
+import os
+import socket
+import subprocess
+
+import config
+
+# Seconds to wait for the worker to accept a job before running it in a subprocess
+CONNECT_TIMEOUT = 2
+
+
+def run_script(script, args=(), env=None):
+    """Run scripts/<script> with args and return a subprocess.CompletedProcess.
+
+    The job goes to scripts/render_worker.py over its Unix socket when the
+    worker is up; otherwise the script runs in a fresh python3 process.
+    A worker that goes away mid-job fails the job rather than running it
+    again, since it may already have written some of its output.
+    """
+    args = [str(arg) for arg in args]
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(config.RENDER_WORKER_SOCKET))
+    except OSError:
+        sock.close()
+        # No worker
+        return subprocess.run(
+            ['python3', str(config.SCRIPTS_DIR / script), *args],
+            capture_output=True,
+            text=True,
+            cwd=str(config.BASE_DIR),
+            env=None if env is None else {**os.environ, **env},
+        )
+
+    try:
+        sock.settimeout(None)
+        with sock.makefile('rwb') as stream:
+            job = {'script': script, 'args': args, 'env': env or {}}
+            stream.write(json.dumps(job).encode('utf-8') + b'\n')
+            stream.flush()
+            line = stream.readline()
+        if not line:
+            raise ConnectionResetError('connection closed before the job finished')
+        reply = json.loads(line)
+        return subprocess.CompletedProcess(
+            [script, *args], reply['returncode'], reply['stdout'], reply['stderr'])
+    except (OSError, ValueError, KeyError) as e:
+        return subprocess.CompletedProcess([script, *args], 1, '', f"Render worker failed during the job: {e}")
+    finally:
+        sock.close()
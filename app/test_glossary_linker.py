@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Check the glossary term linking rules of scripts/glossary_linker.py.
+
+Each case links a small HTML body against a term list and compares the
+links that come out: word boundaries, longest match, earliest of equal
+matches, one link per text node, and nothing inside existing links,
+headings, the TOC or the glossary itself.
+
+    python3 app/test_glossary_linker.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from glossary_linker import GlossaryLinker, glossary_anchor, link_glossary_terms  # noqa: E402
+from html_postprocess import parse_html  # noqa: E402
+
+TERMS = ['Elder', 'Judge', 'Council', 'Council of Elders', 'Fair Witness', 'Witness', 'Sheriff', 'Rights']
+
+# (description, body HTML, linked text of every link added, in document order)
+CASES = [
+    ('whole word matches', '<p>Ask an Elder today.</p>', ['Elder']),
+    ('no match inside a longer word', '<p>The Elderly and the Councils.</p>', []),
+    ('no match across a word character', '<p>Sheriff_office and reSheriff.</p>', []),
+    ('case-insensitive, keeps the text as written', '<p>the council met.</p>', ['council']),
+    ('longest match wins', '<p>The Council of Elders met.</p>', ['Council of Elders']),
+    ('longest match wins even when later',
+     '<p>A Witness spoke to the Fair Witness.</p>', ['Fair Witness']),
+    ('ties go to the earliest match', '<p>Judge and Elder.</p>', ['Judge']),
+    ('ties go to the earliest match, either order', '<p>Elder and Judge.</p>', ['Elder']),
+    ('one link per text node', '<p>Elder, Elder and Elder.</p>', ['Elder']),
+    ('each text node gets its own link',
+     '<p>Elder <em>emphasis</em> then Sheriff.</p>', ['Elder', 'Sheriff']),
+    ('list items are linked', '<ul><li>Rights of the people</li></ul>', ['Rights']),
+    ('nothing inside an existing link',
+     '<p><a href="#x">the Elder</a> spoke.</p>', []),
+    ('nothing inside markup within a link',
+     '<p><a href="#x"><em>Elder</em> Sheriff</a></p>', []),
+    ('text after a link is still linked',
+     '<p><a href="#x">here</a> the Sheriff came.</p>', ['Sheriff']),
+    ('nothing in headings', '<h2>Council of Elders</h2><h3>Elder</h3>', []),
+    ('nothing in headings inside list items', '<ul><li><h4>Elder</h4></li></ul>', []),
+    ('text after a heading in a list item is linked',
+     '<ul><li><h4>Elder</h4>the Sheriff</li></ul>', ['Sheriff']),
+    ('nothing in the TOC', '<nav id="TOC"><ul><li>Elder</li></ul></nav>', []),
+    ('nothing in the glossary', '<div id="glossary"><p>Elder: one of the council.</p></div>', []),
+]
+
+
+def run_case(body):
+    """Link body; returns (links reported, glossary links in the document)."""
+    doc = parse_html(f'<html><body>{body}</body></html>')
+    added = link_glossary_terms(doc, GlossaryLinker(TERMS))
+    return added, doc.findall(".//a[@class='glossary-term']")
+
+
+def main():
+    failures = 0
+    for description, body, expected in CASES:
+        added, links = run_case(body)
+        texts = [link.text for link in links]
+        hrefs_ok = all(link.get('href') == f'#{glossary_anchor(link.text)}' for link in links)
+        ok = texts == expected and added == len(expected) and hrefs_ok
+        print(f"   {'✓' if ok else '✗'} {description}: {texts}" + ('' if ok else f" (expected {expected})"))
+        failures += not ok
+
+    # The link points at the glossary entry of the matched term, not of the text's casing
+    doc = parse_html('<html><body><p>the COUNCIL OF ELDERS met</p></body></html>')
+    link_glossary_terms(doc, GlossaryLinker(TERMS))
+    link = doc.find(".//a[@class='glossary-term']")
+    ok = link is not None and link.get('href') == f"#{glossary_anchor('Council of Elders')}"
+    print(f"   {'✓' if ok else '✗'} anchor follows the glossary term: "
+          f"{link.get('href') if link is not None else None}")
+    failures += not ok
+
+    # Linking keeps the surrounding text intact
+    doc = parse_html('<html><body><p>Before Elder after.</p></body></html>')
+    link_glossary_terms(doc, GlossaryLinker(TERMS))
+    ok = doc.find('.//p').text_content() == 'Before Elder after.'
+    print(f"   {'✓' if ok else '✗'} text around a link is kept")
+    failures += not ok
+
+    if failures:
+        print(f"\n{failures} glossary linking check(s) failed")
+        return 1
+    print("\nAll glossary linking checks passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
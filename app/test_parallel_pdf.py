@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Check that merging part PDFs keeps named destinations and cross-part links.
+
+Builds two one-page part PDFs the way parallel_pdf.py's workers leave
+them - each with its own named destinations, the first with a link to the
+second part still pointing at a placeholder URI - merges them with
+merge_parts() and checks every destination lands on the right page and
+the placeholder link became a /Dest link.  Needs pypdf, not WeasyPrint:
+
+    python3 app/test_parallel_pdf.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from pypdf import PdfReader, PdfWriter  # noqa: E402
+from pypdf.generic import (ArrayObject, DictionaryObject, FloatObject, NameObject,  # noqa: E402
+                           TextStringObject)
+
+from parallel_pdf import LINK_SCHEME, merge_parts  # noqa: E402
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+# Part -> (named destinations on its page, link targets in another part)
+PARTS = [
+    (['introduction', 'toc'], ['glossary-elder']),
+    (['glossary', 'glossary-elder'], []),
+]
+
+
+def link_annotation(target):
+    return DictionaryObject({
+        NameObject('/Type'): NameObject('/Annot'),
+        NameObject('/Subtype'): NameObject('/Link'),
+        NameObject('/Rect'): ArrayObject([FloatObject(v) for v in (72, 700, 200, 720)]),
+        NameObject('/A'): DictionaryObject({
+            NameObject('/S'): NameObject('/URI'),
+            NameObject('/URI'): TextStringObject(LINK_SCHEME + target),
+        }),
+    })
+
+
+def write_part(path, destinations, links):
+    writer = PdfWriter()
+    writer.add_blank_page(PAGE_WIDTH, PAGE_HEIGHT)
+    for name in destinations:
+        writer.add_named_destination(name, 0)
+    for target in links:
+        writer.add_annotation(0, link_annotation(target))
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        part_pdfs = []
+        for index, (destinations, links) in enumerate(PARTS):
+            part_pdfs.append(tmp / f'part-{index:03d}.pdf')
+            write_part(part_pdfs[-1], destinations, links)
+        layouts = [[{'height': PAGE_HEIGHT / 0.75, 'anchors': {}, 'bookmarks': []}] for _ in PARTS]
+        output_pdf = tmp / 'book.pdf'
+        merge_parts(part_pdfs, layouts, output_pdf, title='Terran Society')
+
+        reader = PdfReader(str(output_pdf))
+        destinations = reader.named_destinations
+        for page_number, (names, _) in enumerate(PARTS):
+            for name in names:
+                dest = destinations.get(name)
+                found = reader.get_destination_page_number(dest) if dest is not None else None
+                ok = found == page_number
+                print(f"   {'✓' if ok else '✗'} destination {name}: page {found} (expected {page_number})")
+                failures += not ok
+
+        for page_number, (_, links) in enumerate(PARTS):
+            annots = [annot.get_object() for annot in reader.pages[page_number].get('/Annots', [])]
+            targets = [str(annot.get('/Dest')) for annot in annots]
+            placeholders = [annot for annot in annots if '/A' in annot]
+            ok = targets == links and not placeholders and all(t in destinations for t in targets)
+            print(f"   {'✓' if ok else '✗'} page {page_number} links: {targets} (expected {links})")
+            failures += not ok
+
+    if failures:
+        print(f"\n{failures} destination(s) or link(s) lost in the merge")
+        return 1
+    print("\nNamed destinations and cross-part links survive the merge")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Check that a --jobs N manuscript is byte-identical to the serial one.
+
+Renders every chapter of generate_book.py from the same preloaded OrgGraph
+twice - in this process, as a serial build does, and on the spawned worker
+pool of render_chapters_parallel() - assembles both manuscripts in book
+order and compares the bytes.  Uses a synthetic graph, so no database is
+needed; a chapter whose input file is not checked out is skipped:
+
+    python3 app/test_parallel_render.py
+"""
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from chapter_cache import ChapterCache  # noqa: E402
+from generate_book import (CHAPTERS, BookSources, assemble_manuscript,  # noqa: E402
+                           render_chapters_parallel)
+from org_graph import OrgGraph  # noqa: E402
+
+JOBS = 4
+
+# Institutions the chapters look up by name, with the role each office is named for
+INSTITUTIONS = {
+    'Council of Elders': 'Elder',
+    'Office of Regional Administrator': 'Regional Administrator',
+    'Office of Regional Treasurer': 'Regional Treasurer',
+    'Office of Regional Sheriff': 'Regional Sheriff',
+    'Office of Regional Environmental Guardian': 'Regional Environmental Guardian',
+    'Office of Regional Ambassador': 'Regional Ambassador',
+    'Regional Council of the People': 'Representative',
+    'Office of Guarantor of Rights': 'Guarantor of Rights',
+    'Office of Facilitator of the Court': 'Facilitator of the Court',
+    'Office of Public Arbitrator': 'Public Arbitrator',
+    'Regional Fair Witness Council': 'Fair Witness',
+    'World Executive Council': 'Executive Councillor',
+    'Office of World Administrator': 'World Administrator',
+    'Office of World Treasurer': 'World Treasurer',
+    'Office of World Sheriff': 'World Sheriff',
+    'Office of World Environmental Guardian': 'World Environmental Guardian',
+    'Office of World Ambassador': 'World Ambassador',
+    'Council of the Regions': 'Regional Delegate',
+    'World Council of the People': 'World Representative',
+    'World Fair Witness Council': 'World Fair Witness',
+    'World Defense Force': 'Commander',
+    'Defense Force Intelligence': 'Intelligence Director',
+    'Defense Force Council': 'Defense Councillor',
+}
+
+
+def synthetic_graph():
+    """An OrgGraph with every institution the chapters read, two roles each."""
+    tables = {name: [] for name in ('tier', 'tier_explain', 'branch', 'institution',
+                                    'institution_explain', 'role', 'role_duty',
+                                    'role_explain', 'process')}
+    for i, name in enumerate(('District', 'Regional', 'World'), 1):
+        tables['tier'].append({'tier_id': i, 'tier_name': name, 'sort_order': i})
+        tables['tier_explain'].append({'explain_id': i, 'tier_id': i, 'sort_order': 1,
+                                       'explain_header': name, 'explain_desc': f'The {name} tier.'})
+    for i, name in enumerate(('Executive', 'Legislative', 'Judicial', 'Fair Witness', 'Military'), 1):
+        tables['branch'].append({'branch_id': i, 'branch_name': name, 'sort_order': i,
+                                 'branch_desc': f'The {name} branch.'})
+    for i, (name, office_role) in enumerate(INSTITUTIONS.items(), 1):
+        tables['institution'].append({
+            'institution_id': i, 'institution_name': name, 'institution_desc': f'About the {name}.',
+            'tier_id': 1 + i % 3, 'branch_id': 1 + i % 5, 'sort_order': i,
+        })
+        tables['institution_explain'].append({'explain_id': i, 'institution_id': i, 'sort_order': 1,
+                                              'explain_header': 'Purpose',
+                                              'explain_desc': f'Why the {name} exists.'})
+        for j, role_name in enumerate((office_role, f'Deputy {office_role}'), 1):
+            role_id = len(tables['role']) + 1
+            tables['role'].append({'role_id': role_id, 'institution_id': i, 'role_name': role_name,
+                                   'role_desc': f'The {role_name}.', 'sort_order': j})
+            tables['role_explain'].append({'explain_id': role_id, 'role_id': role_id, 'sort_order': 1,
+                                           'explain_header': 'Selection',
+                                           'explain_desc': f'How the {role_name} is chosen.'})
+            for k in range(1, 4):
+                tables['role_duty'].append({'duty_id': len(tables['role_duty']) + 1, 'role_id': role_id,
+                                            'sort_order': k, 'duty_header': f'Duty {k}',
+                                            'duty_desc': f'Duty {k} of the {role_name}.'})
+    for i in range(1, 4):
+        tables['process'].append({'process_id': i, 'process_name': f'Process {i}', 'sort_order': i,
+                                  'process_header': f'Process {i}', 'process_desc': f'Step {i}.'})
+    return OrgGraph(tables)
+
+
+def synthetic_sources():
+    metadata = {'title': 'Terran Society', 'subtitle': 'A New Social Contract',
+                'current_version': '1.1', 'version_date': date(2026, 10, 17),
+                'copyright_holder': 'Terran Society', 'copyright_year': 2026,
+                'dedication_text': 'For everyone.', 'dedication_attribution': 'The authors'}
+    authors = [{'author_name': 'Angelo Patrick Arteman', 'author_role': 'Author'}]
+    return BookSources(None, metadata, authors, synthetic_graph())
+
+
+def main():
+    src = synthetic_sources()
+    # Chapters built from input files that are not checked out are left empty
+    names = [name for name, _, files, _ in CHAPTERS if all(Path(f).exists() for f in files)]
+    skipped = [name for name, *_ in CHAPTERS if name not in names]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        serial_cache = ChapterCache(tmp / 'serial')
+        serial = {name: serial_cache.write(name, render(src))
+                  for name, _, _, render in CHAPTERS if name in names}
+        parallel_cache = ChapterCache(tmp / 'parallel')
+        parallel = render_chapters_parallel(names, src, parallel_cache, JOBS)
+        for name in skipped:
+            print(f"   - {name}: input file missing")
+            serial[name] = serial_cache.write(name, [])
+            parallel[name] = parallel_cache.write(name, [])
+
+        failures = 0
+        for name in names:
+            same = serial[name].read_bytes() == parallel[name].read_bytes()
+            empty = not serial[name].stat().st_size
+            print(f"   {'✓' if same and not empty else '✗'} {name}"
+                  + (' differs' if not same else '') + (' is empty' if empty else ''))
+            failures += not same or empty
+
+        assemble_manuscript(serial, tmp / 'serial.md')
+        assemble_manuscript(parallel, tmp / 'parallel.md')
+        serial_bytes = (tmp / 'serial.md').read_bytes()
+        parallel_bytes = (tmp / 'parallel.md').read_bytes()
+        expected = b''.join(serial[name].read_bytes() for name, *_ in CHAPTERS)
+        identical = serial_bytes == parallel_bytes == expected
+        print(f"   {'✓' if identical else '✗'} manuscript: {len(serial_bytes)} bytes serial, "
+              f"{len(parallel_bytes)} bytes with {JOBS} jobs")
+        failures += not identical
+
+    if failures:
+        print(f"\n{failures} difference(s) between the serial and parallel builds")
+        return 1
+    print("\nParallel build is byte-identical to the serial build")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Check that each list and detail page runs a fixed number of SQL queries.
+
+Requests every detail page for the entity with the most children and the
+one with the fewest, and the first page of each list, counting the
+statements sent to the database, and fails if any goes over its budget.  Needs data to look at
+(scripts/synthetic_data.py fills a scratch database):
+
+    TS_BOOK_DATABASE=db_terran_society_bench python3 app/test_query_counts.py
+"""
+import sys
+
+from flask import url_for
+from sqlalchemy import event, func
+
+import reference_cache
+from tsbook import app, db
+from models import Branch, Institution, Role, RoleDuty, Tier
+
+# Statements per page: the entity with its many-to-one parents, one per
+# eager-loaded collection (loading_profiles.py) and one for its content blocks
+BUDGETS = {
+    'tier_detail': 4,
+    'branch_detail': 3,
+    'institution_detail': 4,
+    'role_detail': 4,
+}
+
+# Statements per list page: the page of rows (related names come from a
+# join); dropdown options come from reference_cache.py, warmed at startup
+LIST_BUDGETS = {
+    'index': 2,
+    'roles_list': 1,
+    'institutions_list': 1,
+    'role_new': 0,
+    'institution_new': 0,
+}
+
+# Route -> (entity id column, child foreign key) used to find the largest and smallest entity
+ENTITIES = {
+    'tier_detail': (Tier.tier_id, Institution.tier_id),
+    'branch_detail': (Branch.branch_id, Institution.branch_id),
+    'institution_detail': (Institution.institution_id, Role.institution_id),
+    'role_detail': (Role.role_id, RoleDuty.role_id),
+}
+
+
+def extremes(id_column, child_column):
+    """Ids of the entity with the most children and of the one with the fewest."""
+    children = (db.session.query(child_column.label('parent_id'), func.count().label('n'))
+                .group_by(child_column).subquery())
+    count = func.coalesce(children.c.n, 0)
+    query = db.session.query(id_column).outerjoin(children, children.c.parent_id == id_column)
+    largest = query.order_by(count.desc(), id_column).limit(1).scalar()
+    smallest = query.order_by(count, id_column).limit(1).scalar()
+    return largest, smallest
+
+
+def check(client, statements, url, budget):
+    """Request url; returns True when it succeeds within budget statements."""
+    statements.clear()
+    response = client.get(url)
+    count = len(statements)
+    ok = response.status_code == 200 and count <= budget
+    print(f"   {'✓' if ok else '✗'} {url}: {count} queries (budget {budget}), "
+          f"status {response.status_code}")
+    return ok
+
+
+def main():
+    statements = []
+    failures = 0
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, sql, *args: statements.append(sql))
+        client = app.test_client()
+        reference_cache.warm(app)
+        for route, budget in LIST_BUDGETS.items():
+            with app.test_request_context():
+                url = url_for(route)
+            failures += not check(client, statements, url, budget)
+        for route, budget in BUDGETS.items():
+            for entity_id in extremes(*ENTITIES[route]):
+                if entity_id is None:
+                    print(f"   - {route}: no data")
+                    continue
+                with app.test_request_context():
+                    url = url_for(route, id=entity_id)
+                failures += not check(client, statements, url, budget)
+    if failures:
+        print(f"\n{failures} page(s) over their query budget")
+        return 1
+    print("\nAll pages within their query budgets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,16 @@
 """Main Flask application for Terran Society Book Manager."""
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
-from models import db, Tier, Branch, Institution, Role, RoleDuty, RoleExplain, InstitutionExplain, TierExplain, Process, MediaAsset, ContentBlock, EntityContent, BookMetadata, BookAuthor
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify, send_file, stream_with_context
+from models import db, Tier, Branch, Institution, Role, RoleDuty, RoleExplain, InstitutionExplain, TierExplain, Process, DashboardStats, MediaAsset, ContentBlock, EntityContent, BookMetadata, BookAuthor, BuildJob, BuildJobEvent, GeneratedDocument
 import config
 from datetime import datetime
-import subprocess
+from build_queue import enqueue_build
+from loading_profiles import (BRANCH_DETAIL, INSTITUTION_DETAIL, INSTITUTION_LIST, RECENT_ROLES,
+                              ROLE_DETAIL, ROLE_LIST, TIER_DETAIL)
+import reference_cache
+from pagination import keyset_page, sort_key
+import json
 import os
+import time
 
 app = Flask(__name__)
 app.config.from_object(config)
@@ -24,22 +30,28 @@ register_book_routes(app)
 from db_settings_routes import register_db_settings_routes
 register_db_settings_routes(app)
 
+# Dropdown options, cached between requests (reference_cache.py)
+reference_cache.register_invalidation()
+reference_cache.warm(app)
+
+def tier_options():
+    return reference_cache.options('tiers')
+
+def branch_options():
+    return reference_cache.options('branches')
+
+def institution_options():
+    return reference_cache.options('institutions')
+
 # Dashboard and navigation
 @app.route('/')
 def index():
     """Main dashboard."""
-    # Get statistics
-    stats = {
-        'tiers': Tier.query.count(),
-        'branches': Branch.query.count(),
-        'institutions': Institution.query.count(),
-        'roles': Role.query.count(),
-        'duties': RoleDuty.query.count(),
-        'processes': Process.query.count()
-    }
+    # Table totals, kept by database triggers
+    stats = DashboardStats.query.get(1)
     
     # Get recent modifications
-    recent_roles = Role.query.order_by(Role.modified_at.desc()).limit(5).all()
+    recent_roles = Role.query.options(*RECENT_ROLES).order_by(Role.modified_at.desc()).limit(5).all()
     
     # Check if book exists and get stats
     book_file = config.BOOK_OUTPUT_DIR / 'manuscript.md'
@@ -62,7 +74,7 @@ def tiers_list():
 @app.route('/tiers/<int:id>')
 def tier_detail(id):
     """Show tier details."""
-    tier = Tier.query.get_or_404(id)
+    tier = Tier.query.options(*TIER_DETAIL).get_or_404(id)
     # Get content blocks for this tier
     from content_routes import get_entity_content
     entity_content = get_entity_content('tier', id)
@@ -78,7 +90,7 @@ def branches_list():
 @app.route('/branches/<int:id>')
 def branch_detail(id):
     """Show branch details."""
-    branch = Branch.query.get_or_404(id)
+    branch = Branch.query.options(*BRANCH_DETAIL).get_or_404(id)
     # Get content blocks for this branch
     from content_routes import get_entity_content
     entity_content = get_entity_content('branch', id)
@@ -87,26 +99,39 @@ def branch_detail(id):
 # Institution management
 @app.route('/institutions')
 def institutions_list():
-    """List all institutions."""
+    """List institutions, one page at a time."""
+    institutions, next_cursor = institutions_page()
+    tiers = tier_options()
+    branches = branch_options()
+    
+    return render_template('institutions/list.html', institutions=institutions, next_cursor=next_cursor,
+                           tiers=tiers, branches=branches)
+
+@app.route('/institutions/more')
+def institutions_more():
+    """Next page of institution cards for infinite scroll (HTMX)."""
+    institutions, next_cursor = institutions_page()
+    return render_template('institutions/_institution_cards.html', institutions=institutions,
+                           next_cursor=next_cursor)
+
+def institutions_page():
+    """(institutions, next cursor) for the filters and cursor in the query string."""
     tier_filter = request.args.get('tier')
     branch_filter = request.args.get('branch')
     
-    query = Institution.query
+    query = Institution.query.options(*INSTITUTION_LIST)
     if tier_filter:
         query = query.filter_by(tier_id=tier_filter)
     if branch_filter:
         query = query.filter_by(branch_id=branch_filter)
     
-    institutions = query.order_by(Institution.sort_order).all()
-    tiers = Tier.query.order_by(Tier.sort_order).all()
-    branches = Branch.query.order_by(Branch.sort_order).all()
-    
-    return render_template('institutions/list.html', institutions=institutions, tiers=tiers, branches=branches)
+    keys = (sort_key(Institution.sort_order), Institution.institution_id)
+    return keyset_page(query, keys, request.args.get('after'), config.LIST_PAGE_SIZE)
 
 @app.route('/institutions/<int:id>')
 def institution_detail(id):
     """Show institution details with roles."""
-    institution = Institution.query.get_or_404(id)
+    institution = Institution.query.options(*INSTITUTION_DETAIL).get_or_404(id)
     # Get content blocks for this institution
     from content_routes import get_entity_content
     entity_content = get_entity_content('institution', id)
@@ -128,8 +153,8 @@ def institution_new():
         flash(f'Institution "{institution.institution_name}" created successfully!', 'success')
         return redirect(url_for('institution_detail', id=institution.institution_id))
     
-    tiers = Tier.query.order_by(Tier.sort_order).all()
-    branches = Branch.query.order_by(Branch.sort_order).all()
+    tiers = tier_options()
+    branches = branch_options()
     return render_template('institutions/form.html', tiers=tiers, branches=branches)
 
 @app.route('/institutions/<int:id>/edit', methods=['GET', 'POST'])
@@ -149,8 +174,8 @@ def institution_edit(id):
         flash(f'Institution "{institution.institution_name}" updated successfully!', 'success')
         return redirect(url_for('institution_detail', id=institution.institution_id))
     
-    tiers = Tier.query.order_by(Tier.sort_order).all()
-    branches = Branch.query.order_by(Branch.sort_order).all()
+    tiers = tier_options()
+    branches = branch_options()
     return render_template('institutions/form.html', institution=institution, tiers=tiers, branches=branches)
 
 @app.route('/institutions/<int:id>/delete', methods=['POST'])
@@ -166,22 +191,33 @@ def institution_delete(id):
 # Role management
 @app.route('/roles')
 def roles_list():
-    """List all roles."""
+    """List roles, one page at a time."""
+    roles, next_cursor = roles_page()
+    institutions = institution_options()
+    
+    return render_template('roles/list.html', roles=roles, next_cursor=next_cursor, institutions=institutions)
+
+@app.route('/roles/more')
+def roles_more():
+    """Next page of role rows for infinite scroll (HTMX)."""
+    roles, next_cursor = roles_page()
+    return render_template('roles/_role_rows.html', roles=roles, next_cursor=next_cursor)
+
+def roles_page():
+    """(roles, next cursor) for the filter and cursor in the query string."""
     institution_filter = request.args.get('institution')
     
-    query = Role.query.join(Institution)
+    query = Role.query.join(Role.institution).options(*ROLE_LIST)
     if institution_filter:
         query = query.filter(Institution.institution_id == institution_filter)
     
-    roles = query.order_by(Institution.institution_name, Role.sort_order).all()
-    institutions = Institution.query.order_by(Institution.institution_name).all()
-    
-    return render_template('roles/list.html', roles=roles, institutions=institutions)
+    keys = (Institution.institution_name, sort_key(Role.sort_order), Role.role_id)
+    return keyset_page(query, keys, request.args.get('after'), config.LIST_PAGE_SIZE)
 
 @app.route('/roles/<int:id>')
 def role_detail(id):
     """Show role details with duties and explanations."""
-    role = Role.query.get_or_404(id)
+    role = Role.query.options(*ROLE_DETAIL).get_or_404(id)
     # Get content blocks for this role
     from content_routes import get_entity_content
     entity_content = get_entity_content('role', id)
@@ -202,7 +238,7 @@ def role_new():
         flash(f'Role "{role.role_name}" created successfully!', 'success')
         return redirect(url_for('role_detail', id=role.role_id))
     
-    institutions = Institution.query.order_by(Institution.institution_name).all()
+    institutions = institution_options()
     return render_template('roles/form.html', institutions=institutions)
 
 @app.route('/roles/<int:id>/edit', methods=['GET', 'POST'])
@@ -221,7 +257,7 @@ def role_edit(id):
         flash(f'Role "{role.role_name}" updated successfully!', 'success')
         return redirect(url_for('role_detail', id=role.role_id))
     
-    institutions = Institution.query.order_by(Institution.institution_name).all()
+    institutions = institution_options()
     return render_template('roles/form.html', role=role, institutions=institutions)
 
 @app.route('/roles/<int:id>/delete', methods=['POST'])
@@ -494,48 +530,99 @@ def process_delete(id):
 # Book generation
 @app.route('/generate', methods=['POST'])
 def generate_book():
-    """Generate the book."""
+    """Queue a book build."""
     try:
-        result = subprocess.run(
-            ['python3', str(config.GENERATE_SCRIPT)],
-            capture_output=True,
-            text=True,
-            cwd=str(config.BASE_DIR)
-        )
-        
-        if result.returncode == 0:
-            flash('Book generated successfully!', 'success')
-        else:
-            flash(f'Error generating book: {result.stderr}', 'error')
+        job = enqueue_build('book')
+        flash(f'Book build queued (job #{job.job_id}).', 'info')
     except Exception as e:
-        flash(f'Error generating book: {str(e)}', 'error')
+        flash(f'Error queueing book build: {str(e)}', 'error')
     
     return redirect(url_for('index'))
 
 @app.route('/generate-pdf', methods=['POST'])
 def generate_pdf():
-    """Generate PDF directly from markdown using WeasyPrint."""
+    """Queue a PDF build; poll the returned status URL for the result."""
     try:
-        pdf_script = config.BASE_DIR / 'scripts' / 'generate_pdf.py'
-        
-        if not pdf_script.exists():
-            return jsonify({'success': False, 'error': 'PDF generation script not found.'}), 500
-        
-        result = subprocess.run(
-            ['python3', str(pdf_script)],
-            capture_output=True,
-            text=True,
-            cwd=str(config.BASE_DIR)
-        )
-        
-        if result.returncode == 0:
-            return jsonify({'success': True, 'message': 'PDF generated successfully!'}), 200
-        else:
-            error_msg = result.stderr or result.stdout
-            return jsonify({'success': False, 'error': error_msg}), 500
+        job = enqueue_build('pdf')
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'status_url': url_for('build_job_status', job_id=job.job_id),
+        }), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/build-jobs')
+def build_jobs():
+    """Recent build jobs, polled by the dashboard over HTMX."""
+    jobs = BuildJob.query.order_by(BuildJob.job_id.desc()).limit(5).all()
+    return render_template('jobs/_status.html', jobs=jobs)
+
+@app.route('/build-jobs/<int:job_id>')
+def build_job_status(job_id):
+    """Status of one build job as JSON."""
+    job = BuildJob.query.get_or_404(job_id)
+    return jsonify({
+        'job_id': job.job_id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'returncode': job.returncode,
+        'output': job.output if job.status == 'failed' else None,
+    })
+
+@app.route('/build-jobs/<int:job_id>/events')
+def build_job_events(job_id):
+    """Stream a build job's progress events as Server-Sent Events.
+
+    Each response lasts at most BUILD_EVENTS_STREAM_SECONDS so an open
+    progress page does not hold a request thread for the whole build; the
+    browser's EventSource then reconnects and resumes from Last-Event-ID.
+    """
+    BuildJob.query.get_or_404(job_id)
+    last_id = request.headers.get('Last-Event-ID', 0, type=int)
+    deadline = time.monotonic() + config.BUILD_EVENTS_STREAM_SECONDS
+    
+    @stream_with_context
+    def stream():
+        nonlocal last_id
+        yield f"retry: {config.BUILD_EVENTS_RETRY_MS}\n\n"
+        while True:
+            # Read the status first: once it is final, every event is already stored
+            job = db.session.get(BuildJob, job_id)
+            status, returncode = job.status, job.returncode
+            events = (BuildJobEvent.query
+                      .filter(BuildJobEvent.job_id == job_id, BuildJobEvent.event_id > last_id)
+                      .order_by(BuildJobEvent.event_id)
+                      .all())
+            events = [(e.event_id, e.event, e.payload) for e in events]
+            db.session.commit()  # end the transaction so the next poll sees new rows
+            
+            for event_id, event, payload in events:
+                last_id = event_id
+                yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(payload)}\n\n"
+            if status not in ('queued', 'running'):
+                done = {'status': status, 'returncode': returncode}
+                yield f"event: done\ndata: {json.dumps(done)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                return  # the client reconnects after BUILD_EVENTS_RETRY_MS
+            if not events:
+                yield ": keep-alive\n\n"
+            time.sleep(config.BUILD_EVENTS_POLL_INTERVAL)
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/build-history')
+def build_history():
+    """Recent generated documents with per-stage timings, for the dashboard trend."""
+    documents = (GeneratedDocument.query
+                 .order_by(GeneratedDocument.generated_at.desc())
+                 .limit(config.BUILD_HISTORY_LIMIT)
+                 .all())
+    longest = max((float(d.wall_seconds or 0) for d in documents), default=0) or 1
+    return render_template('jobs/_history.html', documents=documents, longest=longest)
+
 @app.route('/view-pdf')
 def view_pdf():
     """Serve the PDF file for viewing in browser."""
@@ -0,0 +1,17 @@
+-- Migration: Add build progress events
+-- Date: 2026-10-17
+
+-- Progress events emitted by a queued build (scripts/build_events.py),
+-- streamed to the dashboard over Server-Sent Events
+CREATE TABLE IF NOT EXISTS scm_terran_society.build_job_event (
+    event_id BIGSERIAL PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES scm_terran_society.build_job(job_id) ON DELETE CASCADE,
+    event TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_build_job_event_job
+    ON scm_terran_society.build_job_event (job_id, event_id);
+
+COMMENT ON TABLE scm_terran_society.build_job_event IS 'Progress events of queued book builds: stages, chapters, glossary links, PDF pages';
@@ -0,0 +1,31 @@
+-- Migration: Add build job queue for book generation
+-- Date: 2026-10-17
+
+-- Book builds requested from the web app. Build workers (app/build_worker.py)
+-- claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED.
+CREATE TABLE IF NOT EXISTS scm_terran_society.build_job (
+    job_id SERIAL PRIMARY KEY,
+    job_type TEXT NOT NULL CHECK (job_type IN ('book', 'pdf')),
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    worker TEXT,
+    returncode INTEGER,
+    output TEXT,
+    requested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- At most one queued job per type: requests made while one is waiting join it
+CREATE UNIQUE INDEX IF NOT EXISTS idx_build_job_one_queued
+    ON scm_terran_society.build_job (job_type)
+    WHERE status = 'queued';
+
+-- Workers only ever scan the queued and running jobs
+CREATE INDEX IF NOT EXISTS idx_build_job_active
+    ON scm_terran_society.build_job (status, job_id)
+    WHERE status IN ('queued', 'running');
+
+COMMENT ON TABLE scm_terran_society.build_job IS 'Queue of book and PDF builds requested from the web app';
+COMMENT ON COLUMN scm_terran_society.build_job.heartbeat_at IS 'Refreshed by the worker while the job runs; a stale running job is failed and queued again';
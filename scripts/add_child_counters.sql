@@ -0,0 +1,233 @@
+-- Migration: Child counters and dashboard totals maintained by triggers
+-- Date: 2026-10-17
+
+-- Pages show how many institutions, roles, duties and explanations hang off
+-- each row; these columns hold the counts so reading one never loads or
+-- scans the children. Statement-level triggers with transition tables keep
+-- them correct, so a bulk insert costs one UPDATE per parent, not per row.
+ALTER TABLE scm_terran_society.tier
+    ADD COLUMN IF NOT EXISTS institution_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS explain_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE scm_terran_society.branch
+    ADD COLUMN IF NOT EXISTS institution_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE scm_terran_society.institution
+    ADD COLUMN IF NOT EXISTS role_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS explain_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE scm_terran_society.role
+    ADD COLUMN IF NOT EXISTS duty_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS explain_count INTEGER NOT NULL DEFAULT 0;
+
+-- Row totals for the dashboard, one row that is never deleted.  Inserts and
+-- deletes on the counted tables update it, so they queue on its row lock
+-- until commit; fine for an editing tool with a handful of writers.
+CREATE TABLE IF NOT EXISTS scm_terran_society.dashboard_stats (
+    stats_id INTEGER PRIMARY KEY DEFAULT 1 CHECK (stats_id = 1),
+    tiers INTEGER NOT NULL DEFAULT 0,
+    branches INTEGER NOT NULL DEFAULT 0,
+    institutions INTEGER NOT NULL DEFAULT 0,
+    roles INTEGER NOT NULL DEFAULT 0,
+    duties INTEGER NOT NULL DEFAULT 0,
+    processes INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO scm_terran_society.dashboard_stats (stats_id) VALUES (1)
+    ON CONFLICT (stats_id) DO NOTHING;
+
+-- Adjust a parent counter from the rows a statement changed.
+-- TG_ARGV: parent table, key column (same name in parent and child), counter column.
+CREATE OR REPLACE FUNCTION scm_terran_society.count_children()
+RETURNS TRIGGER AS $$
+DECLARE
+    parent_table TEXT := TG_ARGV[0];
+    parent_key TEXT := TG_ARGV[1];
+    counter TEXT := TG_ARGV[2];
+    changes TEXT;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        EXECUTE format('UPDATE scm_terran_society.%I SET %I = 0 WHERE %I <> 0',
+                       parent_table, counter, counter);
+        RETURN NULL;
+    END IF;
+
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN format('SELECT %I AS parent_id, 1 AS delta FROM new_rows', parent_key)
+        WHEN 'DELETE' THEN format('SELECT %I AS parent_id, -1 AS delta FROM old_rows', parent_key)
+        ELSE format('SELECT %1$I AS parent_id, 1 AS delta FROM new_rows
+                     UNION ALL SELECT %1$I, -1 FROM old_rows', parent_key)
+    END;
+    EXECUTE format(
+        'UPDATE scm_terran_society.%1$I p SET %3$I = p.%3$I + d.delta
+           FROM (SELECT parent_id, sum(delta) AS delta FROM (%4$s) c
+                  WHERE parent_id IS NOT NULL GROUP BY parent_id) d
+          WHERE p.%2$I = d.parent_id AND d.delta <> 0',
+        parent_table, parent_key, counter, changes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Adjust a dashboard total from the rows a statement inserted or deleted.
+-- TG_ARGV: dashboard_stats column.
+CREATE OR REPLACE FUNCTION scm_terran_society.count_rows()
+RETURNS TRIGGER AS $$
+DECLARE
+    total TEXT := TG_ARGV[0];
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        EXECUTE format('UPDATE scm_terran_society.dashboard_stats SET %I = 0', total);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        EXECUTE format('UPDATE scm_terran_society.dashboard_stats SET %1$I = %1$I + $1', total)
+            USING delta;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount everything from scratch: fills the columns when this migration
+-- runs, and repairs them after loading data with triggers disabled.  Only
+-- rows whose count is wrong are written.
+CREATE OR REPLACE FUNCTION scm_terran_society.refresh_counts()
+RETURNS VOID AS $$
+DECLARE
+    link RECORD;
+BEGIN
+    FOR link IN SELECT * FROM (VALUES
+        ('institution', 'tier', 'tier_id', 'institution_count'),
+        ('institution', 'branch', 'branch_id', 'institution_count'),
+        ('tier_explain', 'tier', 'tier_id', 'explain_count'),
+        ('role', 'institution', 'institution_id', 'role_count'),
+        ('institution_explain', 'institution', 'institution_id', 'explain_count'),
+        ('role_duty', 'role', 'role_id', 'duty_count'),
+        ('role_explain', 'role', 'role_id', 'explain_count')
+    ) AS l (child, parent, key, counter)
+    LOOP
+        EXECUTE format(
+            'UPDATE scm_terran_society.%2$I p SET %4$I = c.n
+               FROM (SELECT pp.%3$I AS parent_id, count(ch.%3$I) AS n
+                       FROM scm_terran_society.%2$I pp
+                       LEFT JOIN scm_terran_society.%1$I ch ON ch.%3$I = pp.%3$I
+                      GROUP BY pp.%3$I) c
+              WHERE p.%3$I = c.parent_id AND p.%4$I IS DISTINCT FROM c.n',
+            link.child, link.parent, link.key, link.counter);
+    END LOOP;
+
+    UPDATE scm_terran_society.dashboard_stats s SET
+        tiers = c.tiers, branches = c.branches, institutions = c.institutions,
+        roles = c.roles, duties = c.duties, processes = c.processes
+    FROM (SELECT (SELECT count(*) FROM scm_terran_society.tier) AS tiers,
+                 (SELECT count(*) FROM scm_terran_society.branch) AS branches,
+                 (SELECT count(*) FROM scm_terran_society.institution) AS institutions,
+                 (SELECT count(*) FROM scm_terran_society.role) AS roles,
+                 (SELECT count(*) FROM scm_terran_society.role_duty) AS duties,
+                 (SELECT count(*) FROM scm_terran_society.process) AS processes) c
+    WHERE (s.tiers, s.branches, s.institutions, s.roles, s.duties, s.processes)
+          IS DISTINCT FROM (c.tiers, c.branches, c.institutions, c.roles, c.duties, c.processes);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Counter writes must not look like edits: recreate the tables' existing
+-- modified_at triggers (tier_modified, ...) so they skip updates that
+-- change nothing but counter columns
+DO $$
+DECLARE
+    target RECORD;
+BEGIN
+    FOR target IN
+        SELECT c.relname AS table_name, t.tgname AS trigger_name, t.tgfoid::regproc AS func, l.counters
+          FROM (VALUES
+                ('tier', ARRAY['institution_count', 'explain_count']),
+                ('branch', ARRAY['institution_count']),
+                ('institution', ARRAY['role_count', 'explain_count']),
+                ('role', ARRAY['duty_count', 'explain_count'])
+               ) AS l (table_name, counters)
+          JOIN pg_class c ON c.relname = l.table_name
+          JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = 'scm_terran_society'
+          JOIN pg_trigger t ON t.tgrelid = c.oid AND t.tgname = l.table_name || '_modified'
+    LOOP
+        EXECUTE format('DROP TRIGGER %I ON scm_terran_society.%I', target.trigger_name, target.table_name);
+        EXECUTE format('CREATE TRIGGER %1$I BEFORE UPDATE ON scm_terran_society.%2$I
+                            FOR EACH ROW
+                            WHEN ((to_jsonb(OLD) - %3$L::TEXT[]) IS DISTINCT FROM (to_jsonb(NEW) - %3$L::TEXT[]))
+                            EXECUTE FUNCTION %4$s()',
+                       target.trigger_name, target.table_name, target.counters, target.func);
+    END LOOP;
+END;
+$$;
+
+-- Transition tables allow one event per trigger, so each counted table gets
+-- an AFTER trigger per event
+DO $$
+DECLARE
+    link RECORD;
+    event TEXT;
+    trigger_name TEXT;
+    transition TEXT;
+BEGIN
+    FOR link IN SELECT * FROM (VALUES
+        ('institution', 'tier', 'tier_id', 'institution_count'),
+        ('institution', 'branch', 'branch_id', 'institution_count'),
+        ('tier_explain', 'tier', 'tier_id', 'explain_count'),
+        ('role', 'institution', 'institution_id', 'role_count'),
+        ('institution_explain', 'institution', 'institution_id', 'explain_count'),
+        ('role_duty', 'role', 'role_id', 'duty_count'),
+        ('role_explain', 'role', 'role_id', 'explain_count')
+    ) AS l (child, parent, key, counter)
+    LOOP
+        FOREACH event IN ARRAY ARRAY['INSERT', 'UPDATE', 'DELETE', 'TRUNCATE'] LOOP
+            trigger_name := format('%s_%s_%s', link.child, link.counter, lower(event));
+            transition := CASE event
+                WHEN 'INSERT' THEN 'REFERENCING NEW TABLE AS new_rows'
+                WHEN 'UPDATE' THEN 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows'
+                WHEN 'DELETE' THEN 'REFERENCING OLD TABLE AS old_rows'
+                ELSE ''
+            END;
+            EXECUTE format('DROP TRIGGER IF EXISTS %I ON scm_terran_society.%I', trigger_name, link.child);
+            EXECUTE format('CREATE TRIGGER %I AFTER %s ON scm_terran_society.%I %s
+                            FOR EACH STATEMENT EXECUTE FUNCTION scm_terran_society.count_children(%L, %L, %L)',
+                           trigger_name, event, link.child, transition, link.parent, link.key, link.counter);
+        END LOOP;
+    END LOOP;
+
+    FOR link IN SELECT * FROM (VALUES
+        ('tier', 'tiers'), ('branch', 'branches'), ('institution', 'institutions'),
+        ('role', 'roles'), ('role_duty', 'duties'), ('process', 'processes')
+    ) AS l (source, total)
+    LOOP
+        FOREACH event IN ARRAY ARRAY['INSERT', 'DELETE', 'TRUNCATE'] LOOP
+            trigger_name := format('%s_stats_%s', link.source, lower(event));
+            transition := CASE event
+                WHEN 'INSERT' THEN 'REFERENCING NEW TABLE AS new_rows'
+                WHEN 'DELETE' THEN 'REFERENCING OLD TABLE AS old_rows'
+                ELSE ''
+            END;
+            EXECUTE format('DROP TRIGGER IF EXISTS %I ON scm_terran_society.%I', trigger_name, link.source);
+            EXECUTE format('CREATE TRIGGER %I AFTER %s ON scm_terran_society.%I %s
+                            FOR EACH STATEMENT EXECUTE FUNCTION scm_terran_society.count_rows(%L)',
+                           trigger_name, event, link.source, transition, link.total);
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+SELECT scm_terran_society.refresh_counts();
+
+COMMENT ON TABLE scm_terran_society.dashboard_stats IS 'Single row of table totals for the dashboard, kept by count_rows() triggers';
+COMMENT ON FUNCTION scm_terran_society.refresh_counts() IS 'Recount every child counter and dashboard total';
+COMMENT ON COLUMN scm_terran_society.tier.institution_count IS 'Institutions in this tier, kept by triggers on institution';
+COMMENT ON COLUMN scm_terran_society.tier.explain_count IS 'Explanations of this tier, kept by triggers on tier_explain';
+COMMENT ON COLUMN scm_terran_society.branch.institution_count IS 'Institutions in this branch, kept by triggers on institution';
+COMMENT ON COLUMN scm_terran_society.institution.role_count IS 'Roles in this institution, kept by triggers on role';
+COMMENT ON COLUMN scm_terran_society.institution.explain_count IS 'Explanations of this institution, kept by triggers on institution_explain';
+COMMENT ON COLUMN scm_terran_society.role.duty_count IS 'Duties of this role, kept by triggers on role_duty';
+COMMENT ON COLUMN scm_terran_society.role.explain_count IS 'Explanations of this role, kept by triggers on role_explain';
@@ -0,0 +1,10 @@
+-- Migration: Record peak memory with each generated document
+-- Date: 2026-10-17
+
+-- Highest resident set size of the build process in any stage; the peak of
+-- each stage is kept in stage_timings (see scripts/build_memory.py)
+ALTER TABLE scm_terran_society.generated_document
+    ADD COLUMN IF NOT EXISTS peak_rss_mb NUMERIC(10, 1);
+
+COMMENT ON COLUMN scm_terran_society.generated_document.peak_rss_mb IS 'Peak resident set size of the build process in MB';
+COMMENT ON COLUMN scm_terran_society.generated_document.stage_timings IS 'Wall and CPU seconds and peak memory per build stage: {"stage": {"wall": s, "cpu": s, "rss_peak_mb": MB}}';
@@ -0,0 +1,18 @@
+-- Migration: Record build inputs and timings with each generated document
+-- Date: 2026-10-17
+
+-- generated_document (moved from ts_books by app/consolidate_schemas.sql) gets
+-- one row per artifact a build writes; see scripts/build_history.py
+ALTER TABLE scm_terran_society.generated_document
+    ADD COLUMN IF NOT EXISTS input_hash TEXT,
+    ADD COLUMN IF NOT EXISTS wall_seconds NUMERIC(10, 3),
+    ADD COLUMN IF NOT EXISTS cpu_seconds NUMERIC(10, 3),
+    ADD COLUMN IF NOT EXISTS stage_timings JSONB,
+    ADD COLUMN IF NOT EXISTS job_id INTEGER
+        REFERENCES scm_terran_society.build_job(job_id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_gen_doc_generated
+    ON scm_terran_society.generated_document (generated_at DESC);
+
+COMMENT ON COLUMN scm_terran_society.generated_document.input_hash IS 'Hash of everything the artifact was built from (artifact cache key)';
+COMMENT ON COLUMN scm_terran_society.generated_document.stage_timings IS 'Wall and CPU seconds per build stage: {"stage": {"wall": s, "cpu": s}}';
@@ -0,0 +1,16 @@
+-- Migration: Indexes for keyset pagination of the roles and institutions lists
+-- Date: 2026-10-17
+
+-- The list pages seek to the row after the previous page's last one on
+-- their sort key (app/pagination.py); these indexes let each page read just
+-- its own rows. NULL sort orders are compared as 2147483647 (sorted last).
+CREATE INDEX IF NOT EXISTS idx_institution_list_order
+    ON scm_terran_society.institution ((COALESCE(sort_order, 2147483647)), institution_id);
+
+-- Roles list: institutions in name order (the unique index on
+-- institution_name), then each institution's roles from this index
+CREATE INDEX IF NOT EXISTS idx_role_list_order
+    ON scm_terran_society.role (institution_id, (COALESCE(sort_order, 2147483647)), role_id);
+
+COMMENT ON INDEX scm_terran_society.idx_institution_list_order IS 'Sort key of the institutions list (keyset pagination)';
+COMMENT ON INDEX scm_terran_society.idx_role_list_order IS 'Roles of an institution in list order (keyset pagination)';
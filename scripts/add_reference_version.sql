@@ -0,0 +1,52 @@
+-- Migration: Change counters for the cached dropdown lists
+-- Date: 2026-10-17
+
+-- Every app process caches the tier, branch and institution dropdown
+-- options (app/reference_cache.py).  This single row holds one counter per
+-- list, bumped by statement-level triggers whenever a statement may have
+-- changed what the list shows, so a process can tell its copy is stale
+-- with one primary-key read instead of scanning the table.  Updates that
+-- only touch other columns (the child counters, modified_at) leave it
+-- alone.
+CREATE TABLE IF NOT EXISTS scm_terran_society.reference_version (
+    version_id INTEGER PRIMARY KEY DEFAULT 1 CHECK (version_id = 1),
+    tiers BIGINT NOT NULL DEFAULT 0,
+    branches BIGINT NOT NULL DEFAULT 0,
+    institutions BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO scm_terran_society.reference_version (version_id) VALUES (1)
+    ON CONFLICT (version_id) DO NOTHING;
+
+-- TG_ARGV: reference_version column to bump
+CREATE OR REPLACE FUNCTION scm_terran_society.bump_reference_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE format('UPDATE scm_terran_society.reference_version SET %1$I = %1$I + 1', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Updates fire only when they set a column the dropdown shows or sorts by
+DO $$
+DECLARE
+    link RECORD;
+BEGIN
+    FOR link IN SELECT * FROM (VALUES
+        ('tier', 'tiers', 'tier_id, tier_name, sort_order'),
+        ('branch', 'branches', 'branch_id, branch_name, sort_order'),
+        ('institution', 'institutions', 'institution_id, institution_name')
+    ) AS l (source, list, columns)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON scm_terran_society.%I',
+                       link.source || '_reference_version', link.source);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT OR UPDATE OF %s OR DELETE OR TRUNCATE
+                            ON scm_terran_society.%I
+                            FOR EACH STATEMENT EXECUTE FUNCTION scm_terran_society.bump_reference_version(%L)',
+                       link.source || '_reference_version', link.columns, link.source, link.list);
+    END LOOP;
+END;
+$$;
+
+COMMENT ON TABLE scm_terran_society.reference_version IS 'Single row of change counters for the cached dropdown lists, kept by bump_reference_version() triggers';
+COMMENT ON FUNCTION scm_terran_society.bump_reference_version() IS 'Bump the reference_version counter named by the trigger argument';
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for the book build stages.
+
+Each stage (pandoc parsing and writing, post-processing, WeasyPrint) stores
+its output under book/.artifact_cache keyed by a hash of everything it was
+built from: input file contents, the code doing the work and the versions
+of the external tools.  A stage whose key is already cached is restored
+instead of re-run, without touching the database.  The cache is bounded by
+TS_BOOK_CACHE_MB and the least recently used artifacts are evicted first.
+"""
+
+import contextlib
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from chapter_cache import file_digest
+
+ARTIFACT_CACHE_DIR = Path(__file__).parent.parent / 'book' / '.artifact_cache'
+
+# Default size budget in megabytes, overridable with TS_BOOK_CACHE_MB
+DEFAULT_BUDGET_MB = 256
+BUDGET_ENV = 'TS_BOOK_CACHE_MB'
+
+
+@functools.lru_cache(maxsize=None)
+def tool_version(name):
+    """Return a version string for an external tool or Python package.
+
+    Missing tools report 'missing' so the key still changes once they are
+    installed.
+    """
+    if name == 'pandoc':
+        try:
+            result = subprocess.run(['pandoc', '--version'], capture_output=True, text=True)
+        except FileNotFoundError:
+            return 'missing'
+        return result.stdout.splitlines()[0] if result.stdout else 'unknown'
+    try:
+        module = __import__(name)
+    except ImportError:
+        return 'missing'
+    return getattr(module, '__version__', 'unknown')
+
+
+def artifact_key(stage, *parts):
+    """Hash a stage name and its inputs into a cache key.
+
+    Parts may be strings (hashed as-is), Paths (hashed by content) or
+    iterables of strings (hashed sorted).
+    """
+    h = hashlib.sha256(stage.encode())
+    for part in parts:
+        if isinstance(part, Path):
+            value = f'{part.name}={file_digest(part)}'
+        elif isinstance(part, str):
+            value = part
+        else:
+            value = '\n'.join(sorted(part))
+        h.update(b'\0' + value.encode())
+    return h.hexdigest()
+
+
+def budget_bytes():
+    """Return the cache size budget in bytes."""
+    try:
+        megabytes = float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB))
+    except ValueError:
+        megabytes = DEFAULT_BUDGET_MB
+    return int(megabytes * 1024 * 1024)
+
+
+def temp_path(path):
+    """A per-process temporary name next to path, for replacing path atomically."""
+    path = Path(path)
+    return path.with_name(f'{path.name}.{os.getpid()}.tmp')
+
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """Yield a temporary path to write; it replaces path only if the block succeeds.
+
+    Readers of path - the web app's /view-pdf, another build - see either
+    the old file or the complete new one, never a partial write.
+    """
+    tmp_path = temp_path(path)
+    try:
+        yield tmp_path
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class ArtifactCache:
+    """Build artifacts on disk, addressed by their input hash, with LRU eviction.
+
+    Recency is the file's modification time, refreshed on every hit.
+    """
+
+    def __init__(self, cache_dir=ARTIFACT_CACHE_DIR, max_bytes=None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = budget_bytes() if max_bytes is None else max_bytes
+
+    def path(self, key):
+        return self.cache_dir / key[:2] / key
+
+    def restore(self, key, output):
+        """Copy the artifact for key to output.  Returns False on a miss.
+
+        An artifact another build evicts while it is being restored is a
+        miss too; output is left as it was.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+            with atomic_output(output) as tmp_path:
+                shutil.copyfile(path, tmp_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key, source):
+        """Store a copy of the file at source under key, then enforce the budget.
+
+        An artifact bigger than the whole budget is not stored, and the one
+        just stored is never evicted to make room.
+        """
+        if Path(source).stat().st_size > self.max_bytes:
+            return
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_output(path) as tmp_path:
+            shutil.copyfile(source, tmp_path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used artifacts, except keep, until the cache fits its budget."""
+        if not self.cache_dir.exists():
+            return
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted by a concurrent build
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark the book pipeline at several data volumes.
+
+For each scale point (synthetic_data.SCALES) the database is refilled with
+synthetic data and each stage is timed in-process, best of --repeat runs:
+
+    db_load         BookSources.preload of every table the chapters read
+    render          every generate_book.py chapter, joined into a manuscript
+    pandoc          manuscript -> AST -> print HTML
+    glossary_links  Aho-Corasick glossary linking of that HTML
+    postprocess     the whole PDF post-processing pass, glossary linking included
+    weasyprint      layout of the post-processed HTML (one run)
+
+Nothing under book/ is touched and no cache is used.  Results are written
+to --output as JSON; --save-baseline stores them as the baseline, and every
+run is compared with the baseline, exiting 1 when a stage got slower by
+more than --tolerance.  Stages whose tool (pandoc, WeasyPrint) is missing
+are skipped.
+
+Refilling is destructive, so point it at a scratch database:
+
+    TS_BOOK_DATABASE=db_terran_society_bench python3 scripts/benchmark_pipeline.py --scales small,medium
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import org_graph
+from artifact_cache import ArtifactCache, tool_version
+from book_db import DEFAULT_DATABASE, get_connection, pg_database
+from generate_book import CHAPTERS, BookSources
+from generate_pdf import (add_blank_page_after_cover, hide_title_block, move_toc_after_dedication,
+                          remove_duplicate_page_breaks)
+from glossary_linker import GlossaryLinker, link_glossary_terms
+from html_postprocess import get_glossary_terms, parse_html, postprocess
+from manuscript_ast import ensure_ast
+from synthetic_data import SCALES, generate
+
+BASE_DIR = Path(__file__).parent.parent
+BASELINE = BASE_DIR / 'benchmarks' / 'pipeline_baseline.json'
+OUTPUT = BASE_DIR / 'benchmarks' / 'pipeline_latest.json'
+CSS_FILE = BASE_DIR / 'templates' / 'book.css'
+
+# Differences below this many seconds are noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def best_of(repeat, func, setup=None):
+    """(best seconds, result of the last run); setup() runs untimed before each run."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = func(arg) if setup else func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def load_sources():
+    conn = get_connection()
+    try:
+        src = BookSources(conn)
+        src.preload({'book_metadata', 'book_author', *org_graph.GRAPH_TABLES})
+        return src
+    finally:
+        conn.close()
+
+
+def render_manuscript(src):
+    return ''.join(''.join(render(src)) for _, _, _, render in CHAPTERS)
+
+
+def pandoc_html(manuscript, workdir):
+    """Print HTML for manuscript, as generate_pdf.py writes it, parsing afresh every time."""
+    ast_file = workdir / 'manuscript.json'
+    html_file = workdir / 'book.html'
+    ensure_ast(manuscript, ast_file, ArtifactCache(workdir / 'cache', max_bytes=0))
+    result = subprocess.run(
+        ['pandoc', str(ast_file), '-o', str(html_file), '-f', 'json', '--standalone',
+         '--toc', '--toc-depth=3', '--css', str(CSS_FILE), '--metadata', 'title=Terran Society'],
+        capture_output=True, text=True, cwd=str(BASE_DIR))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return html_file.read_text(encoding='utf-8')
+
+
+def pdf_postprocess(html, linker):
+    return postprocess(html, [
+        lambda doc: link_glossary_terms(doc, linker),
+        hide_title_block,
+        move_toc_after_dedication,
+        add_blank_page_after_cover,
+        remove_duplicate_page_breaks,
+    ])
+
+
+def benchmark_stages(repeat, workdir, pdf=True):
+    """{stage: {'seconds': best, ...}} for the data currently in the database."""
+    stages = {}
+
+    seconds, src = best_of(repeat, load_sources)
+    stages['db_load'] = {'seconds': seconds}
+    seconds, manuscript = best_of(repeat, lambda: render_manuscript(src))
+    stages['render'] = {'seconds': seconds, 'chars': len(manuscript)}
+    manuscript_file = workdir / 'manuscript.md'
+    manuscript_file.write_text(manuscript, encoding='utf-8')
+
+    try:
+        seconds, html = best_of(repeat, lambda: pandoc_html(manuscript_file, workdir))
+    except FileNotFoundError:
+        print("  pandoc not found - skipping the HTML and PDF stages")
+        return stages
+    stages['pandoc'] = {'seconds': seconds, 'html_kb': round(len(html) / 1024)}
+
+    terms = get_glossary_terms()
+    linker = GlossaryLinker(terms)
+    seconds, links = best_of(repeat, lambda doc: link_glossary_terms(doc, linker),
+                             setup=lambda: parse_html(html))
+    stages['glossary_links'] = {'seconds': seconds, 'terms': len(terms), 'links': links}
+    seconds, formatted = best_of(repeat, lambda: pdf_postprocess(html, linker))
+    stages['postprocess'] = {'seconds': seconds}
+
+    if pdf:
+        try:
+            from weasyprint import HTML
+        except ImportError:
+            print("  WeasyPrint not installed - skipping the PDF stage")
+            return stages
+        html_file = workdir / 'book_pdf.html'
+        html_file.write_text(formatted, encoding='utf-8')
+        seconds, document = best_of(1, lambda: HTML(filename=str(html_file)).render())
+        stages['weasyprint'] = {'seconds': seconds, 'pages': len(document.pages)}
+    return stages
+
+
+def compare(baseline, results, tolerance):
+    """Print each stage against the baseline; returns the number of regressions."""
+    regressions = 0
+    print(f"\n{'scale':<10} {'stage':<16} {'baseline':>10} {'now':>10} {'change':>8}")
+    for scale, result in results['scales'].items():
+        base_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for stage, timing in result['stages'].items():
+            if stage not in base_stages:
+                continue
+            base, now = base_stages[stage]['seconds'], timing['seconds']
+            change = (now - base) / base if base else 0.0
+            regressed = change > tolerance and now - base > MIN_REGRESSION_SECONDS
+            regressions += regressed
+            print(f"{scale:<10} {stage:<16} {base:>9.3f}s {now:>9.3f}s {change:>+7.0%}"
+                  + ('  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the book pipeline at several data volumes.')
+    parser.add_argument('--scales', default='small,medium,large',
+                        help=f"comma-separated scale points from {', '.join(SCALES)} (default: small,medium,large)")
+    parser.add_argument('--current', action='store_true',
+                        help='benchmark the data already in the database instead of generating any')
+    parser.add_argument('--seed', type=int, default=1, help='synthetic data seed (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per stage, best kept (default: 3)')
+    parser.add_argument('--no-pdf', action='store_true', help='skip the WeasyPrint stage')
+    parser.add_argument('--output', type=Path, default=OUTPUT, help=f'results file (default: {OUTPUT})')
+    parser.add_argument('--baseline', type=Path, default=BASELINE, help=f'baseline file (default: {BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown that counts as a regression (default: 0.2 = 20%%)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = ['current'] if args.current else args.scales.split(',')
+    unknown = [s for s in scales if s != 'current' and s not in SCALES]
+    if unknown:
+        print(f"Error: unknown scale {', '.join(unknown)}; choose from {', '.join(SCALES)}")
+        return 1
+    if not args.current and pg_database() == DEFAULT_DATABASE:
+        print(f"Error: the benchmark replaces the data in its database; set TS_BOOK_DATABASE "
+              f"to a scratch database, or use --current to benchmark {DEFAULT_DATABASE} as it is")
+        return 1
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'database': pg_database(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'tools': {'python': platform.python_version(), 'pandoc': tool_version('pandoc'),
+                  'lxml': tool_version('lxml'), 'weasyprint': tool_version('weasyprint')},
+        'scales': {},
+    }
+    for scale in scales:
+        print(f"Scale {scale}...")
+        entry = {}
+        if scale != 'current':
+            entry['counts'] = SCALES[scale]
+            conn = get_connection()
+            try:
+                entry['rows'] = generate(conn, SCALES[scale], args.seed, replace=True)
+            finally:
+                conn.close()
+        with tempfile.TemporaryDirectory() as workdir:
+            entry['stages'] = benchmark_stages(args.repeat, Path(workdir), pdf=not args.no_pdf)
+        for stage, timing in entry['stages'].items():
+            print(f"  {stage:<16} {timing['seconds']:8.3f}s")
+        results['scales'][scale] = entry
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results written to {args.output}")
+
+    regressions = 0
+    if args.baseline.exists() and not args.save_baseline:
+        regressions = compare(json.loads(args.baseline.read_text(encoding='utf-8')), results, args.tolerance)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"{regressions} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Database connections for the book build scripts.
+
+A build reads the database over many statements and, with --jobs, over
+several connections.  To get a consistent point-in-time book the first
+connection opens a REPEATABLE READ transaction and exports its snapshot
+with pg_export_snapshot(); every other reader attaches to that snapshot.
+Child processes (generate_html.py, generate_pdf.py) attach to the snapshot
+named in the TS_BOOK_SNAPSHOT environment variable.
+
+Builds that write the same files are serialised with build_lock(), a
+Postgres advisory lock, whether they come from the web app's build
+queue, build_book.py or the command line.
+"""
+
+import contextlib
+import os
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+import build_profile
+from build_events import log
+
+# PostgreSQL connection settings; TS_BOOK_DATABASE points a build at
+# another database, e.g. one filled by synthetic_data.py
+PG_HOST = 'localhost'
+DATABASE_ENV = 'TS_BOOK_DATABASE'
+DEFAULT_DATABASE = 'db_terran_society'
+PG_USER = 'rock'
+PG_PASSWORD = 'river'
+PG_SCHEMA = 'scm_terran_society'
+
+# Environment variable naming the exported snapshot a build should read from
+SNAPSHOT_ENV = 'TS_BOOK_SNAPSHOT'
+
+
+def pg_database():
+    """Database to connect to, read on every connection so the render worker
+    follows each job's TS_BOOK_DATABASE."""
+    return os.environ.get(DATABASE_ENV) or DEFAULT_DATABASE
+
+
+def _connect_kwargs():
+    kwargs = dict(host=PG_HOST, database=pg_database(), user=PG_USER, password=PG_PASSWORD)
+    # Under --profile, count and time every statement (build_profile.py)
+    if build_profile.enabled():
+        kwargs['connection_factory'] = build_profile.connection_factory()
+    return kwargs
+
+
+def current_snapshot():
+    """Return the snapshot id this process was asked to read from, or None."""
+    return os.environ.get(SNAPSHOT_ENV) or None
+
+
+def attach_snapshot(conn, snapshot_id):
+    """Begin a read-only REPEATABLE READ transaction on conn at snapshot_id.
+
+    The snapshot only stays importable while the exporting transaction is
+    open, and the attachment only lasts for this transaction.
+    """
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    cur = conn.cursor()
+    cur.execute('SET TRANSACTION SNAPSHOT %s', (snapshot_id,))
+    cur.close()
+
+
+def export_snapshot(conn):
+    """Begin a read-only REPEATABLE READ transaction on conn and export its snapshot.
+
+    Keep conn open, and do not commit it, until every reader is done.
+    """
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    cur = conn.cursor()
+    cur.execute('SELECT pg_export_snapshot()')
+    snapshot_id = cur.fetchone()[0]
+    cur.close()
+    return snapshot_id
+
+
+def get_connection(snapshot=None):
+    """Open a connection, attached to `snapshot` or $TS_BOOK_SNAPSHOT if set."""
+    conn = psycopg2.connect(**_connect_kwargs())
+    snapshot = snapshot or current_snapshot()
+    if snapshot:
+        attach_snapshot(conn, snapshot)
+    return conn
+
+
+def get_autocommit_connection():
+    """Open a connection outside any build snapshot, for bookkeeping writes."""
+    conn = psycopg2.connect(**_connect_kwargs())
+    conn.autocommit = True
+    return conn
+
+
+class SnapshotConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """Thread-safe pool whose connections are handed out attached to a snapshot.
+
+    The pool rolls connections back when they are returned, so each
+    checkout starts a fresh transaction on the same snapshot.
+    """
+
+    def __init__(self, minconn, maxconn, snapshot=None, **kwargs):
+        self.snapshot = snapshot
+        super().__init__(minconn, maxconn, **kwargs)
+
+    def getconn(self, key=None):
+        conn = super().getconn(key)
+        idle = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        if self.snapshot and conn.info.transaction_status == idle:
+            attach_snapshot(conn, self.snapshot)
+        return conn
+
+
+def get_connection_pool(size, snapshot=None):
+    """Return a thread-safe pool of up to `size` connections on `snapshot`."""
+    return SnapshotConnectionPool(1, size, snapshot=snapshot or current_snapshot(),
+                                  **_connect_kwargs())
+
+
+@contextlib.contextmanager
+def build_lock(output_set):
+    """Hold the advisory lock for one set of build outputs ('manuscript', 'html', 'pdf').
+
+    Waits while another process builds the same outputs.  The lock lives
+    on its own connection, so closing it releases the lock even if the
+    build dies.
+    """
+    conn = get_autocommit_connection()
+    key = f'ts_book_build:{output_set}'
+    try:
+        cur = conn.cursor()
+        cur.execute('SELECT pg_try_advisory_lock(hashtext(%s))', (key,))
+        if not cur.fetchone()[0]:
+            log(f"Waiting for another {output_set} build to finish...", level='info')
+            cur.execute('SELECT pg_advisory_lock(hashtext(%s))', (key,))
+        yield
+    finally:
+        conn.close()
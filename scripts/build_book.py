@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Build every format of the book with one command.
+
+The build steps form a dependency graph:
+
+    manuscript ──> ast ─┬─> html
+                        ├─> pdf
+                        ├─> odt
+                        └─> epub
+
+The ast node parses the manuscript once into pandoc's JSON AST and every
+writer reads that instead of the Markdown.
+
+Each node runs as an asyncio subprocess as soon as the nodes it depends on
+have finished, so independent formats build concurrently and a full build
+takes about as long as its slowest branch.  A node is skipped when the
+digest of its inputs (its commands, its scripts and the files it reads,
+including the outputs of the nodes before it) matches the last successful
+build and its outputs still exist.  The manuscript node always runs because
+its source is the database; generate_book.py's chapter cache keeps that
+cheap when nothing changed.
+
+Every child reads the same database snapshot, passed in TS_BOOK_SNAPSHOT.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from book_db import SNAPSHOT_ENV, current_snapshot, export_snapshot, get_connection
+from chapter_cache import file_digest
+
+BASE_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+TEMPLATES_DIR = BASE_DIR / 'templates'
+BOOK_DIR = BASE_DIR / 'book'
+STATE_PATH = BOOK_DIR / '.build_state.json'
+
+MANUSCRIPT = BOOK_DIR / 'manuscript.md'
+AST_FILE = BOOK_DIR / 'manuscript.json'
+HTML_FILE = BOOK_DIR / 'TerranSocietyBook.html'
+PDF_FILE = BOOK_DIR / 'TerranSocietyBook.pdf'
+ODT_FILE = BOOK_DIR / 'TerranSocietyBook.odt'
+EPUB_FILE = BOOK_DIR / 'TerranSocietyBook.epub'
+REFERENCE_ODT = BOOK_DIR / 'reference.odt'
+
+
+class Node:
+    """One build step: commands run in order, reading inputs and writing outputs."""
+
+    def __init__(self, name, commands, deps=(), inputs=(), outputs=(), always=False):
+        self.name = name
+        self.commands = commands
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.always = always
+
+
+def python_script(name, *args):
+    return [sys.executable, str(SCRIPTS_DIR / name), *args]
+
+
+def odt_commands():
+    """Pandoc to ODT with native page breaks, then fix the ODT formatting."""
+    cmd = [
+        'pandoc', str(AST_FILE),
+        '-f', 'json',
+        '-o', str(ODT_FILE),
+        '--toc',
+        '--lua-filter', str(SCRIPTS_DIR / 'pagebreak.lua'),
+    ]
+    if REFERENCE_ODT.exists():
+        cmd += ['--reference-doc', str(REFERENCE_ODT)]
+    return [cmd, python_script('fix_odt_formatting.py')]
+
+
+def epub_commands():
+    return [[
+        'pandoc', str(AST_FILE),
+        '-f', 'json',
+        '-o', str(EPUB_FILE),
+        '--toc',
+        '--toc-depth=3',
+        '--css', str(TEMPLATES_DIR / 'book_html.css'),
+        '--metadata', 'title=Terran Society',
+    ]]
+
+
+def build_graph(full=False, jobs=1):
+    """Return the build graph as {name: Node}, in dependency order."""
+    jobs_args = ['--jobs', str(jobs)] if jobs > 1 else []
+    manuscript_args = ['--full'] if full else []
+    manuscript_args += jobs_args
+
+    nodes = [
+        Node('manuscript', [python_script('generate_book.py', *manuscript_args)],
+             outputs=[MANUSCRIPT], always=True),
+        Node('ast', [python_script('manuscript_ast.py')],
+             deps=['manuscript'],
+             inputs=[SCRIPTS_DIR / 'manuscript_ast.py'],
+             outputs=[AST_FILE]),
+        Node('html', [python_script('generate_html.py')],
+             deps=['ast'],
+             inputs=[SCRIPTS_DIR / 'generate_html.py', SCRIPTS_DIR / 'glossary_linker.py',
+                     SCRIPTS_DIR / 'html_postprocess.py', TEMPLATES_DIR / 'book_html.css'],
+             outputs=[HTML_FILE]),
+        Node('pdf', [python_script('generate_pdf.py', *jobs_args)],
+             deps=['ast'],
+             inputs=[SCRIPTS_DIR / 'generate_pdf.py', SCRIPTS_DIR / 'parallel_pdf.py',
+                     SCRIPTS_DIR / 'glossary_linker.py', SCRIPTS_DIR / 'html_postprocess.py',
+                     TEMPLATES_DIR / 'book.css'],
+             outputs=[PDF_FILE]),
+        Node('odt', odt_commands(),
+             deps=['ast'],
+             inputs=[SCRIPTS_DIR / 'fix_odt_formatting.py', SCRIPTS_DIR / 'pagebreak.lua', REFERENCE_ODT],
+             outputs=[ODT_FILE]),
+        Node('epub', epub_commands(),
+             deps=['ast'],
+             inputs=[TEMPLATES_DIR / 'book_html.css'],
+             outputs=[EPUB_FILE]),
+    ]
+    return {node.name: node for node in nodes}
+
+
+def select_nodes(graph, targets):
+    """Restrict the graph to the targets and everything they depend on."""
+    if not targets:
+        return graph
+    wanted = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(graph[name].deps)
+    return {name: node for name, node in graph.items() if name in wanted}
+
+
+def node_key(node, graph):
+    """Digest of everything a node's outputs depend on."""
+    h = hashlib.sha256()
+    for cmd in node.commands:
+        h.update(('\0'.join(cmd) + '\n').encode())
+    inputs = list(node.inputs)
+    for dep in node.deps:
+        inputs += graph[dep].outputs
+    for path in inputs:
+        h.update(f'{path.name}={file_digest(path)}\n'.encode())
+    return h.hexdigest()
+
+
+def load_state():
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    BOOK_DIR.mkdir(parents=True, exist_ok=True)
+    with open(STATE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+async def run_command(cmd, env):
+    """Run one command, returning (returncode, combined output)."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(BASE_DIR),
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        return 127, f'{cmd[0]} not found\n'
+    output, _ = await proc.communicate()
+    return proc.returncode, output.decode('utf-8', errors='replace')
+
+
+async def run_graph(graph, state, env, force=False):
+    """Run every node once its dependencies are done.
+
+    Returns {name: (status, seconds, output)} where status is 'built',
+    'up to date', 'failed' or 'skipped' (a dependency failed).
+    """
+    results = {}
+    tasks = {}
+
+    async def run(node):
+        for dep in node.deps:
+            if not await tasks[dep]:
+                results[node.name] = ('skipped', 0.0, '')
+                return False
+
+        start = time.perf_counter()
+        key = node_key(node, graph)
+        fresh = all(path.exists() for path in node.outputs)
+        if not (force or node.always) and fresh and state.get(node.name) == key:
+            results[node.name] = ('up to date', time.perf_counter() - start, '')
+            return True
+
+        outputs = []
+        for cmd in node.commands:
+            returncode, output = await run_command(cmd, env)
+            outputs.append(output)
+            if returncode != 0:
+                state.pop(node.name, None)
+                results[node.name] = ('failed', time.perf_counter() - start, ''.join(outputs))
+                return False
+
+        # Recompute: the node may have rewritten files it also reads
+        state[node.name] = node_key(node, graph)
+        results[node.name] = ('built', time.perf_counter() - start, ''.join(outputs))
+        return True
+
+    # Tasks only start running once the loop regains control, so every
+    # dependency's task exists before any node awaits it.
+    for name, node in graph.items():
+        tasks[name] = asyncio.ensure_future(run(node))
+    await asyncio.gather(*tasks.values())
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Build the Terran Society book in every format.')
+    parser.add_argument('targets', nargs='*', metavar='target',
+                        help='nodes to build with their dependencies '
+                             '(manuscript, ast, html, pdf, odt, epub; default: all)')
+    parser.add_argument('--full', action='store_true',
+                        help='rebuild every node and re-render every chapter')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='worker processes for manuscript and PDF rendering (default: 1)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='print the output of every node, not just failed ones')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    graph = build_graph(full=args.full, jobs=args.jobs)
+    unknown = [t for t in args.targets if t not in graph]
+    if unknown:
+        print(f"Error: unknown target(s): {', '.join(unknown)}. Choose from: {', '.join(graph)}")
+        return 2
+    graph = select_nodes(graph, args.targets)
+
+    print(f"Building {', '.join(graph)}...")
+    state = load_state()
+    build_start = time.perf_counter()
+
+    # The exporting transaction must stay open until every child is done
+    conn = get_connection()
+    try:
+        env = dict(os.environ)
+        env[SNAPSHOT_ENV] = current_snapshot() or export_snapshot(conn)
+        results = asyncio.run(run_graph(graph, state, env, force=args.full))
+    finally:
+        conn.close()
+
+    save_state(state)
+    wall = time.perf_counter() - build_start
+
+    failed = False
+    for name, (status, seconds, output) in results.items():
+        if output and (args.verbose or status == 'failed'):
+            print(f"--- {name} ---")
+            print(output.rstrip())
+        failed = failed or status in ('failed', 'skipped')
+
+    print("\nNode timings:")
+    for name in graph:
+        status, seconds, _ = results[name]
+        mark = '✓' if status in ('built', 'up to date') else '✗'
+        print(f"  {mark} {name:<12} {seconds:7.2f}s  {status}")
+    total = sum(seconds for _, seconds, _ in results.values())
+    print(f"  Wall time {wall:.2f}s (sum of nodes {total:.2f}s)")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Structured progress events for the build scripts.
+
+The scripts report progress through emit(), log() and stage() instead of
+bare print() calls.  Each event still prints its one-line message, and
+when the build runs as a queued job (app/build_worker.py sets
+TS_BOOK_JOB_ID) it is also stored in scm_terran_society.build_job_event,
+which the web app streams to the dashboard over Server-Sent Events.
+
+Events and their fields:
+    stage_started     stage
+    stage_finished    stage, seconds, cpu_seconds, rss_peak_mb, py_peak_mb (with
+                      TS_BOOK_TRACEMALLOC set), plus anything the stage recorded
+    chapter_rendered  chapter
+    glossary_linked   terms, links
+    pages_laid_out    pages (and part, for parallel PDF rendering)
+    message           level: 'info', 'warning' or 'error'
+Every event also carries `elapsed`, the seconds since the build started.
+
+Finished stages are also kept in memory; stage_timings() returns them for
+the build's generated_document row (build_history.py).  Peak memory and
+the memory budget are handled by build_memory.py.
+"""
+import contextlib
+import os
+import resource
+import time
+
+from build_memory import track as track_memory
+from build_profile import profile_stage
+
+# Environment variable naming the build_job row events belong to
+JOB_ENV = 'TS_BOOK_JOB_ID'
+
+def cpu_time():
+    """CPU seconds used by this process and its finished children (pandoc, pool workers)."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+_state = {'started': time.perf_counter(), 'cpu_started': cpu_time(),
+          'job_id': None, 'conn': None, 'stages': []}
+
+
+def reset():
+    """Start timing a new build (the render worker runs many in one process)."""
+    _close()
+    _state['started'] = time.perf_counter()
+    _state['cpu_started'] = cpu_time()
+    _state['stages'] = []
+
+
+def build_totals():
+    """(wall seconds, CPU seconds) since the build started."""
+    return time.perf_counter() - _state['started'], cpu_time() - _state['cpu_started']
+
+
+def stage_timings():
+    """{stage: {'wall': s, 'cpu': s, 'rss_peak_mb': MB[, 'py_peak_mb': MB]}} for the stages finished so far.
+
+    A stage that ran more than once has its times summed and its peaks
+    maximised.  Stages can nest (glossary_links runs inside postprocess),
+    so the values overlap.
+    """
+    timings = {}
+    for name, wall, cpu, memory in _state['stages']:
+        timing = timings.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+        timing['wall'] = round(timing['wall'] + wall, 3)
+        timing['cpu'] = round(timing['cpu'] + cpu, 3)
+        for key, peak in memory.items():
+            timing[key] = max(timing.get(key, 0), peak)
+    return timings
+
+
+def peak_rss_mb():
+    """Highest resident set size seen in any stage so far, or None."""
+    return max((memory['rss_peak_mb'] for *_, memory in _state['stages']
+                if 'rss_peak_mb' in memory), default=None)
+
+
+def _close():
+    if _state['conn'] is not None:
+        with contextlib.suppress(Exception):
+            _state['conn'].close()
+    _state['conn'] = None
+    _state['job_id'] = None
+
+
+def _store(event, payload):
+    """Insert the event for the current job; progress reporting never fails a build."""
+    job_id = os.environ.get(JOB_ENV)
+    if not job_id:
+        return
+    try:
+        import psycopg2.extras
+        from book_db import get_autocommit_connection
+
+        if _state['conn'] is None or _state['job_id'] != job_id:
+            _close()
+            _state['conn'] = get_autocommit_connection()
+            _state['job_id'] = job_id
+        with _state['conn'].cursor() as cur:
+            cur.execute(
+                'INSERT INTO scm_terran_society.build_job_event (job_id, event, payload) '
+                'VALUES (%s, %s, %s)',
+                (int(job_id), event, psycopg2.extras.Json(payload)))
+    except Exception as e:
+        print(f"Warning: could not record build progress ({e})")
+        os.environ.pop(JOB_ENV, None)
+        _close()
+
+
+def emit(event, message=None, **fields):
+    """Report one progress event, printing message if there is one."""
+    if message:
+        print(message)
+    payload = dict(fields, elapsed=round(time.perf_counter() - _state['started'], 3))
+    if message:
+        payload['message'] = message
+    _store(event, payload)
+
+
+def log(message, level='info'):
+    """Report a free-form message ('info', 'warning' or 'error')."""
+    emit('message', message, level=level)
+
+
+@contextlib.contextmanager
+def stage(name, message=None):
+    """Report the start and end of a build stage and its wall time.
+
+    Yields a dict; anything the stage puts in it (e.g. cached=True) is
+    added to the stage_finished event, which is printed with the stage's
+    peak memory.  Under --profile the stage also runs under cProfile
+    (build_profile.py).
+    """
+    emit('stage_started', message, stage=name)
+    details = {}
+    start = time.perf_counter()
+    start_cpu = cpu_time()
+    try:
+        with track_memory(name, details), profile_stage(name):
+            yield details
+    except BaseException:
+        details['failed'] = True
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        cpu = cpu_time() - start_cpu
+        memory = {key: details[key] for key in ('rss_peak_mb', 'py_peak_mb') if key in details}
+        _state['stages'].append((name, wall, cpu, memory))
+        summary = f"  {name}: {wall:.2f}s"
+        if 'rss_peak_mb' in memory:
+            summary += f", peak RSS {memory['rss_peak_mb']:.0f} MB"
+        if 'py_peak_mb' in memory:
+            summary += f", Python heap peak {memory['py_peak_mb']:.0f} MB"
+        emit('stage_finished', summary, stage=name, seconds=round(wall, 3), cpu_seconds=round(cpu, 3),
+             **details)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Build history: one scm_terran_society.generated_document row per artifact.
+
+Each build script records the file it produced together with the hash of
+its inputs, its size and checksum, and the wall and CPU time and peak
+memory of the build and of every stage (from build_events), so a slower
+or larger build can be matched to the data or code change that caused it.
+"""
+import getpass
+import os
+import socket
+from pathlib import Path
+
+from build_events import JOB_ENV, build_totals, log, peak_rss_mb, stage_timings
+from chapter_cache import file_digest
+
+
+def current_version_id(cur):
+    """version_id of the book's current version, adding its book_version row if needed."""
+    cur.execute('SELECT current_version FROM scm_terran_society.book_metadata ORDER BY metadata_id LIMIT 1')
+    row = cur.fetchone()
+    version = (row[0] if row else None) or '0.1'
+    cur.execute(
+        'INSERT INTO scm_terran_society.book_version (version_number, version_name) VALUES (%s, %s) '
+        'ON CONFLICT (version_number) DO NOTHING',
+        (version, f'Draft v{version}'))
+    cur.execute('SELECT version_id FROM scm_terran_society.book_version WHERE version_number = %s', (version,))
+    return cur.fetchone()[0]
+
+
+def record_document(doc_format, path, input_hash, **metadata):
+    """Record a generated artifact and this build's timings.
+
+    doc_format is one of generated_document's formats ('markdown', 'html',
+    'pdf', ...).  Extra keyword arguments go into the metadata column.
+    A failure is reported as a warning; it never fails the build.
+    """
+    import psycopg2.extras
+    from book_db import get_autocommit_connection
+
+    path = Path(path)
+    wall, cpu = build_totals()
+    job_id = os.environ.get(JOB_ENV)
+    generated_by = f'job {job_id}' if job_id else f'{getpass.getuser()}@{socket.gethostname()}'
+    try:
+        conn = get_autocommit_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    'INSERT INTO scm_terran_society.generated_document '
+                    '(version_id, format, file_path, file_size, checksum, generated_by, metadata, '
+                    ' input_hash, wall_seconds, cpu_seconds, peak_rss_mb, stage_timings, job_id) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                    (current_version_id(cur), doc_format, str(path), path.stat().st_size,
+                     file_digest(path), generated_by, psycopg2.extras.Json(metadata),
+                     input_hash, round(wall, 3), round(cpu, 3), peak_rss_mb(),
+                     psycopg2.extras.Json(stage_timings()), int(job_id) if job_id else None))
+        finally:
+            conn.close()
+    except Exception as e:
+        log(f"Warning: could not record build history ({e})", level='warning')
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Memory high-water marks for the build stages, and the build's memory budget.
+
+While a build_events.stage() runs, a sampler thread reads this process's
+resident set size every SAMPLE_INTERVAL seconds, and each stage reports
+the highest value it saw as rss_peak_mb.  With TS_BOOK_TRACEMALLOC=1 the
+Python heap is traced as well (py_peak_mb); tracing slows the allocation
+heavy stages noticeably, so it is off by default.
+
+TS_BOOK_MEMORY_BUDGET_MB sets a budget.  When the resident set goes over
+it the sampler signals the main thread (SIGUSR1), whose handler stops the
+running stage, so the build fails with MemoryBudgetExceeded naming the
+stage instead of running on until the container is OOM-killed.  A signal
+that arrives after the stages have ended is ignored, so it cannot hit a
+long-lived process (the render worker) between jobs; the budget is also
+checked whenever a stage starts or ends.
+Only this process is measured: pandoc and the --jobs worker processes
+are not.
+"""
+import contextlib
+import os
+import resource
+import signal
+import sys
+import threading
+import tracemalloc
+
+# Environment variables configuring memory reporting
+BUDGET_ENV = 'TS_BOOK_MEMORY_BUDGET_MB'
+TRACEMALLOC_ENV = 'TS_BOOK_TRACEMALLOC'
+
+SAMPLE_INTERVAL = 0.05
+
+MB = 1024 * 1024
+
+_lock = threading.Lock()
+_state = {'active': [], 'stop': None, 'sampler': None, 'over': None, 'tracing': False,
+          'handler_installed': False}
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    pass
+
+
+class _OverBudget(BaseException):
+    """Raised in the main thread by the budget signal; track() turns it into MemoryBudgetExceeded."""
+
+
+def _on_budget_signal(signum, frame):
+    # Only stop a stage that is still running; a late signal is dropped
+    if _state['active'] and _state['over'] is not None:
+        raise _OverBudget
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # No procfs (macOS): the peak so far is the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def budget_bytes():
+    """The memory budget in bytes, or None when there is none."""
+    value = os.environ.get(BUDGET_ENV)
+    return int(float(value) * MB) if value else None
+
+
+def _observe(rss):
+    """Fold an RSS sample and the traced heap peak into every active stage (hold _lock)."""
+    for mark in _state['active']:
+        mark['rss'] = max(mark['rss'], rss)
+    if _state['tracing']:
+        peak = tracemalloc.get_traced_memory()[1]
+        for mark in _state['active']:
+            mark['py'] = max(mark['py'], peak)
+        tracemalloc.reset_peak()
+
+
+def _sample(stop, budget, interrupt):
+    while not stop.wait(SAMPLE_INTERVAL):
+        rss = rss_bytes()
+        with _lock:
+            _observe(rss)
+            if budget and rss > budget and _state['over'] is None and _state['active']:
+                _state['over'] = (_state['active'][-1]['name'], rss)
+                if interrupt:
+                    signal.pthread_kill(threading.main_thread().ident, signal.SIGUSR1)
+
+
+def _start():
+    _state['over'] = None
+    _state['tracing'] = bool(os.environ.get(TRACEMALLOC_ENV)) and not tracemalloc.is_tracing()
+    if _state['tracing']:
+        tracemalloc.start()
+    # Only the main thread can be signalled; elsewhere the budget is checked at stage boundaries
+    interrupt = threading.current_thread() is threading.main_thread() and hasattr(signal, 'pthread_kill')
+    if interrupt and not _state['handler_installed']:
+        # Stays installed: a signal sent just before the sampler stopped may
+        # still arrive, and the default SIGUSR1 action would kill the process
+        signal.signal(signal.SIGUSR1, _on_budget_signal)
+        _state['handler_installed'] = True
+    _state['stop'] = threading.Event()
+    _state['sampler'] = threading.Thread(target=_sample, daemon=True,
+                                         args=(_state['stop'], budget_bytes(), interrupt))
+    _state['sampler'].start()
+
+
+def _stop():
+    _state['stop'].set()
+    _state['sampler'].join()
+    if _state['tracing']:
+        tracemalloc.stop()
+    _state.update(stop=None, sampler=None, over=None, tracing=False)
+
+
+def _exceeded(over):
+    name, rss = over
+    return MemoryBudgetExceeded(
+        f"Build stopped: memory use reached {rss / MB:.0f} MB during the {name} stage, "
+        f"over the {budget_bytes() / MB:.0f} MB budget set by {BUDGET_ENV}")
+
+
+@contextlib.contextmanager
+def track(name, details):
+    """Record the stage's peak memory in details; fail if it goes over the budget."""
+    outermost = not _state['active']
+    if outermost:
+        _start()
+    mark = {'name': name, 'rss': 0, 'py': 0}
+    with _lock:
+        over = _state['over']
+        if over is None:
+            _observe(rss_bytes())
+            _state['active'].append(mark)
+            _observe(rss_bytes())
+    if over is not None:
+        # An enclosing stage already went over the budget: stop at this boundary
+        raise _exceeded(over)
+    try:
+        yield
+    except _OverBudget:
+        pass
+    finally:
+        rss = rss_bytes()
+        budget = budget_bytes()
+        with _lock:
+            _observe(rss)
+            _state['active'].pop()
+            if budget and rss > budget and _state['over'] is None:
+                _state['over'] = (name, rss)
+            over = _state['over']
+        details['rss_peak_mb'] = round(mark['rss'] / MB, 1)
+        if _state['tracing']:
+            details['py_peak_mb'] = round(mark['py'] / MB, 1)
+        if outermost:
+            _stop()
+    if over is not None:
+        raise _exceeded(over)
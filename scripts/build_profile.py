@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+--profile support for the build scripts.
+
+While profiling is on:
+
+- every outermost build_events.stage() runs under cProfile; its stats are
+  written to book/.profile/<script>-<stage>.prof (open them with
+  `python3 -m pstats` or snakeviz) and the top functions by cumulative
+  time are printed when the build ends;
+- every SQL statement run on a book_db connection is counted and timed
+  against the innermost stage running it (chapters read preloaded data,
+  so nearly all SQL lands in db_load).
+
+A summary of both is also written to book/.profile/<script>-summary.json.
+With --jobs N only the main process is profiled; chapters and PDF parts
+rendered in worker processes are not.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+from pathlib import Path
+
+PROFILE_DIR = Path(__file__).parent.parent / 'book' / '.profile'
+
+DEFAULT_TOP = 15
+
+_state = {'script': None, 'dir': None, 'top': DEFAULT_TOP, 'profiling': False,
+          'stages': [], 'scopes': [], 'sql': {}}
+
+
+def add_arguments(parser):
+    """Add --profile and --profile-top to a script's argument parser."""
+    parser.add_argument('--profile', nargs='?', const=PROFILE_DIR, type=Path, metavar='DIR',
+                        help=f'profile each stage and count SQL per stage, writing to DIR (default: {PROFILE_DIR})')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP, metavar='N',
+                        help=f'functions to list per stage in the profile summary (default: {DEFAULT_TOP})')
+
+
+def start(script, profile_dir=PROFILE_DIR, top=DEFAULT_TOP):
+    """Turn profiling on for this build of `script`."""
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    _state.update(script=script, dir=profile_dir, top=top, profiling=False,
+                  stages=[], scopes=[], sql={})
+
+
+def enabled():
+    return _state['script'] is not None
+
+
+@contextlib.contextmanager
+def profile_stage(name):
+    """Run a stage under cProfile, unless profiling is off or an outer stage is profiled."""
+    if not enabled() or _state['profiling']:
+        with _scope(name):
+            yield
+        return
+    profiler = cProfile.Profile()
+    _state['profiling'] = True
+    try:
+        with _scope(name):
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+    finally:
+        _state['profiling'] = False
+        path = _state['dir'] / f"{_state['script']}-{name}.prof"
+        profiler.dump_stats(str(path))
+        _state['stages'].append((name, path, _top_functions(profiler, _state['top'])))
+
+
+def _top_functions(profiler, top):
+    """[(cumulative seconds, calls, 'file:line(function)')] of the costliest functions."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, _, cumulative, _) in stats.stats.items():
+        rows.append((cumulative, calls, f'{Path(filename).name}:{line}({function})'))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+@contextlib.contextmanager
+def _scope(label):
+    """Attribute SQL run inside the block to label (a stage name)."""
+    if enabled():
+        _state['sql'].setdefault(label, (0, 0.0))
+    _state['scopes'].append(label)
+    try:
+        yield
+    finally:
+        _state['scopes'].pop()
+
+
+def record_sql(seconds):
+    label = _state['scopes'][-1] if _state['scopes'] else 'other'
+    count, total = _state['sql'].get(label, (0, 0.0))
+    _state['sql'][label] = (count + 1, total + seconds)
+
+
+class _TimedCursorMixin:
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_sql(time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_sql(time.perf_counter() - start)
+
+
+_factories = {}
+
+
+def _timed_cursor(cursor_class):
+    if cursor_class not in _factories:
+        _factories[cursor_class] = type(f'Timed{cursor_class.__name__}',
+                                        (_TimedCursorMixin, cursor_class), {})
+    return _factories[cursor_class]
+
+
+def connection_factory():
+    """psycopg2 connection class whose cursors, of any cursor_factory, report their statements.
+
+    Built on first use so the scripts that never profile need not import psycopg2.
+    """
+    if 'connection' not in _factories:
+        import psycopg2.extensions
+
+        class ProfilingConnection(psycopg2.extensions.connection):
+            def cursor(self, *args, cursor_factory=None, **kwargs):
+                base = cursor_factory or self.cursor_factory or psycopg2.extensions.cursor
+                return super().cursor(*args, cursor_factory=_timed_cursor(base), **kwargs)
+
+        _factories['connection'] = ProfilingConnection
+    return _factories['connection']
+
+
+def finish():
+    """Print the profile summary, write it as JSON and turn profiling off."""
+    if not enabled():
+        return
+    script, profile_dir = _state['script'], _state['dir']
+    summary = {'stages': {}, 'sql': {}}
+
+    print(f"\nProfile of {script} ({profile_dir})")
+    for name, path, rows in _state['stages']:
+        print(f"  {name}: {path.name}")
+        for cumulative, calls, function in rows:
+            print(f"    {cumulative:9.3f}s {calls:9d}  {function}")
+        summary['stages'][name] = {
+            'prof': str(path),
+            'top': [{'function': f, 'calls': c, 'cumulative': round(t, 6)} for t, c, f in rows],
+        }
+
+    print("  SQL by stage:")
+    print(f"    {'stage':<28} {'statements':>10} {'db time':>10}")
+    for label, (count, seconds) in sorted(_state['sql'].items(), key=lambda item: -item[1][1]):
+        print(f"    {label:<28} {count:>10d} {seconds:>9.3f}s")
+        summary['sql'][label] = {'statements': count, 'seconds': round(seconds, 6)}
+
+    with open(profile_dir / f'{script}-summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    _state['script'] = None
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Per-chapter cache for incremental manuscript builds.
+
+Each chapter's rendered Markdown is stored under book/.chapter_cache together
+with the fingerprint of the rows it was rendered from.  A chapter is only
+re-rendered when that fingerprint changes.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+SCHEMA = 'scm_terran_society'
+
+# Characters of Markdown held in memory before a fragment buffer is flushed
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Tables a chapter can read -> primary key column (fixes the hash order)
+FINGERPRINT_TABLES = {
+    'book_metadata': 'metadata_id',
+    'book_author': 'author_id',
+    'tier': 'tier_id',
+    'tier_explain': 'explain_id',
+    'branch': 'branch_id',
+    'institution': 'institution_id',
+    'institution_explain': 'explain_id',
+    'role': 'role_id',
+    'role_duty': 'duty_id',
+    'role_explain': 'explain_id',
+    'process': 'process_id',
+}
+
+# Trigger-kept child counters (scripts/add_child_counters.sql).  Chapters
+# never print them and the child tables are fingerprinted themselves, so
+# they are left out of the hashed row: adding a duty must not dirty every
+# chapter that reads role.
+COUNTER_COLUMNS = {
+    'tier': ('institution_count', 'explain_count'),
+    'branch': ('institution_count',),
+    'institution': ('role_count', 'explain_count'),
+    'role': ('duty_count', 'explain_count'),
+}
+
+
+def table_fingerprints(conn, tables):
+    """Return {table: fingerprint} for the given tables in a single statement.
+
+    The fingerprint is the row count plus an md5 over every row, computed
+    server-side so no row data crosses the wire.  Not every table carries a
+    modified_at column, so row contents are hashed instead, minus any
+    COUNTER_COLUMNS.
+    """
+    tables = sorted(set(tables))
+    if not tables:
+        return {}
+    parts = []
+    for table in tables:
+        pk = FINGERPRINT_TABLES[table]
+        counters = COUNTER_COLUMNS.get(table)
+        row = (f"(to_jsonb(t) - ARRAY[{', '.join(repr(c) for c in counters)}])::text"
+               if counters else 't::text')
+        parts.append(
+            f"SELECT '{table}', COUNT(*), "
+            f"md5(COALESCE(string_agg(md5({row}), '' ORDER BY t.{pk}), '')) "
+            f"FROM {SCHEMA}.{table} t"
+        )
+    cur = conn.cursor()
+    cur.execute(' UNION ALL '.join(parts))
+    fingerprints = {table: f'{count}:{digest}' for table, count, digest in cur.fetchall()}
+    cur.close()
+    return fingerprints
+
+
+def file_digest(path):
+    """Return the sha256 of a file's contents, or 'missing'."""
+    path = Path(path)
+    if not path.exists():
+        return 'missing'
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def chapter_key(code_digest, tables, fingerprints, files=()):
+    """Build a chapter's cache key from its code, source tables and input files."""
+    h = hashlib.sha256(code_digest.encode())
+    for table in sorted(tables):
+        h.update(f'|{table}={fingerprints[table]}'.encode())
+    for path in files:
+        h.update(f'|{Path(path).name}={file_digest(path)}'.encode())
+    return h.hexdigest()
+
+
+def write_fragments(f, fragments, buffer_size=WRITE_BUFFER_SIZE):
+    """Stream an iterable of text fragments to f with bounded buffering.
+
+    Fragments are joined in batches of roughly buffer_size characters, so
+    memory stays flat and work stays linear however large a chapter grows.
+    """
+    buffer = []
+    buffered = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= buffer_size:
+            f.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        f.write(''.join(buffer))
+
+
+class ChapterCache:
+    """Rendered chapter fragments on disk, keyed by source fingerprint."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.manifest_path = self.cache_dir / 'manifest.json'
+        self.manifest = {}
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                self.manifest = {}
+
+    def path(self, name):
+        return self.cache_dir / f'{name}.md'
+
+    def get(self, name, key):
+        """Return the cached fragment path if it is still valid, else None."""
+        path = self.path(name)
+        if self.manifest.get(name) == key and path.exists():
+            return path
+        return None
+
+    def write(self, name, fragments):
+        """Stream a rendered chapter to its fragment file and return the path.
+
+        The manifest is not touched, so worker processes can write fragments
+        while the parent owns the manifest.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(name)
+        tmp_path = path.with_suffix('.md.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write_fragments(f, fragments)
+        tmp_path.replace(path)
+        return path
+
+    def put(self, name, key, fragments):
+        """Store a freshly rendered chapter under its key and return its fragment path."""
+        path = self.write(name, fragments)
+        self.manifest[name] = key
+        return path
+
+    def save(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
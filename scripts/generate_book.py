@@ -3,33 +3,32 @@
 Generate the Terran Society book manuscript in Markdown format.
 """
 
+import argparse
+import hashlib
+import multiprocessing
 import psycopg2
 import psycopg2.extras
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-# PostgreSQL connection settings
-PG_HOST = 'localhost'
-PG_DATABASE = 'db_terran_society'
-PG_USER = 'rock'
-PG_PASSWORD = 'river'
-PG_SCHEMA = 'scm_terran_society'
+import build_profile
+import org_graph
+from artifact_cache import atomic_output
+from book_db import build_lock, current_snapshot, export_snapshot, get_connection, get_connection_pool
+from build_events import emit, log, stage
+from build_history import record_document
+from chapter_cache import ChapterCache, chapter_key, table_fingerprints
+from org_graph import load_org_graph, load_org_graph_pooled
 
 INPUTS_PATH = Path(__file__).parent.parent / 'inputs'
 OUTPUT_PATH = Path(__file__).parent.parent / 'book' / 'manuscript.md'
-
-def get_connection():
-    conn = psycopg2.connect(
-        host=PG_HOST,
-        database=PG_DATABASE,
-        user=PG_USER,
-        password=PG_PASSWORD
-    )
-    return conn
+CHAPTER_CACHE_DIR = Path(__file__).parent.parent / 'book' / '.chapter_cache'
+RIGHTS_FILE = INPUTS_PATH / 'trifold-basic-rights_2021April-reformatJul2025.txt'
 
 def load_rights():
     """Load Rights of the People from source"""
-    rights_file = INPUTS_PATH / 'trifold-basic-rights_2021April-reformatJul2025.txt'
-    with open(rights_file, 'r', encoding='utf-8') as f:
+    with open(RIGHTS_FILE, 'r', encoding='utf-8') as f:
         content = f.read()
     
     # Extract rights section
@@ -90,86 +89,83 @@ def load_authors(conn):
 
 def generate_title_page(metadata):
     """Generate title page with Pandoc metadata."""
-    md = f"---\n"
-    md += f"title: \"{metadata['title']}\"\n"
+    yield f"---\n"
+    yield f"title: \"{metadata['title']}\"\n"
     if metadata.get('subtitle'):
-        md += f"subtitle: \"{metadata['subtitle']}\"\n"
-    md += f"author: \"Angelo Patrick Arteman\"\n"
+        yield f"subtitle: \"{metadata['subtitle']}\"\n"
+    yield f"author: \"Angelo Patrick Arteman\"\n"
     
     # Add version and date 
     if metadata.get('current_version'):
-        md += f"version: \"{metadata['current_version']}\"\n"
+        yield f"version: \"{metadata['current_version']}\"\n"
     if metadata.get('version_date'):
-        md += f"date: \"{metadata['version_date']}\"\n"
+        yield f"date: \"{metadata['version_date']}\"\n"
     
-    md += f"---\n\n"
+    yield f"---\n\n"
     
     # Cover page - title, subtitle, author, date all centered
-    md += '<div class="cover-page">\n\n'
-    md += f'# {metadata["title"]}\n\n'
+    yield '<div class="cover-page">\n\n'
+    yield f'# {metadata["title"]}\n\n'
     if metadata.get('subtitle'):
-        md += f'**{metadata["subtitle"]}**\n\n'
-    md += '\n\n\n\n\n\n'  # More white space after subtitle
-    md += '<span class="cover-author">Angelo Patrick Arteman</span>\n\n'
+        yield f'**{metadata["subtitle"]}**\n\n'
+    yield '\n\n\n\n\n\n'  # More white space after subtitle
+    yield '<span class="cover-author">Angelo Patrick Arteman</span>\n\n'
     if metadata.get('version_date'):
-        md += f'<span class="cover-date">{metadata["version_date"]}</span>\n\n'
-    md += '</div>\n\n'
+        yield f'<span class="cover-date">{metadata["version_date"]}</span>\n\n'
+    yield '</div>\n\n'
     
-    md += "<div style='page-break-after: always;'></div>\n\n"
-    return md
+    yield "<div style='page-break-after: always;'></div>\n\n"
 
 def generate_author_page(metadata, authors):
     """Generate author page with title, subtitle, author and copyright - all centered."""
-    md = '<div class="author-page">\n\n'
+    yield '<div class="author-page">\n\n'
     
     # Title and subtitle
-    md += f'{metadata["title"]}\n\n'
+    yield f'{metadata["title"]}\n\n'
     if metadata.get('subtitle'):
-        md += f'{metadata["subtitle"]}\n\n'
+        yield f'{metadata["subtitle"]}\n\n'
     
-    md += "\n\n\n\n"  # White space
+    yield "\n\n\n\n"  # White space
     
     # Author
     for author in authors:
-        md += f"{author['author_name']}"
+        yield f"{author['author_name']}"
         if author.get('author_role'):
-            md += f", {author['author_role']}"
-        md += "\n\n"
+            yield f", {author['author_role']}"
+        yield "\n\n"
     
     # Copyright
     if metadata.get('copyright_holder') and metadata.get('copyright_year'):
-        md += f"© {metadata['copyright_year']} {metadata['copyright_holder']}\n\n"
+        yield f"© {metadata['copyright_year']} {metadata['copyright_holder']}\n\n"
     
-    md += '</div>\n\n'
-    md += "<div style='page-break-after: always;'></div>\n\n"
+    yield '</div>\n\n'
+    yield "<div style='page-break-after: always;'></div>\n\n"
     # Add blank page before dedication
-    md += "<div class='blank-page'></div>\n\n"
-    return md
+    yield "<div class='blank-page'></div>\n\n"
 
 def generate_dedication_page(metadata):
     """Generate dedication page - centered."""
     if not metadata.get('dedication_text'):
-        return ""
+        return
     
-    md = '<div class="dedication-page">\n\n'
-    md += "## Dedication\n\n"
-    md += f"{metadata['dedication_text']}\n\n"
+    yield '<div class="dedication-page">\n\n'
+    yield "## Dedication\n\n"
+    yield f"{metadata['dedication_text']}\n\n"
     if metadata.get('dedication_attribution'):
-        md += f"{metadata['dedication_attribution']}\n\n"
-    md += '</div>\n\n'
+        yield f"{metadata['dedication_attribution']}\n\n"
+    yield '</div>\n\n'
     
     # Page break after dedication - TOC will be inserted here by post-processing
-    md += "<div style='page-break-after: always;'></div>\n\n"
-    return md
+    yield "<div style='page-break-after: always;'></div>\n\n"
 
 def generate_table_of_contents():
     """Generate placeholder for table of contents."""
     # Pandoc will insert TOC automatically with --toc flag
     # No additional page breaks needed here - TOC will be moved by post-processing
-    return ""
+    return iter(())
 
 def generate_introduction():
-    return """# Terran Society: A New Social Contract
+    yield """# Terran Society: A New Social Contract
 
 ## Introduction
 
@@ -213,259 +209,199 @@ Throughout this book, terms appearing in the Glossary are capitalized when refer
 """
 
 def generate_principles(principles):
-    md = "<div style='page-break-before: always;'></div>\n\n## Basic Principles of Terran Society\n\n"
-    md += "These eight principles guide all operations and decisions within Terran Society. They serve as a philosophical foundation ensuring that systems remain focused on member welfare, transparency, and sustainability.\n\n"
+    yield "<div style='page-break-before: always;'></div>\n\n## Basic Principles of Terran Society\n\n"
+    yield "These eight principles guide all operations and decisions within Terran Society. They serve as a philosophical foundation ensuring that systems remain focused on member welfare, transparency, and sustainability.\n\n"
     
     for i, (title, desc) in enumerate(principles, 1):
-        md += f"### Principle {i}: {title}\n\n"
-        md += f"{desc}\n\n"
+        yield f"### Principle {i}: {title}\n\n"
+        yield f"{desc}\n\n"
         
         # Add elaboration
         if i == 1:
-            md += "This principle recognizes that an informed citizenry is the only reliable check on power. All meetings of governing bodies must be observed by Fair Witnesses, and records must be freely accessible. Secret legislation or hidden agendas cannot exist in this system.\n\n"
+            yield "This principle recognizes that an informed citizenry is the only reliable check on power. All meetings of governing bodies must be observed by Fair Witnesses, and records must be freely accessible. Secret legislation or hidden agendas cannot exist in this system.\n\n"
         elif i == 2:
-            md += "Society management exists to serve the people, not the other way around. Every system, service, and structure must be evaluated based on whether it benefits all members. Policies that advantage one group at the expense of others violate this principle.\n\n"
+            yield "Society management exists to serve the people, not the other way around. Every system, service, and structure must be evaluated based on whether it benefits all members. Policies that advantage one group at the expense of others violate this principle.\n\n"
         elif i == 3:
-            md += "Humans are part of a larger ecological community. Our survival depends on clean air, water, and soil. This principle establishes environmental protection not as an optional add-on, but as a core requirement. The Environmental Guardian role exists at both Regional and World levels to enforce this principle.\n\n"
+            yield "Humans are part of a larger ecological community. Our survival depends on clean air, water, and soil. This principle establishes environmental protection not as an optional add-on, but as a core requirement. The Environmental Guardian role exists at both Regional and World levels to enforce this principle.\n\n"
         elif i == 4:
-            md += "No Region should receive preferential treatment in the allocation of resources or services. This ensures fairness and prevents regional rivalry. World-level services are distributed equally per Region regardless of population, wealth, or political influence.\n\n"
+            yield "No Region should receive preferential treatment in the allocation of resources or services. This ensures fairness and prevents regional rivalry. World-level services are distributed equally per Region regardless of population, wealth, or political influence.\n\n"
         elif i == 5:
-            md += "Short-term thinking creates long-term problems. Terran Society requires that infrastructure be built to last generations, minimizing the burden on future members. This principle encourages renewable energy, durable materials, and efficient design.\n\n"
+            yield "Short-term thinking creates long-term problems. Terran Society requires that infrastructure be built to last generations, minimizing the burden on future members. This principle encourages renewable energy, durable materials, and efficient design.\n\n"
         elif i == 6:
-            md += "Resilience comes from local self-sufficiency. While trade and cooperation between Regions are encouraged, each Region should be capable of meeting its own basic needs. This prevents cascading failures and reduces vulnerability to disruption.\n\n"
+            yield "Resilience comes from local self-sufficiency. While trade and cooperation between Regions are encouraged, each Region should be capable of meeting its own basic needs. This prevents cascading failures and reduces vulnerability to disruption.\n\n"
         elif i == 7:
-            md += "To prevent conflicts of interest and ensure focused service, individuals cannot simultaneously serve in multiple branches or tiers. This also distributes leadership opportunities across more people.\n\n"
+            yield "To prevent conflicts of interest and ensure focused service, individuals cannot simultaneously serve in multiple branches or tiers. This also distributes leadership opportunities across more people.\n\n"
         elif i == 8:
-            md += "Voting rights and membership benefits are fundamental and cannot be revoked as punishment. Even those convicted of crimes retain their voice in society. This prevents the creation of a permanent underclass and ensures that everyone maintains a stake in the system.\n\n"
-    
-    return md
+            yield "Voting rights and membership benefits are fundamental and cannot be revoked as punishment. Even those convicted of crimes retain their voice in society. This prevents the creation of a permanent underclass and ensures that everyone maintains a stake in the system.\n\n"
 
 def generate_rights(rights):
-    md = "<div style='page-break-before: always;'></div>\n\n## Rights of the People\n\n"
-    md += "These 31 rights form the cornerstone of Terran Society. They are in-alienable, meaning they cannot be legislated away, suspended, or revoked. Every law, every Society action, and every institution must respect these rights.\n\n"
-    md += "### Foundational Statement\n\n"
-    md += "We are endowed by our Creator with certain in-alienable Rights, among these are Life, Liberty and the Pursuit of Happiness. These Rights are not to be violated by institutions, organizations or individuals. Our duty is to protect these Rights.\n\n"
-    md += "### The Rights\n\n"
+    yield "<div style='page-break-before: always;'></div>\n\n## Rights of the People\n\n"
+    yield "These 31 rights form the cornerstone of Terran Society. They are in-alienable, meaning they cannot be legislated away, suspended, or revoked. Every law, every Society action, and every institution must respect these rights.\n\n"
+    yield "### Foundational Statement\n\n"
+    yield "We are endowed by our Creator with certain in-alienable Rights, among these are Life, Liberty and the Pursuit of Happiness. These Rights are not to be violated by institutions, organizations or individuals. Our duty is to protect these Rights.\n\n"
+    yield "### The Rights\n\n"
     
     for num, text in rights:
-        md += f"#### Right {num}\n\n"
-        md += f"{text}\n\n"
-    
-    return md
-
-def generate_org_overview(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Organizational Structure Overview\n\n"
-    md += "Terran Society is organized into three tiers, each with specific roles and responsibilities. At the Regional and World levels, these tiers are further divided into branches that provide checks and balances on each other.\n\n"
-    
-    md += "### Organizational Hierarchy\n\n"
-    md += "The structure operates on clear hierarchical principles:\n\n"
-    md += "**District Level:**\n"
-    md += "- Council of Elders (7-9 members)\n"
-    md += "- District Representative (to Regional Council)\n\n"
-    
-    md += "**Regional Level:**\n"
-    md += "- **Executive Branch**: Five offices, each headed by an elected official with subordinate staff\n"
-    md += "  - Office of Regional Administrator (with Deputy, Directors of Elections/Infrastructure/Public Services)\n"
-    md += "  - Office of Regional Treasurer (with Deputy, Directors of Budget/Audits)\n"
-    md += "  - Office of Regional Sheriff (with Deputy Sheriff, Marshal, Chief Investigator)\n"
-    md += "  - Office of Regional Environmental Guardian (with Deputy, Directors of Monitoring/Restoration)\n"
-    md += "  - Office of Regional Ambassador (with Deputy, Economic Development Director, Consular Officer)\n"
-    md += "- **Legislative Branch**: Regional Council of the People (one Representative per District)\n"
-    md += "- **Judicial Branch**: Three offices\n"
-    md += "  - Office of Guarantor of Rights (with Rights Investigator)\n"
-    md += "  - Office of Facilitator of the Court (with Court Administrator)\n"
-    md += "  - Office of Public Arbitrator\n"
-    md += "- **Fair Witness Branch**: Regional Fair Witness Council\n\n"
-    
-    md += "**World Level:**\n"
-    md += "- **Executive Branch**: World Executive Council plus five offices (Administrator, Treasurer, Ambassador, Sheriff, Environmental Guardian)\n"
-    md += "- **Legislative Branch**: Council of the Regions (Regional representation) and World Council of the People\n"
-    md += "- **Judicial Branch**: World Court (handles inter-Regional disputes)\n"
-    md += "- **Fair Witness Branch**: World Fair Witness Council\n"
-    md += "- **Military Branch**: World Defense Force, Defense Force Intelligence, Defense Force Council\n\n"
-    
-    md += "### The Three Tiers\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute('''
-        SELECT t.tier_name, te.explain_desc 
-        FROM scm_terran_society.tier t
-        LEFT JOIN scm_terran_society.tier_explain te ON t.tier_id = te.tier_id
-        ORDER BY t.sort_order
-    ''')
-    
-    for row in cur.fetchall():
-        md += f"#### {row['tier_name']}\n\n"
-        md += f"{row['explain_desc']}\n\n"
-    
-    md += "### The Branches\n\n"
-    md += "At the Regional and World levels, governance is organized into distinct branches, each with different responsibilities:\n\n"
-    
-    cur.execute('''
-        SELECT branch_name, branch_desc
-        FROM scm_terran_society.branch
-        ORDER BY sort_order
-    ''')
-    
-    for row in cur.fetchall():
-        md += f"**{row['branch_name']} Branch**: {row['branch_desc']}\n\n"
-    
-    return md
-
-def generate_district_level(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## District Level Governance\n\n"
-    md += "The District is the most local tier of Terran Society, designed to be small enough that residents personally know at least one Elder. Districts typically range from 5,000 to 21,000 people.\n\n"
-    
-    md += "### Council of Elders\n\n"
-    md += "The Council of Elders serves as the primary governance body at the District level. Its focus is on community cohesion, family welfare, and peaceful dispute resolution.\n\n"
-    
-    md += "#### Composition\n\n"
-    md += "- Seven to nine elected Elders, depending on District population\n- Three-year terms with staggered elections (one-third up for election each year)\n- No term limits\n- Candidates must demonstrate compassion and love for children\n- Preferably at least 55 years of age\n\n"
-    
-    md += "#### Responsibilities\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute('''
-        SELECT rd.duty_header, rd.duty_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.role_duty rd ON r.role_id = rd.role_id
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Council of Elders'
-        AND r.role_name = 'Elder'
-        ORDER BY rd.sort_order
-    ''')
-    
-    for row in cur.fetchall():
-        md += f"**{row['duty_header']}**: {row['duty_desc']}\n\n"
-    
-    md += "#### Safe Haven\n\n"
-    md += "Each Council of Elders maintains a safe haven—a secure location where children or family members in crisis can temporarily stay. This provides immediate protection while the Council works to resolve the underlying issues and restore the family unit.\n\n"
-    
-    md += "#### Limitations\n\n"
-    md += "The Council of Elders:\n"
-    md += "- Cannot tax or charge service fees (funded through Regional budget allocation)\n"
-    md += "- Cannot compel anyone to appear or enforce decisions (unresolved issues escalate to Sheriff or Courts)\n"
-    md += "- Serves a voluntary mediation role—parties must agree to Council involvement\n\n"
-    
-    md += "### District Representative\n\n"
-    md += "Each District elects one Representative to the Regional Council of the People. This provides direct representation in Regional legislation and ensures District concerns are heard at the Regional level.\n\n"
-    
-    md += "### District Elections\n\n"
-    md += "District elections occur on a three-year cycle. The Administrator's Department manages the election process, ensuring:\n\n"
-    md += "- Transparent candidate disclosure\n"
-    md += "- Public forums for debate and questions\n"
-    md += "- Physical ballots verified by voters\n"
-    md += "- Ballots counted publicly and retained for 10 years\n"
-    md += "- No party affiliation required\n"
-    md += "- No money in campaigns\n\n"
-    
-    return md
-
-def generate_fair_witness_chapter(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## The Fair Witness Branch\n\n"
+        yield f"#### Right {num}\n\n"
+        yield f"{text}\n\n"
+
+def generate_org_overview(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Organizational Structure Overview\n\n"
+    yield "Terran Society is organized into three tiers, each with specific roles and responsibilities. At the Regional and World levels, these tiers are further divided into branches that provide checks and balances on each other.\n\n"
+    
+    yield "### Organizational Hierarchy\n\n"
+    yield "The structure operates on clear hierarchical principles:\n\n"
+    yield "**District Level:**\n"
+    yield "- Council of Elders (7-9 members)\n"
+    yield "- District Representative (to Regional Council)\n\n"
+    
+    yield "**Regional Level:**\n"
+    yield "- **Executive Branch**: Five offices, each headed by an elected official with subordinate staff\n"
+    yield "  - Office of Regional Administrator (with Deputy, Directors of Elections/Infrastructure/Public Services)\n"
+    yield "  - Office of Regional Treasurer (with Deputy, Directors of Budget/Audits)\n"
+    yield "  - Office of Regional Sheriff (with Deputy Sheriff, Marshal, Chief Investigator)\n"
+    yield "  - Office of Regional Environmental Guardian (with Deputy, Directors of Monitoring/Restoration)\n"
+    yield "  - Office of Regional Ambassador (with Deputy, Economic Development Director, Consular Officer)\n"
+    yield "- **Legislative Branch**: Regional Council of the People (one Representative per District)\n"
+    yield "- **Judicial Branch**: Three offices\n"
+    yield "  - Office of Guarantor of Rights (with Rights Investigator)\n"
+    yield "  - Office of Facilitator of the Court (with Court Administrator)\n"
+    yield "  - Office of Public Arbitrator\n"
+    yield "- **Fair Witness Branch**: Regional Fair Witness Council\n\n"
+    
+    yield "**World Level:**\n"
+    yield "- **Executive Branch**: World Executive Council plus five offices (Administrator, Treasurer, Ambassador, Sheriff, Environmental Guardian)\n"
+    yield "- **Legislative Branch**: Council of the Regions (Regional representation) and World Council of the People\n"
+    yield "- **Judicial Branch**: World Court (handles inter-Regional disputes)\n"
+    yield "- **Fair Witness Branch**: World Fair Witness Council\n"
+    yield "- **Military Branch**: World Defense Force, Defense Force Intelligence, Defense Force Council\n\n"
+    
+    yield "### The Three Tiers\n\n"
+    
+    for tier in graph.tiers:
+        # One entry per explanation, as a LEFT JOIN of tier to tier_explain
+        for explain in tier['explains'] or [{'explain_desc': None}]:
+            yield f"#### {tier['tier_name']}\n\n"
+            yield f"{explain['explain_desc']}\n\n"
+    
+    yield "### The Branches\n\n"
+    yield "At the Regional and World levels, governance is organized into distinct branches, each with different responsibilities:\n\n"
+    
+    for branch in graph.branches:
+        yield f"**{branch['branch_name']} Branch**: {branch['branch_desc']}\n\n"
+
+def generate_district_level(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## District Level Governance\n\n"
+    yield "The District is the most local tier of Terran Society, designed to be small enough that residents personally know at least one Elder. Districts typically range from 5,000 to 21,000 people.\n\n"
+    
+    yield "### Council of Elders\n\n"
+    yield "The Council of Elders serves as the primary governance body at the District level. Its focus is on community cohesion, family welfare, and peaceful dispute resolution.\n\n"
+    
+    yield "#### Composition\n\n"
+    yield "- Seven to nine elected Elders, depending on District population\n- Three-year terms with staggered elections (one-third up for election each year)\n- No term limits\n- Candidates must demonstrate compassion and love for children\n- Preferably at least 55 years of age\n\n"
+    
+    yield "#### Responsibilities\n\n"
+    
+    for duty in graph.duties_of('Council of Elders', 'Elder'):
+        yield f"**{duty['duty_header']}**: {duty['duty_desc']}\n\n"
+    
+    yield "#### Safe Haven\n\n"
+    yield "Each Council of Elders maintains a safe haven—a secure location where children or family members in crisis can temporarily stay. This provides immediate protection while the Council works to resolve the underlying issues and restore the family unit.\n\n"
+    
+    yield "#### Limitations\n\n"
+    yield "The Council of Elders:\n"
+    yield "- Cannot tax or charge service fees (funded through Regional budget allocation)\n"
+    yield "- Cannot compel anyone to appear or enforce decisions (unresolved issues escalate to Sheriff or Courts)\n"
+    yield "- Serves a voluntary mediation role—parties must agree to Council involvement\n\n"
+    
+    yield "### District Representative\n\n"
+    yield "Each District elects one Representative to the Regional Council of the People. This provides direct representation in Regional legislation and ensures District concerns are heard at the Regional level.\n\n"
+    
+    yield "### District Elections\n\n"
+    yield "District elections occur on a three-year cycle. The Administrator's Department manages the election process, ensuring:\n\n"
+    yield "- Transparent candidate disclosure\n"
+    yield "- Public forums for debate and questions\n"
+    yield "- Physical ballots verified by voters\n"
+    yield "- Ballots counted publicly and retained for 10 years\n"
+    yield "- No party affiliation required\n"
+    yield "- No money in campaigns\n\n"
+
+FAIR_WITNESS_CONCEPT_HEADER = 'Fair Witness Concept and Purpose'
+FAIR_WITNESS_TRAINING_ROLES = ('Fair Witness Trainee', 'Fair Witness Apprentice', 'Certified Fair Witness', 'Senior Certified Fair Witness')
+
+def generate_fair_witness_chapter(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## The Fair Witness Branch\n\n"
     
     # Get the concept explanation from institution_explain and use it as introduction
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute('''
-        SELECT ie.explain_desc
-        FROM scm_terran_society.institution_explain ie
-        JOIN scm_terran_society.institution i ON ie.institution_id = i.institution_id
-        WHERE i.institution_name = 'Regional Fair Witness Council'
-        AND ie.explain_header = 'Fair Witness Concept and Purpose'
-        LIMIT 1
-    ''')
-    
-    concept_row = cur.fetchone()
+    concept_row = None
+    council = graph.institution('Regional Fair Witness Council')
+    if council:
+        concept_row = next((e for e in council['explains']
+                            if e['explain_header'] == FAIR_WITNESS_CONCEPT_HEADER), None)
     if concept_row:
-        md += f"{concept_row['explain_desc']}\n\n"
+        yield f"{concept_row['explain_desc']}\n\n"
     else:
         # Fallback to original text if not found
-        md += "The Fair Witness branch provides independent, objective observation and record-keeping for all Society operations. Inspired by Robert A. Heinlein's \"Stranger in a Strange Land\", this concept resolves a critical problem: those in power cannot be trusted to keep proper records on themselves. Fair Witnesses are trained to be impartial, non-biased witnesses with linguistic mastery and keen observation skills. Their independence ensures badly needed credibility, fairness, and openness.\n\n"
+        yield "The Fair Witness branch provides independent, objective observation and record-keeping for all Society operations. Inspired by Robert A. Heinlein's \"Stranger in a Strange Land\", this concept resolves a critical problem: those in power cannot be trusted to keep proper records on themselves. Fair Witnesses are trained to be impartial, non-biased witnesses with linguistic mastery and keen observation skills. Their independence ensures badly needed credibility, fairness, and openness.\n\n"
     
-    md += "### Purpose and Independence\n\n"
-    md += "Fair Witnesses resolve the problem of record-keeping through absolute independence. They are trained as impartial, non-biased witnesses with linguistic mastery and keen observation skills. Their role is strictly observational—they have no other authority. This is not a police role.\n\n"
+    yield "### Purpose and Independence\n\n"
+    yield "Fair Witnesses resolve the problem of record-keeping through absolute independence. They are trained as impartial, non-biased witnesses with linguistic mastery and keen observation skills. Their role is strictly observational—they have no other authority. This is not a police role.\n\n"
     
-    md += "It is a criminal act to influence a Fair Witness in any way that could compromise them. This would be a violation of Rights where the victim is the whole Society. Fair Witnesses are the only designated group with such protective status.\n\n"
+    yield "It is a criminal act to influence a Fair Witness in any way that could compromise them. This would be a violation of Rights where the victim is the whole Society. Fair Witnesses are the only designated group with such protective status.\n\n"
     
     # Training Hierarchy
-    md += "### Training Hierarchy\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    yield "### Training Hierarchy\n\n"
     
-    # Get Fair Witness roles in order
-    cur.execute('''
-        SELECT r.role_name, r.role_desc, re.explain_header, re.explain_desc
-        FROM scm_terran_society.role r
-        LEFT JOIN scm_terran_society.role_explain re ON r.role_id = re.role_id
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name LIKE '%Fair Witness%'
-        AND r.role_name IN ('Fair Witness Trainee', 'Fair Witness Apprentice', 'Certified Fair Witness', 'Senior Certified Fair Witness')
-        ORDER BY r.sort_order
-    ''')
-    
-    for row in cur.fetchall():
-        md += f"#### {row['role_name']}\n\n"
-        md += f"{row['role_desc']}\n\n"
-        if row['explain_desc']:
-            md += f"{row['explain_desc']}\n\n"
+    # Fair Witness roles in order, one entry per explanation (LEFT JOIN semantics)
+    for role in graph.roles:
+        if role['role_name'] not in FAIR_WITNESS_TRAINING_ROLES:
+            continue
+        if 'Fair Witness' not in (role['institution'] or {}).get('institution_name', ''):
+            continue
+        for explain in role['explains'] or [{'explain_desc': None}]:
+            yield f"#### {role['role_name']}\n\n"
+            yield f"{role['role_desc']}\n\n"
+            if explain['explain_desc']:
+                yield f"{explain['explain_desc']}\n\n"
     
     # Panel Structure
-    md += "### Fair Witness Panels\n\n"
-    md += "Fair Witnesses are governed by a two-tiered panel system consistent with the Regional and World structure. These panels oversee administration of the branch, with full authority to de-certify, reprimand, or order additional training of Certified Fair Witnesses.\n\n"
-    
-    # Get panel institutions (unique only)
-    cur.execute('''
-        SELECT DISTINCT i.institution_name, i.institution_desc
-        FROM scm_terran_society.institution i
-        WHERE i.institution_name LIKE '%Fair Witness Council'
-        ORDER BY i.institution_name
-    ''')
-    
-    processed_institutions = set()
-    for row in cur.fetchall():
-        # Skip if already processed
-        if row['institution_name'] in processed_institutions:
-            continue
-        processed_institutions.add(row['institution_name'])
-        
-        md += f"#### {row['institution_name']}\n\n"
-        md += f"{row['institution_desc']}\n\n"
+    yield "### Fair Witness Panels\n\n"
+    yield "Fair Witnesses are governed by a two-tiered panel system consistent with the Regional and World structure. These panels oversee administration of the branch, with full authority to de-certify, reprimand, or order additional training of Certified Fair Witnesses.\n\n"
+    
+    # Panel institutions (unique only)
+    panels = {}
+    for inst in graph.institutions:
+        if inst['institution_name'].endswith('Fair Witness Council'):
+            panels.setdefault(inst['institution_name'], inst)
+    
+    for name in sorted(panels):
+        inst = panels[name]
+        yield f"#### {name}\n\n"
+        yield f"{inst['institution_desc']}\n\n"
         
         # Add explanations, but skip "Fair Witness Concept and Purpose" since it's at the top
-        cur2 = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        cur2.execute('''
-            SELECT explain_header, explain_desc
-            FROM scm_terran_society.institution_explain ie
-            JOIN scm_terran_society.institution i ON ie.institution_id = i.institution_id
-            WHERE i.institution_name = %s
-            AND ie.explain_header != 'Fair Witness Concept and Purpose'
-            ORDER BY ie.sort_order
-        ''', (row['institution_name'],))
-        
-        for explain in cur2.fetchall():
-            md += f"**{explain['explain_header']}**: {explain['explain_desc']}\n\n"
+        for explain in inst['explains']:
+            if explain['explain_header'] is None or explain['explain_header'] == FAIR_WITNESS_CONCEPT_HEADER:
+                continue
+            yield f"**{explain['explain_header']}**: {explain['explain_desc']}\n\n"
     
     # Responsibilities
-    md += "### Fair Witness Responsibilities\n\n"
-    md += "Fair Witnesses serve as record keepers and librarians for all Society operations:\n\n"
-    md += "- **Unrestricted Access**: Fair Witnesses have unrestricted access to Executive, Legislative, and Judicial branch operations\n"
-    md += "- **Record Keeping**: Prepare and maintain meeting minutes, logs, and all manner of records\n"
-    md += "- **Library Management**: Create and maintain freely accessible libraries of records for all Citizens\n"
-    md += "- **Linguistic Mastery**: Must be fluent in all languages used in Society operations\n"
-    md += "- **Observation Only**: No other authority beyond observation and documentation\n"
-    md += "- **Identification**: Must wear visible badge, symbol, or attire to openly identify their presence\n\n"
+    yield "### Fair Witness Responsibilities\n\n"
+    yield "Fair Witnesses serve as record keepers and librarians for all Society operations:\n\n"
+    yield "- **Unrestricted Access**: Fair Witnesses have unrestricted access to Executive, Legislative, and Judicial branch operations\n"
+    yield "- **Record Keeping**: Prepare and maintain meeting minutes, logs, and all manner of records\n"
+    yield "- **Library Management**: Create and maintain freely accessible libraries of records for all Citizens\n"
+    yield "- **Linguistic Mastery**: Must be fluent in all languages used in Society operations\n"
+    yield "- **Observation Only**: No other authority beyond observation and documentation\n"
+    yield "- **Identification**: Must wear visible badge, symbol, or attire to openly identify their presence\n\n"
     
     # Accountability
-    md += "### Accountability and Recall\n\n"
-    md += "While Fair Witnesses hold life appointments, they can be removed for breach of trust through a careful process designed to prevent political abuse. A Citizen complaint must be endorsed by both a Regional Representative AND the Regional Executive, then approved by majority vote of the Regional Council. This same-tier requirement ensures Fair Witnesses cannot be removed for political reasons while maintaining accountability to the People.\n\n"
-    
-    return md
+    yield "### Accountability and Recall\n\n"
+    yield "While Fair Witnesses hold life appointments, they can be removed for breach of trust through a careful process designed to prevent political abuse. A Citizen complaint must be endorsed by both a Regional Representative AND the Regional Executive, then approved by majority vote of the Regional Council. This same-tier requirement ensures Fair Witnesses cannot be removed for political reasons while maintaining accountability to the People.\n\n"
 
-def generate_regional_executive_chapter(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Regional Executive Branch\n\n"
-    md += "The Regional Executive Branch administers daily operations, public services, and implementation of legislation. It consists of five major offices, each headed by an elected official with supporting staff.\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+def generate_regional_executive_chapter(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Regional Executive Branch\n\n"
+    yield "The Regional Executive Branch administers daily operations, public services, and implementation of legislation. It consists of five major offices, each headed by an elected official with supporting staff.\n\n"
     
     # Get all Regional Executive institutions in order
     regional_exec_offices = [
@@ -477,342 +413,189 @@ def generate_regional_executive_chapter(conn):
     ]
     
     for office_name in regional_exec_offices:
-        md += f"### {office_name}\n\n"
+        yield f"### {office_name}\n\n"
         
-        # Get institution description
-        cur.execute('''
-            SELECT institution_desc
-            FROM scm_terran_society.institution
-            WHERE institution_name = %s
-        ''', (office_name,))
-        inst_row = cur.fetchone()
-        if inst_row:
-            md += f"{inst_row['institution_desc']}\n\n"
+        # Institution description
+        office = graph.institution(office_name)
+        if office:
+            yield f"{office['institution_desc']}\n\n"
         
-        # Get all roles for this office
-        cur.execute('''
-            SELECT r.role_name, r.role_desc
-            FROM scm_terran_society.role r
-            JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-            WHERE i.institution_name = %s
-            ORDER BY r.sort_order
-        ''', (office_name,))
-        
-        roles = cur.fetchall()
+        # All roles for this office
+        roles = graph.roles_of(office_name)
         if not roles:
             continue
         
         # First role is the head of office
         head_role = roles[0]
-        md += f"#### {head_role['role_name']}\n\n"
-        md += f"{head_role['role_desc']}\n\n"
-        
-        # Get duties for the head role
-        cur.execute('''
-            SELECT rd.duty_header, rd.duty_desc
-            FROM scm_terran_society.role_duty rd
-            JOIN scm_terran_society.role r ON rd.role_id = r.role_id
-            JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-            WHERE i.institution_name = %s
-            AND r.role_name = %s
-            ORDER BY rd.sort_order
-        ''', (office_name, head_role['role_name']))
+        yield f"#### {head_role['role_name']}\n\n"
+        yield f"{head_role['role_desc']}\n\n"
         
-        duties = cur.fetchall()
+        # Duties for the head role
+        duties = head_role['duties']
         if duties:
-            md += "**Key Responsibilities:**\n\n"
+            yield "**Key Responsibilities:**\n\n"
             for duty in duties:
-                md += f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
-            md += "\n"
+                yield f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
+            yield "\n"
         
         # List subordinate roles if any
         if len(roles) > 1:
-            md += "**Subordinate Roles:**\n\n"
+            yield "**Subordinate Roles:**\n\n"
             for role in roles[1:]:
-                md += f"- **{role['role_name']}**: {role['role_desc']}\n"
-            md += "\n"
+                yield f"- **{role['role_name']}**: {role['role_desc']}\n"
+            yield "\n"
     
     # Add general Executive Branch information
-    md += "### Executive Council Coordination\n\n"
-    md += "The five elected heads of the Regional Executive offices form the Executive Council. This council coordinates executive operations, discusses inter-departmental matters, and ensures unified implementation of Regional policy.\n\n"
-    
-    md += "**Executive Authority:**\n\n"
-    md += "- Implement laws passed by the Regional Council\n"
-    md += "- Manage Regional budget and operations\n"
-    md += "- Provide public services to all Districts\n"
-    md += "- Sign or veto legislation (First Executive)\n"
-    md += "- Appoint department heads (subject to Council approval)\n"
-    md += "- No authority to remove elected officials\n\n"
-    
-    md += "**Executive Accountability:**\n\n"
-    md += "- All executive officials are directly elected by the people\n"
-    md += "- Subject to impeachment by Regional Council for cause\n"
-    md += "- Operations observed by Fair Witnesses for transparency\n"
-    md += "- Budget and spending subject to legislative approval\n\n"
-    
-    return md
-
-def generate_legislative_chapter(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Legislative Branch\n\n"
-    md += "The Legislative Branch is the primary law-making and oversight body within Terran Society. It operates at both District and Regional levels, with elected representatives directly accountable to the people they serve.\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    yield "### Executive Council Coordination\n\n"
+    yield "The five elected heads of the Regional Executive offices form the Executive Council. This council coordinates executive operations, discusses inter-departmental matters, and ensures unified implementation of Regional policy.\n\n"
+    
+    yield "**Executive Authority:**\n\n"
+    yield "- Implement laws passed by the Regional Council\n"
+    yield "- Manage Regional budget and operations\n"
+    yield "- Provide public services to all Districts\n"
+    yield "- Sign or veto legislation (First Executive)\n"
+    yield "- Appoint department heads (subject to Council approval)\n"
+    yield "- No authority to remove elected officials\n\n"
+    
+    yield "**Executive Accountability:**\n\n"
+    yield "- All executive officials are directly elected by the people\n"
+    yield "- Subject to impeachment by Regional Council for cause\n"
+    yield "- Operations observed by Fair Witnesses for transparency\n"
+    yield "- Budget and spending subject to legislative approval\n\n"
+
+def generate_legislative_chapter(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Legislative Branch\n\n"
+    yield "The Legislative Branch is the primary law-making and oversight body within Terran Society. It operates at both District and Regional levels, with elected representatives directly accountable to the people they serve.\n\n"
     
     # Regional Council of the People
-    md += "### Regional Council of the People\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Regional Council of the People'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
-    
-    md += "#### Structure and Composition\n\n"
-    md += "The Regional Council consists of elected Representatives, with one Representative per District. This ensures direct representation of local interests at the Regional level.\n\n"
-    
-    md += "#### Roles and Responsibilities\n\n"
-    
-    # Get Representative role and duties
-    cur.execute('''
-        SELECT r.role_name, r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Regional Council of the People'
-        AND r.role_name = 'Representative'
-    ''')
-    rep_row = cur.fetchone()
+    yield "### Regional Council of the People\n\n"
+    council = graph.institution('Regional Council of the People')
+    if council:
+        yield f"{council['institution_desc']}\n\n"
+    
+    yield "#### Structure and Composition\n\n"
+    yield "The Regional Council consists of elected Representatives, with one Representative per District. This ensures direct representation of local interests at the Regional level.\n\n"
+    
+    yield "#### Roles and Responsibilities\n\n"
+    
+    # Representative role and duties
+    rep_row = graph.role('Regional Council of the People', 'Representative')
     if rep_row:
-        md += f"**{rep_row['role_name']}**\n\n"
-        md += f"{rep_row['role_desc']}\n\n"
-        
-        # Get duties
-        cur.execute('''
-            SELECT rd.duty_header, rd.duty_desc
-            FROM scm_terran_society.role_duty rd
-            JOIN scm_terran_society.role r ON rd.role_id = r.role_id
-            JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-            WHERE i.institution_name = 'Regional Council of the People'
-            AND r.role_name = 'Representative'
-            ORDER BY rd.sort_order
-        ''')
+        yield f"**{rep_row['role_name']}**\n\n"
+        yield f"{rep_row['role_desc']}\n\n"
         
-        for duty in cur.fetchall():
-            md += f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
-        md += "\n"
+        for duty in rep_row['duties']:
+            yield f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
+        yield "\n"
     
     # Council administrative roles
-    md += "#### Administrative Roles\n\n"
-    cur.execute('''
-        SELECT r.role_name, r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Regional Council of the People'
-        AND r.role_name != 'Representative'
-        ORDER BY r.sort_order
-    ''')
-    
-    for role in cur.fetchall():
-        md += f"**{role['role_name']}**: {role['role_desc']}\n\n"
-    
-    md += "#### Legislative Authority\n\n"
-    md += "The Regional Council has authority to:\n\n"
-    md += "- Pass laws and spending legislation within their jurisdiction\n"
-    md += "- Approve major appointments by the First Executive\n"
-    md += "- Conduct investigative hearings and compel witnesses\n"
-    md += "- Define representative districts (must be simple, not contorted)\n"
-    md += "- Impeach members of the Executive and Judicial branches for cause\n"
-    md += "- Charter organizations operating within the Region\n\n"
-    
-    md += "All laws must conform to the Rights of the People without exception. All meetings must be observed by Fair Witnesses or proceedings are null and void.\n\n"
-    
-    return md
-
-def generate_judicial_chapter(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Judicial Branch\n\n"
-    md += "The Judicial Branch provides dispute resolution, rights protection, and justice through a multi-tiered court system. All judicial proceedings are public, observed by Fair Witnesses, and decided by citizen juries.\n\n"
+    yield "#### Administrative Roles\n\n"
+    for role in graph.roles_of('Regional Council of the People'):
+        if role['role_name'] == 'Representative':
+            continue
+        yield f"**{role['role_name']}**: {role['role_desc']}\n\n"
     
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    yield "#### Legislative Authority\n\n"
+    yield "The Regional Council has authority to:\n\n"
+    yield "- Pass laws and spending legislation within their jurisdiction\n"
+    yield "- Approve major appointments by the First Executive\n"
+    yield "- Conduct investigative hearings and compel witnesses\n"
+    yield "- Define representative districts (must be simple, not contorted)\n"
+    yield "- Impeach members of the Executive and Judicial branches for cause\n"
+    yield "- Charter organizations operating within the Region\n\n"
+    
+    yield "All laws must conform to the Rights of the People without exception. All meetings must be observed by Fair Witnesses or proceedings are null and void.\n\n"
+
+def generate_judicial_chapter(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Judicial Branch\n\n"
+    yield "The Judicial Branch provides dispute resolution, rights protection, and justice through a multi-tiered court system. All judicial proceedings are public, observed by Fair Witnesses, and decided by citizen juries.\n\n"
     
     # Office of Guarantor of Rights
-    md += "### Office of Guarantor of Rights\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Office of Guarantor of Rights'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
-    
-    md += "#### Guarantor of Rights\n\n"
-    cur.execute('''
-        SELECT r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Guarantor of Rights'
-        AND r.role_name = 'Guarantor of Rights'
-    ''')
-    role = cur.fetchone()
+    yield "### Office of Guarantor of Rights\n\n"
+    office = graph.institution('Office of Guarantor of Rights')
+    if office:
+        yield f"{office['institution_desc']}\n\n"
+    
+    yield "#### Guarantor of Rights\n\n"
+    role = graph.role('Office of Guarantor of Rights', 'Guarantor of Rights')
     if role:
-        md += f"{role['role_desc']}\n\n"
-    
-    # Get duties
-    cur.execute('''
-        SELECT rd.duty_header, rd.duty_desc
-        FROM scm_terran_society.role_duty rd
-        JOIN scm_terran_society.role r ON rd.role_id = r.role_id
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Guarantor of Rights'
-        AND r.role_name = 'Guarantor of Rights'
-        ORDER BY rd.sort_order
-    ''')
-    
-    md += "**Responsibilities:**\n\n"
-    for duty in cur.fetchall():
-        md += f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
-    md += "\n"
+        yield f"{role['role_desc']}\n\n"
+    
+    yield "**Responsibilities:**\n\n"
+    for duty in graph.duties_of('Office of Guarantor of Rights', 'Guarantor of Rights'):
+        yield f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
+    yield "\n"
     
     # Rights Investigator
-    cur.execute('''
-        SELECT r.role_name, r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Guarantor of Rights'
-        AND r.role_name = 'Rights Investigator'
-    ''')
-    inv_role = cur.fetchone()
+    inv_role = graph.role('Office of Guarantor of Rights', 'Rights Investigator')
     if inv_role:
-        md += f"**{inv_role['role_name']}**: {inv_role['role_desc']}\n\n"
+        yield f"**{inv_role['role_name']}**: {inv_role['role_desc']}\n\n"
     
     # Office of Facilitator of the Court
-    md += "### Office of Facilitator of the Court\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Office of Facilitator of the Court'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
-    
-    md += "#### Facilitator of the Court (Conductor)\n\n"
-    cur.execute('''
-        SELECT r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Facilitator of the Court'
-        AND r.role_name = 'Facilitator of the Court'
-    ''')
-    role = cur.fetchone()
+    yield "### Office of Facilitator of the Court\n\n"
+    office = graph.institution('Office of Facilitator of the Court')
+    if office:
+        yield f"{office['institution_desc']}\n\n"
+    
+    yield "#### Facilitator of the Court (Conductor)\n\n"
+    role = graph.role('Office of Facilitator of the Court', 'Facilitator of the Court')
     if role:
-        md += f"{role['role_desc']}\n\n"
-    
-    # Get duties
-    cur.execute('''
-        SELECT rd.duty_header, rd.duty_desc
-        FROM scm_terran_society.role_duty rd
-        JOIN scm_terran_society.role r ON rd.role_id = r.role_id
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Facilitator of the Court'
-        AND r.role_name = 'Facilitator of the Court'
-        ORDER BY rd.sort_order
-    ''')
-    
-    md += "**Responsibilities:**\n\n"
-    for duty in cur.fetchall():
-        md += f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
-    md += "\n"
+        yield f"{role['role_desc']}\n\n"
+    
+    yield "**Responsibilities:**\n\n"
+    for duty in graph.duties_of('Office of Facilitator of the Court', 'Facilitator of the Court'):
+        yield f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
+    yield "\n"
     
     # Court Administrator
-    cur.execute('''
-        SELECT r.role_name, r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Facilitator of the Court'
-        AND r.role_name = 'Court Administrator'
-    ''')
-    admin_role = cur.fetchone()
+    admin_role = graph.role('Office of Facilitator of the Court', 'Court Administrator')
     if admin_role:
-        md += f"**{admin_role['role_name']}**: {admin_role['role_desc']}\n\n"
+        yield f"**{admin_role['role_name']}**: {admin_role['role_desc']}\n\n"
     
     # Office of Public Arbitrator
-    md += "### Office of Public Arbitrator\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Office of Public Arbitrator'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
-    
-    md += "#### Public Arbitrator\n\n"
-    cur.execute('''
-        SELECT r.role_desc
-        FROM scm_terran_society.role r
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Public Arbitrator'
-        AND r.role_name = 'Public Arbitrator'
-    ''')
-    role = cur.fetchone()
+    yield "### Office of Public Arbitrator\n\n"
+    office = graph.institution('Office of Public Arbitrator')
+    if office:
+        yield f"{office['institution_desc']}\n\n"
+    
+    yield "#### Public Arbitrator\n\n"
+    role = graph.role('Office of Public Arbitrator', 'Public Arbitrator')
     if role:
-        md += f"{role['role_desc']}\n\n"
-    
-    # Get duties
-    cur.execute('''
-        SELECT rd.duty_header, rd.duty_desc
-        FROM scm_terran_society.role_duty rd
-        JOIN scm_terran_society.role r ON rd.role_id = r.role_id
-        JOIN scm_terran_society.institution i ON r.institution_id = i.institution_id
-        WHERE i.institution_name = 'Office of Public Arbitrator'
-        AND r.role_name = 'Public Arbitrator'
-        ORDER BY rd.sort_order
-    ''')
-    
-    md += "**Responsibilities:**\n\n"
-    for duty in cur.fetchall():
-        md += f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
-    md += "\n"
-    
-    md += "### Court Structure\n\n"
-    md += "The Judicial Branch operates three types of courts:\n\n"
-    md += "- **Minor Courts**: Handle petty criminal cases with 7-person juries (6-of-7 verdict required)\n"
-    md += "- **Major Courts**: Handle serious criminal cases with 14-person juries (12-of-14 verdict required)\n"
-    md += "- **Arbitration Courts**: Voluntary binding arbitration for civil disputes\n\n"
-    md += "All courts require three Certified Fair Witnesses in attendance. Juries are selected from Citizens, and the Facilitator presides to ensure procedural fairness.\n\n"
-    
-    return md
-
-def generate_world_level(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## World Level Governance\n\n"
-    md += "The World tier coordinates matters that span Regions, including planetary defense, inter-Regional disputes, world-wide infrastructure, and relations with other civilizations. The World level mirrors the Regional structure with Executive, Legislative, Judicial, Fair Witness, and Military branches.\n\n"
+        yield f"{role['role_desc']}\n\n"
     
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    yield "**Responsibilities:**\n\n"
+    for duty in graph.duties_of('Office of Public Arbitrator', 'Public Arbitrator'):
+        yield f"- **{duty['duty_header']}**: {duty['duty_desc']}\n"
+    yield "\n"
+    
+    yield "### Court Structure\n\n"
+    yield "The Judicial Branch operates three types of courts:\n\n"
+    yield "- **Minor Courts**: Handle petty criminal cases with 7-person juries (6-of-7 verdict required)\n"
+    yield "- **Major Courts**: Handle serious criminal cases with 14-person juries (12-of-14 verdict required)\n"
+    yield "- **Arbitration Courts**: Voluntary binding arbitration for civil disputes\n\n"
+    yield "All courts require three Certified Fair Witnesses in attendance. Juries are selected from Citizens, and the Facilitator presides to ensure procedural fairness.\n\n"
+
+def generate_world_level(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## World Level Governance\n\n"
+    yield "The World tier coordinates matters that span Regions, including planetary defense, inter-Regional disputes, world-wide infrastructure, and relations with other civilizations. The World level mirrors the Regional structure with Executive, Legislative, Judicial, Fair Witness, and Military branches.\n\n"
     
     # World Executive Branch
-    md += "### World Executive Branch\n\n"
-    md += "The World Executive administers planetary-scale services, infrastructure, and operations. It coordinates between Regions and manages relations with external parties.\n\n"
-    
-    md += "#### World Executive Council\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'World Executive Council'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+    yield "### World Executive Branch\n\n"
+    yield "The World Executive administers planetary-scale services, infrastructure, and operations. It coordinates between Regions and manages relations with external parties.\n\n"
+    
+    yield "#### World Executive Council\n\n"
+    inst = graph.institution('World Executive Council')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     else:
-        md += "The World Executive Council consists of the First and Second World Executives who provide senior leadership and coordinate all World-level operations.\n\n"
+        yield "The World Executive Council consists of the First and Second World Executives who provide senior leadership and coordinate all World-level operations.\n\n"
     
-    md += "**Key Responsibilities:**\n\n"
-    md += "- Sign or veto bills approved by World Legislature\n"
-    md += "- Appoint Senior Military Officer (pending Senate approval)\n"
-    md += "- Primary civilian oversight of the Military\n"
-    md += "- Coordinate world-wide infrastructure projects\n"
-    md += "- Space exploration and off-planet civilian operations\n\n"
+    yield "**Key Responsibilities:**\n\n"
+    yield "- Sign or veto bills approved by World Legislature\n"
+    yield "- Appoint Senior Military Officer (pending Senate approval)\n"
+    yield "- Primary civilian oversight of the Military\n"
+    yield "- Coordinate world-wide infrastructure projects\n"
+    yield "- Space exploration and off-planet civilian operations\n\n"
     
     # World Executive Offices
     world_exec_offices = [
@@ -824,156 +607,111 @@ def generate_world_level(conn):
     ]
     
     for office_name, desc in world_exec_offices:
-        md += f"#### {office_name}\n\n"
-        cur.execute('''
-            SELECT institution_desc
-            FROM scm_terran_society.institution
-            WHERE institution_name = %s
-        ''', (office_name,))
-        db_row = cur.fetchone()
-        if db_row:
-            md += f"{db_row['institution_desc']}\n\n"
+        yield f"#### {office_name}\n\n"
+        office = graph.institution(office_name)
+        if office:
+            yield f"{office['institution_desc']}\n\n"
         else:
-            md += f"{desc}\n\n"
+            yield f"{desc}\n\n"
     
     # World Legislative Branch
-    md += "### World Legislative Branch\n\n"
-    md += "The World Legislature consists of two bodies: the Council of the Regions (similar to a Senate) representing Regional interests, and the World Council of the People providing direct representation.\n\n"
-    
-    md += "#### Council of the Regions\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Council of the Regions'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+    yield "### World Legislative Branch\n\n"
+    yield "The World Legislature consists of two bodies: the Council of the Regions (similar to a Senate) representing Regional interests, and the World Council of the People providing direct representation.\n\n"
+    
+    yield "#### Council of the Regions\n\n"
+    inst = graph.institution('Council of the Regions')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     else:
-        md += "Each Region sends representatives to the Council of the Regions, ensuring equal representation regardless of population. This body provides checks and balances on World legislation.\n\n"
-    
-    md += "**Authority:**\n\n"
-    md += "- Approve Senior Military Officer appointment\n"
-    md += "- Approve treaties before submission to Citizens for ratification\n"
-    md += "- Provide oversight of World Executive operations\n\n"
-    
-    md += "#### World Council of the People\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'World Council of the People'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+        yield "Each Region sends representatives to the Council of the Regions, ensuring equal representation regardless of population. This body provides checks and balances on World legislation.\n\n"
+    
+    yield "**Authority:**\n\n"
+    yield "- Approve Senior Military Officer appointment\n"
+    yield "- Approve treaties before submission to Citizens for ratification\n"
+    yield "- Provide oversight of World Executive operations\n\n"
+    
+    yield "#### World Council of the People\n\n"
+    inst = graph.institution('World Council of the People')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     else:
-        md += "Representatives elected to provide direct voice of the people at World level. Works with Council of the Regions on World legislation.\n\n"
+        yield "Representatives elected to provide direct voice of the people at World level. Works with Council of the Regions on World legislation.\n\n"
     
-    md += "**Legislative Authority:**\n\n"
-    md += "- Military oversight and resource allocation\n"
-    md += "- World-wide standards (weights, measures, timekeeping)\n"
-    md += "- Laws of world commerce and infrastructure\n"
-    md += "- Charter organizations operating on planetary scale or in space\n"
-    md += "- Define structure and procedures of World institutions\n\n"
+    yield "**Legislative Authority:**\n\n"
+    yield "- Military oversight and resource allocation\n"
+    yield "- World-wide standards (weights, measures, timekeeping)\n"
+    yield "- Laws of world commerce and infrastructure\n"
+    yield "- Charter organizations operating on planetary scale or in space\n"
+    yield "- Define structure and procedures of World institutions\n\n"
     
     # World Judicial
-    md += "### World Judicial System\n\n"
-    md += "The World Court operates differently from Regional courts. It handles disputes between Regions or between Terran Society and external parties. It is not a criminal court.\n\n"
+    yield "### World Judicial System\n\n"
+    yield "The World Court operates differently from Regional courts. It handles disputes between Regions or between Terran Society and external parties. It is not a criminal court.\n\n"
     
-    md += "**World Court Structure:**\n\n"
-    md += "- **Conductor**: Elected by sitting Regional Facilitators, must have served at least one full term at Regional level\n"
-    md += "- **Jury**: 21 jurors selected from Citizens who served at least one term in World Legislature\n"
-    md += "- **Verdict**: Requires 19-of-21 majority vote\n"
-    md += "- **Fair Witnesses**: Three Certified Fair Witnesses required in attendance\n"
-    md += "- **Purpose**: Serious dispute resolution between Regions, or between Terran Society and outside parties (other civilizations, non-humans)\n\n"
+    yield "**World Court Structure:**\n\n"
+    yield "- **Conductor**: Elected by sitting Regional Facilitators, must have served at least one full term at Regional level\n"
+    yield "- **Jury**: 21 jurors selected from Citizens who served at least one term in World Legislature\n"
+    yield "- **Verdict**: Requires 19-of-21 majority vote\n"
+    yield "- **Fair Witnesses**: Three Certified Fair Witnesses required in attendance\n"
+    yield "- **Purpose**: Serious dispute resolution between Regions, or between Terran Society and outside parties (other civilizations, non-humans)\n\n"
     
-    md += "The World Court's decisions are binding on the parties. Treaty disputes may be resolved here, but any resulting treaty still requires ratification by vote of all Citizens.\n\n"
+    yield "The World Court's decisions are binding on the parties. Treaty disputes may be resolved here, but any resulting treaty still requires ratification by vote of all Citizens.\n\n"
     
     # World Fair Witness
-    md += "### World Fair Witness Branch\n\n"
-    md += "The World Fair Witness Council operates at planetary scale, setting standards and criteria for all Fair Witness training, testing, and certification.\n\n"
+    yield "### World Fair Witness Branch\n\n"
+    yield "The World Fair Witness Council operates at planetary scale, setting standards and criteria for all Fair Witness training, testing, and certification.\n\n"
     
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'World Fair Witness Council'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+    inst = graph.institution('World Fair Witness Council')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     
-    md += "See the Fair Witness Branch chapter for details on the World Fair Witness Council structure and authority.\n\n"
+    yield "See the Fair Witness Branch chapter for details on the World Fair Witness Council structure and authority.\n\n"
     
     # Military Branch
-    md += "### Military Branch\n\n"
-    md += "The Military Branch exists solely at the World level and operates under strict civilian oversight. It is responsible for planetary defense and intelligence gathering.\n\n"
-    
-    md += "#### World Defense Force\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'World Defense Force'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
-    else:
-        md += "Unified military organization responsible for planetary defense, coordinated under civilian authority.\n\n"
-    
-    md += "**Key Principles:**\n\n"
-    md += "- **Civilian Oversight**: Senior Military Officer appointed by World Executive, approved by Senate\n"
-    md += "- **Unified Structure**: Single organization with departmentalized functions\n"
-    md += "- **Defensive Purpose**: Primary mission is planetary defense, not offensive operations\n"
-    md += "- **Limited Authority**: Cannot act without civilian authorization\n"
-    md += "- **Transparency**: Operations observed by Fair Witnesses where practical and appropriate\n\n"
-    
-    md += "#### Defense Force Intelligence\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Defense Force Intelligence'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+    yield "### Military Branch\n\n"
+    yield "The Military Branch exists solely at the World level and operates under strict civilian oversight. It is responsible for planetary defense and intelligence gathering.\n\n"
+    
+    yield "#### World Defense Force\n\n"
+    inst = graph.institution('World Defense Force')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     else:
-        md += "Intelligence gathering and analysis operations supporting planetary defense and threat assessment.\n\n"
-    
-    md += "#### Defense Force Council\n\n"
-    cur.execute('''
-        SELECT institution_desc
-        FROM scm_terran_society.institution
-        WHERE institution_name = 'Defense Force Council'
-    ''')
-    row = cur.fetchone()
-    if row:
-        md += f"{row['institution_desc']}\n\n"
+        yield "Unified military organization responsible for planetary defense, coordinated under civilian authority.\n\n"
+    
+    yield "**Key Principles:**\n\n"
+    yield "- **Civilian Oversight**: Senior Military Officer appointed by World Executive, approved by Senate\n"
+    yield "- **Unified Structure**: Single organization with departmentalized functions\n"
+    yield "- **Defensive Purpose**: Primary mission is planetary defense, not offensive operations\n"
+    yield "- **Limited Authority**: Cannot act without civilian authorization\n"
+    yield "- **Transparency**: Operations observed by Fair Witnesses where practical and appropriate\n\n"
+    
+    yield "#### Defense Force Intelligence\n\n"
+    inst = graph.institution('Defense Force Intelligence')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
     else:
-        md += "Advisory body providing oversight and coordination of military operations under civilian authority.\n\n"
+        yield "Intelligence gathering and analysis operations supporting planetary defense and threat assessment.\n\n"
     
-    md += "**Military Accountability:**\n\n"
-    md += "- Resource allocation controlled by World Legislature\n"
-    md += "- Operations subject to World Executive approval\n"
-    md += "- Personnel bound by the Rights of the People\n"
-    md += "- Subject to impeachment and removal for violations\n\n"
+    yield "#### Defense Force Council\n\n"
+    inst = graph.institution('Defense Force Council')
+    if inst:
+        yield f"{inst['institution_desc']}\n\n"
+    else:
+        yield "Advisory body providing oversight and coordination of military operations under civilian authority.\n\n"
     
-    return md
+    yield "**Military Accountability:**\n\n"
+    yield "- Resource allocation controlled by World Legislature\n"
+    yield "- Operations subject to World Executive approval\n"
+    yield "- Personnel bound by the Rights of the People\n"
+    yield "- Subject to impeachment and removal for violations\n\n"
 
-def generate_processes_chapter(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Processes and Procedures\n\n"
-    md += "Terran Society operates through clearly defined processes that ensure transparency, fairness, and accountability. These processes govern elections, judicial proceedings, and Fair Witness certification.\n\n"
-    
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    
-    # Get all processes grouped by type
-    cur.execute('''
-        SELECT process_name, process_header, process_desc
-        FROM scm_terran_society.process
-        ORDER BY sort_order
-    ''')
+def generate_processes_chapter(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Processes and Procedures\n\n"
+    yield "Terran Society operates through clearly defined processes that ensure transparency, fairness, and accountability. These processes govern elections, judicial proceedings, and Fair Witness certification.\n\n"
     
+    # All processes grouped by type
     current_category = None
-    for row in cur.fetchall():
+    for row in graph.processes:
         # Determine category from process name
         if 'Election' in row['process_name']:
             category = 'Election Processes'
@@ -986,16 +724,14 @@ def generate_processes_chapter(conn):
         
         # Add category header if new
         if category != current_category:
-            md += f"### {category}\n\n"
+            yield f"### {category}\n\n"
             current_category = category
         
-        md += f"#### {row['process_header']}\n\n"
-        md += f"{row['process_desc']}\n\n"
-    
-    return md
+        yield f"#### {row['process_header']}\n\n"
+        yield f"{row['process_desc']}\n\n"
 
-def generate_glossary(conn):
-    md = "<div style='page-break-before: always;'></div>\n\n## Glossary\n\n"
+def generate_glossary(graph):
+    yield "<div style='page-break-before: always;'></div>\n\n## Glossary\n\n"
     
     glossary_terms = {
         'Arbitration': 'A method of dispute resolution where parties voluntarily agree to have an Arbitrator hear their case and make a binding decision.',
@@ -1013,102 +749,236 @@ def generate_glossary(conn):
     }
     
     # Add roles from database
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute('''
-        SELECT DISTINCT r.role_name, r.role_desc
-        FROM scm_terran_society.role r
-        ORDER BY r.role_name
-    ''')
-    
-    for row in cur.fetchall():
-        glossary_terms[row['role_name']] = row['role_desc']
+    for role in sorted(graph.roles, key=lambda r: r['role_name']):
+        glossary_terms[role['role_name']] = role['role_desc']
     
     # Add institutions
-    cur.execute('''
-        SELECT DISTINCT institution_name, institution_desc
-        FROM scm_terran_society.institution
-        ORDER BY institution_name
-    ''')
-    
-    for row in cur.fetchall():
-        if row['institution_name'] not in glossary_terms:
-            glossary_terms[row['institution_name']] = row['institution_desc']
+    for inst in sorted(graph.institutions, key=lambda i: i['institution_name']):
+        if inst['institution_name'] not in glossary_terms:
+            glossary_terms[inst['institution_name']] = inst['institution_desc']
     
     # Sort and output with anchor IDs
     for term in sorted(glossary_terms.keys()):
         # Create URL-safe anchor ID from term
         anchor_id = 'glossary-' + term.lower().replace(' ', '-').replace('/', '-').replace('(', '').replace(')', '')
-        md += f"<span id=\"{anchor_id}\"></span>**{term}**: {glossary_terms[term]}\n\n"
-    
-    return md
-
-def main():
-    print("Generating Terran Society book manuscript...")
-    
+        yield f"<span id=\"{anchor_id}\"></span>**{term}**: {glossary_terms[term]}\n\n"
+
+class BookSources:
+    """Inputs shared by the chapter renderers, loaded on first use.
+
+    A build where every chapter is served from the cache never touches
+    the organisational tables at all.
+    """
+    
+    def __init__(self, conn, metadata=None, authors=None, graph=None):
+        self.conn = conn
+        self._metadata = metadata
+        self._authors = authors
+        self._graph = graph
+    
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = load_book_metadata(self.conn)
+        return self._metadata
+    
+    @property
+    def authors(self):
+        if self._authors is None:
+            self._authors = load_authors(self.conn)
+        return self._authors
+    
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = load_org_graph(self.conn)
+        return self._graph
+    
+    def preload(self, tables, pool=None, jobs=1):
+        """Eagerly load whatever chapters reading these tables will need.
+        
+        With a pool, the organisational tables are fetched concurrently,
+        one pooled connection per table query.
+        """
+        tables = set(tables)
+        if tables & {'book_metadata', 'book_author'}:
+            self.metadata, self.authors
+        if tables & set(org_graph.GRAPH_TABLES) and self._graph is None:
+            if pool is None:
+                self._graph = load_org_graph(self.conn)
+            else:
+                self._graph = load_org_graph_pooled(pool, jobs)
+    
+    def picklable(self):
+        """The loaded inputs as plain objects for shipping to worker processes."""
+        return (
+            dict(self._metadata) if self._metadata is not None else None,
+            [dict(a) for a in self._authors] if self._authors is not None else None,
+            self._graph,
+        )
+
+def generate_front_matter(src):
+    yield from generate_title_page(src.metadata)
+    yield from generate_author_page(src.metadata, src.authors)
+    yield from generate_dedication_page(src.metadata)
+    yield from generate_table_of_contents()
+
+# Manuscript chapters in book order: (name, source tables, input files, renderer).
+# Renderers yield Markdown fragments. The tables and files make up the
+# chapter's cache fingerprint.
+CHAPTERS = [
+    ('front_matter', ('book_metadata', 'book_author'), (), generate_front_matter),
+    ('introduction', (), (), lambda src: generate_introduction()),
+    ('principles', (), (), lambda src: generate_principles(load_principles())),
+    ('rights', (), (RIGHTS_FILE,), lambda src: generate_rights(load_rights())),
+    ('org_overview', ('tier', 'tier_explain', 'branch'), (), lambda src: generate_org_overview(src.graph)),
+    ('district', ('institution', 'role', 'role_duty'), (), lambda src: generate_district_level(src.graph)),
+    ('regional_executive', ('institution', 'role', 'role_duty'), (), lambda src: generate_regional_executive_chapter(src.graph)),
+    ('legislative', ('institution', 'role', 'role_duty'), (), lambda src: generate_legislative_chapter(src.graph)),
+    ('judicial', ('institution', 'role', 'role_duty'), (), lambda src: generate_judicial_chapter(src.graph)),
+    ('fair_witness', ('institution', 'institution_explain', 'role', 'role_explain'), (), lambda src: generate_fair_witness_chapter(src.graph)),
+    ('world', ('institution',), (), lambda src: generate_world_level(src.graph)),
+    ('processes', ('process',), (), lambda src: generate_processes_chapter(src.graph)),
+    ('glossary', ('role', 'institution'), (), lambda src: generate_glossary(src.graph)),
+]
+
+# Per-process state of a parallel render worker
+_worker_sources = None
+
+def _init_render_worker(metadata, authors, graph):
+    global _worker_sources
+    _worker_sources = BookSources(None, metadata, authors, graph)
+
+def _render_chapter_worker(name, cache_dir):
+    """Render one chapter into the cache directory and return its fragment path."""
+    render = {chapter[0]: chapter[3] for chapter in CHAPTERS}[name]
+    return str(ChapterCache(cache_dir).write(name, render(_worker_sources)))
+
+def render_chapters_parallel(names, src, cache, jobs):
+    """Render chapters on a pool of worker processes.
+    
+    Workers are spawned rather than forked so they never share the
+    parent's open database sockets. Returns {name: fragment path}.
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(jobs, len(names)), mp_context=context,
+                             initializer=_init_render_worker,
+                             initargs=src.picklable()) as executor:
+        futures = {executor.submit(_render_chapter_worker, name, str(cache.cache_dir)): name
+                   for name in names}
+        fragments = {}
+        for future in as_completed(futures):
+            fragments[futures[future]] = Path(future.result())
+            emit('chapter_rendered', chapter=futures[future])
+        return fragments
+
+def assemble_manuscript(fragments, output_path):
+    """Concatenate the chapter fragments {name: path} into output_path in book order."""
+    with atomic_output(output_path) as tmp_path, open(tmp_path, 'wb') as f:
+        for name, *_ in CHAPTERS:
+            with open(fragments[name], 'rb') as fragment:
+                shutil.copyfileobj(fragment, f)
+
+def renderer_digest():
+    """Hash of the rendering code, so code changes invalidate every chapter."""
+    h = hashlib.sha256()
+    for path in (Path(__file__), Path(org_graph.__file__)):
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the Terran Society book manuscript.')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the chapter cache and re-render every chapter')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='render chapters on N worker processes (default: 1)')
+    build_profile.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def build_manuscript(args):
+    log("Generating Terran Society book manuscript...")
+    
+    # With TS_BOOK_SNAPSHOT set, conn attaches to the caller's snapshot;
+    # otherwise it exports one for the pooled readers of this build.
     conn = get_connection()
     
     try:
-        # Load book metadata and authors
-        metadata = load_book_metadata(conn)
-        authors = load_authors(conn)
+        snapshot = current_snapshot() or export_snapshot(conn)
         
-        with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-            # Front matter
-            f.write(generate_title_page(metadata))
-            f.write(generate_author_page(metadata, authors))
-            f.write(generate_dedication_page(metadata))
-            f.write(generate_table_of_contents())
-            
-            # Title and introduction
-            f.write(generate_introduction())
-            
-            # Basic Principles
-            principles = load_principles()
-            f.write(generate_principles(principles))
-            
-            # Rights of the People
-            rights = load_rights()
-            f.write(generate_rights(rights))
-            
-            # Organizational overview
-            f.write(generate_org_overview(conn))
-            
-            # District level
-            f.write(generate_district_level(conn))
-            
-            # Regional Executive Branch
-            f.write(generate_regional_executive_chapter(conn))
+        with stage('db_load') as details:
+            # Fingerprint every source table in one statement
+            tables = {table for _, chapter_tables, _, _ in CHAPTERS for table in chapter_tables}
+            fingerprints = table_fingerprints(conn, tables)
+            code_digest = renderer_digest()
             
-            # Legislative Branch
-            f.write(generate_legislative_chapter(conn))
+            cache = ChapterCache(CHAPTER_CACHE_DIR)
+            src = BookSources(conn)
+            fragments = {}
+            keys = {}
             
-            # Judicial Branch
-            f.write(generate_judicial_chapter(conn))
+            for name, chapter_tables, files, render in CHAPTERS:
+                keys[name] = chapter_key(code_digest, chapter_tables, fingerprints, files)
+                path = None if args.full else cache.get(name, keys[name])
+                if path is not None:
+                    fragments[name] = path
+            rendered = [name for name, *_ in CHAPTERS if name not in fragments]
+            parallel = args.jobs > 1 and len(rendered) > 1
             
-            # Fair Witness Branch
-            f.write(generate_fair_witness_chapter(conn))
-            
-            # World Level
-            f.write(generate_world_level(conn))
-            
-            # Processes and Procedures
-            f.write(generate_processes_chapter(conn))
-            
-            # TODO: Add Regional Executive level
-            
-            # Glossary
-            f.write(generate_glossary(conn))
+            # Load what the changed chapters read before rendering any of them
+            dirty_tables = {table for name, chapter_tables, _, _ in CHAPTERS
+                            if name in rendered for table in chapter_tables}
+            if parallel:
+                pool = get_connection_pool(args.jobs, snapshot)
+                try:
+                    src.preload(dirty_tables, pool, args.jobs)
+                finally:
+                    pool.closeall()
+            else:
+                src.preload(dirty_tables)
+            details['tables'] = len(dirty_tables)
+        
+        with stage('render') as details:
+            if parallel:
+                fragments.update(render_chapters_parallel(rendered, src, cache, args.jobs))
+                for name in rendered:
+                    cache.manifest[name] = keys[name]
+            else:
+                for name, _, _, render in CHAPTERS:
+                    if name in rendered:
+                        fragments[name] = cache.put(name, keys[name], render(src))
+                        emit('chapter_rendered', chapter=name)
+            cache.save()
+            details.update(chapters=len(rendered), cached_chapters=len(CHAPTERS) - len(rendered))
         
-        print(f"✓ Manuscript generated: {OUTPUT_PATH}")
-        print(f"  Size: {OUTPUT_PATH.stat().st_size} bytes")
+        with stage('assemble'):
+            assemble_manuscript(fragments, OUTPUT_PATH)
+        
+        log(f"✓ Manuscript generated: {OUTPUT_PATH}")
+        log(f"  Re-rendered {len(rendered)} of {len(CHAPTERS)} chapters"
+            + (f": {', '.join(rendered)}" if rendered else ""))
+        log(f"  Size: {OUTPUT_PATH.stat().st_size} bytes")
+        
+        input_hash = hashlib.sha256('|'.join(keys[name] for name, *_ in CHAPTERS).encode()).hexdigest()
+        record_document('markdown', OUTPUT_PATH, input_hash,
+                        chapters=len(rendered), jobs=args.jobs, full=args.full)
         
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}", level='error')
         import traceback
         traceback.print_exc()
         raise
     finally:
         conn.close()
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        build_profile.start('generate_book', args.profile, args.profile_top)
+    try:
+        with build_lock('manuscript'):
+            build_manuscript(args)
+    finally:
+        build_profile.finish()
+
 if __name__ == '__main__':
     main()
@@ -3,270 +3,185 @@
 Generate HTML version of the book optimized for web viewing.
 Includes glossary term hyperlinking.
 """
+import argparse
 import subprocess
 import sys
-import re
 from pathlib import Path
-import psycopg2
 
-# PostgreSQL connection settings
-PG_HOST = 'localhost'
-PG_DATABASE = 'db_terran_society'
-PG_USER = 'rock'
-PG_PASSWORD = 'river'
+from lxml import etree
 
-def get_glossary_terms():
-    """Get all glossary terms from the database."""
-    conn = psycopg2.connect(
-        host=PG_HOST,
-        database=PG_DATABASE,
-        user=PG_USER,
-        password=PG_PASSWORD
-    )
-    cur = conn.cursor()
-    
-    glossary_terms = set()
-    
-    # Get role names
-    cur.execute('SELECT DISTINCT role_name FROM scm_terran_society.role ORDER BY role_name')
-    for row in cur.fetchall():
-        glossary_terms.add(row[0])
-    
-    # Get institution names
-    cur.execute('SELECT DISTINCT institution_name FROM scm_terran_society.institution ORDER BY institution_name')
-    for row in cur.fetchall():
-        glossary_terms.add(row[0])
-    
-    # Common terms that should be linked
-    common_terms = [
-        'District', 'Region', 'World', 'Tier', 'Branch',
-        'Elder', 'Representative', 'Fair Witness', 'Arbitrator',
-        'Jury', 'Cooperative'
-    ]
-    glossary_terms.update(common_terms)
-    
-    conn.close()
-    return glossary_terms
+import build_profile
+from artifact_cache import ArtifactCache, artifact_key, atomic_output, tool_version
+from manuscript_ast import ensure_ast
+from book_db import build_lock
+from build_events import log, stage
+from build_history import record_document
+from html_postprocess import detach, embed_css, find_by_id, get_glossary_terms, glossary_links, postprocess
 
-def move_toc_after_dedication(html_content):
+def move_toc_after_dedication(doc):
     """Move TOC after dedication page and add book title/subtitle."""
-    # Extract TOC
-    toc_match = re.search(r'(<nav id="TOC"[^>]*>.*?</nav>)', html_content, re.DOTALL)
-    if not toc_match:
-        print("Warning: Could not find TOC")
-        return html_content
-    
-    toc_html = toc_match.group(1)
-    
-    # Add book title, subtitle, and "Table of Contents" heading to TOC
-    toc_with_header = '''<div class="toc-page">
-<h1 class="toc-title">Terran Society</h1>
-<h2 class="toc-subtitle">A New Social Contract</h2>
-<h3 class="toc-heading">Table of Contents</h3>
-''' + toc_html + '</div>'
-    
-    # Remove TOC from original position
-    html_content = html_content.replace(toc_match.group(1), '<!-- TOC MOVED -->')
+    toc = find_by_id(doc, 'TOC')
+    if toc is None or toc.tag != 'nav':
+        log("Warning: Could not find TOC", level='warning')
+        return
     
     # Find dedication section
-    dedication_match = re.search(r'(<section[^>]*dedication[^>]*>.*?</section>)', html_content, re.DOTALL)
-    if not dedication_match:
-        print("Warning: Could not find dedication section")
-        return html_content
+    dedication = None
+    for section in doc.iter('section'):
+        if any('dedication' in value for value in section.attrib.values()):
+            dedication = section
+            break
+    if dedication is None:
+        log("Warning: Could not find dedication section", level='warning')
+        return
+    
+    # Wrap the TOC with the book title, subtitle and "Table of Contents" heading
+    toc_page = etree.Element('div', {'class': 'toc-page'})
+    for tag, css_class, text in (('h1', 'toc-title', 'Terran Society'),
+                                 ('h2', 'toc-subtitle', 'A New Social Contract'),
+                                 ('h3', 'toc-heading', 'Table of Contents')):
+        heading = etree.SubElement(toc_page, tag, {'class': css_class})
+        heading.text = text
+    toc_page.append(detach(toc))
     
     # Insert TOC after dedication
-    dedication_end = dedication_match.end()
-    html_content = html_content[:dedication_end] + '\n' + toc_with_header + html_content[dedication_end:]
-    
-    return html_content
+    dedication.addnext(toc_page)
 
-def add_header_and_sidebar(html_content):
+def add_header_and_sidebar(doc):
     """Add sticky header and floating sidebar navigation."""
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        return html_content
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
     # Create header
-    header = soup.new_tag('div', attrs={'class': 'book-header'})
-    header_title = soup.new_tag('div', attrs={'class': 'book-header-title'})
-    header_title.string = 'Terran Society: A New Social Contract'
-    header_nav = soup.new_tag('div', attrs={'class': 'book-header-nav'})
-    toc_link = soup.new_tag('a', href='#TOC')
-    toc_link.string = 'Table of Contents'
-    header_nav.append(toc_link)
-    header.append(header_title)
-    header.append(header_nav)
+    header = etree.Element('div', {'class': 'book-header'})
+    header_title = etree.SubElement(header, 'div', {'class': 'book-header-title'})
+    header_title.text = 'Terran Society: A New Social Contract'
+    header_nav = etree.SubElement(header, 'div', {'class': 'book-header-nav'})
+    toc_link = etree.SubElement(header_nav, 'a', href='#TOC')
+    toc_link.text = 'Table of Contents'
     
     # Create sidebar navigation from main headings
-    sidebar = soup.new_tag('div', attrs={'class': 'sidebar-nav'})
-    sidebar_title = soup.new_tag('h4')
-    sidebar_title.string = 'Navigation'
-    sidebar.append(sidebar_title)
-    sidebar_ul = soup.new_tag('ul')
+    sidebar = etree.Element('div', {'class': 'sidebar-nav'})
+    sidebar_title = etree.SubElement(sidebar, 'h4')
+    sidebar_title.text = 'Navigation'
+    sidebar_ul = etree.SubElement(sidebar, 'ul')
     
     # Find all H2 headings (main sections)
-    for h2 in soup.find_all('h2'):
+    for h2 in doc.iter('h2'):
         if h2.get('id'):
-            li = soup.new_tag('li')
-            a = soup.new_tag('a', href=f"#{h2.get('id')}")
-            a.string = h2.get_text()[:50]  # Truncate long titles
-            li.append(a)
-            sidebar_ul.append(li)
-    
-    sidebar.append(sidebar_ul)
+            li = etree.SubElement(sidebar_ul, 'li')
+            a = etree.SubElement(li, 'a', href=f"#{h2.get('id')}")
+            a.text = h2.text_content()[:50]  # Truncate long titles
     
     # Insert header and sidebar after body tag
-    body = soup.find('body')
-    if body:
+    body = doc.find('body')
+    if body is not None:
         body.insert(0, sidebar)
         body.insert(0, header)
-    
-    return str(soup)
-
-def add_glossary_links(html_content, glossary_terms):
-    """Add hyperlinks to glossary terms in the HTML content using BeautifulSoup."""
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        print("Note: BeautifulSoup not installed - skipping glossary links")
-        print("Install with: pip3 install beautifulsoup4")
-        return html_content
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Find the glossary section to get the anchor ID
-    glossary_section = soup.find(id='glossary')
-    if not glossary_section:
-        print("Warning: Glossary section not found")
-        return html_content
-    
-    # Sort terms by length (longest first) to avoid partial matches
-    sorted_terms = sorted(glossary_terms, key=len, reverse=True)
-    
-    # Find all paragraph and list item elements (main content)
-    content_tags = soup.find_all(['p', 'li'])
-    
-    for tag in content_tags:
-        # Skip if this is in TOC or glossary itself
-        if tag.find_parent(id='TOC') or tag.find_parent(id='glossary'):
-            continue
-        
-        # Process text nodes
-        for text_node in tag.find_all(string=True, recursive=True):
-            # Skip if already in a link
-            if text_node.find_parent('a'):
-                continue
-            
-            text = str(text_node)
-            modified = False
-            
-            for term in sorted_terms:
-                # Case-insensitive word boundary match
-                pattern = r'\b(' + re.escape(term) + r')\b'
-                if re.search(pattern, text, re.IGNORECASE):
-                    # Create URL-safe anchor ID for the term
-                    anchor_id = 'glossary-' + term.lower().replace(' ', '-').replace('/', '-').replace('(', '').replace(')', '')
-                    # Create new content with link to specific term
-                    new_html = re.sub(
-                        pattern,
-                        rf'<a href="#{anchor_id}" class="glossary-term" title="See glossary: \1">\1</a>',
-                        text,
-                        count=1,  # Only link first occurrence in each text node
-                        flags=re.IGNORECASE
-                    )
-                    if new_html != text:
-                        # Replace text node with new HTML
-                        new_soup = BeautifulSoup(new_html, 'html.parser')
-                        text_node.replace_with(new_soup)
-                        modified = True
-                        break  # Only link one term per text node to avoid over-linking
-    
-    return str(soup)
 
-def main():
+def build_html():
     base_dir = Path(__file__).parent.parent
     manuscript = base_dir / 'book' / 'manuscript.md'
+    ast_file = base_dir / 'book' / 'manuscript.json'
     html_file = base_dir / 'book' / 'TerranSocietyBook_web.html'
     output_html = base_dir / 'book' / 'TerranSocietyBook.html'  # Final output
+    css_file = base_dir / 'templates' / 'book_html.css'
+    cache = ArtifactCache()
     
     if not manuscript.exists():
-        print(f"Error: {manuscript} not found. Generate the book first.")
+        log(f"Error: {manuscript} not found. Generate the book first.", level='error')
         return 1
     
-    print(f"Generating HTML from {manuscript}...")
+    log(f"Generating HTML from {manuscript}...")
+    
+    # Step 1: Parse the manuscript once (shared with the other formats)
+    try:
+        with stage('pandoc_ast') as details:
+            details['cached'] = not ensure_ast(manuscript, ast_file, cache)
+        if not details['cached']:
+            log(f"✓ Manuscript parsed: {ast_file}")
+    except FileNotFoundError:
+        log("Error: pandoc not found.", level='error')
+        log("Install with: sudo apt-get install pandoc", level='error')
+        return 1
+    except RuntimeError as e:
+        log(f"Error parsing manuscript: {e}", level='error')
+        return 1
     
-    # Step 1: Convert markdown to HTML with Pandoc (without CSS - we'll embed it)
+    # Step 2: Write HTML from the AST with Pandoc (without CSS - we'll embed it)
     html_cmd = [
         'pandoc',
-        str(manuscript),
+        str(ast_file),
         '-o', str(html_file),
+        '-f', 'json',
         '--standalone',
         '--toc',
         '--toc-depth=3',
         '--metadata', 'title=Terran Society',
     ]
-    
-    try:
-        result = subprocess.run(
-            html_cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(base_dir)
-        )
-        
-        if result.returncode != 0:
-            print(f"Error generating HTML: {result.stderr}")
-            return 1
+    pandoc_key = artifact_key('pandoc-web-html', tool_version('pandoc'), ' '.join(html_cmd[4:]), ast_file)
+    
+    # The glossary terms are the role and institution names the manuscript's
+    # glossary is rendered from plus COMMON_TERMS, so pandoc_key (through the
+    # manuscript) and html_postprocess.py already cover them; a cached build
+    # never queries the database
+    post_key = artifact_key('web-html', pandoc_key, css_file, Path(__file__),
+                            Path(__file__).with_name('glossary_linker.py'),
+                            Path(__file__).with_name('html_postprocess.py'), tool_version('lxml'))
+    
+    if cache.restore(post_key, output_html):
+        log(f"✓ HTML unchanged, restored from cache: {output_html}")
+        record_document('html', output_html, post_key, cached=True)
+        return 0
+    
+    with stage('pandoc') as details:
+        details['cached'] = cache.restore(pandoc_key, html_file)
+        if details['cached']:
+            log(f"✓ HTML restored from cache: {html_file}")
+        else:
+            try:
+                result = subprocess.run(
+                    html_cmd,
+                    capture_output=True,
+                    text=True,
+                    cwd=str(base_dir)
+                )
+                
+                if result.returncode != 0:
+                    log(f"Error generating HTML: {result.stderr}", level='error')
+                    return 1
+                
+                log(f"✓ HTML generated: {html_file}")
+                
+            except FileNotFoundError:
+                log("Error: pandoc not found.", level='error')
+                log("Install with: sudo apt-get install pandoc", level='error')
+                return 1
+            cache.put(pandoc_key, html_file)
+    
+    with stage('db_load'):
+        glossary_terms = get_glossary_terms()
+    log(f"Found {len(glossary_terms)} glossary terms")
+    
+    # Step 3: Post-process HTML - one parse, ordered tree transforms, one serialisation
+    with stage('postprocess', "Post-processing HTML..."):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        with open(css_file, 'r', encoding='utf-8') as f:
+            css_content = f.read()
         
-        print(f"✓ HTML generated: {html_file}")
+        html_content = postprocess(html_content, [
+            move_toc_after_dedication,       # with book title/subtitle
+            glossary_links(glossary_terms),
+            embed_css(css_content),
+            add_header_and_sidebar,
+        ])
         
-    except FileNotFoundError:
-        print("Error: pandoc not found.")
-        print("Install with: sudo apt-get install pandoc")
-        return 1
-    
-    # Step 2: Post-process HTML - move TOC and add title
-    print("Post-processing HTML...")
+        # Write final output
+        with atomic_output(output_html) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        cache.put(post_key, output_html)
     
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    # Move TOC after dedication and add book title/subtitle
-    html_content = move_toc_after_dedication(html_content)
-    
-    # Get glossary terms from database
-    glossary_terms = get_glossary_terms()
-    print(f"Found {len(glossary_terms)} glossary terms")
-    
-    # Add glossary links (simplified - only in main content sections)
-    # This is a basic implementation - you may want to refine the matching logic
-    html_content = add_glossary_links(html_content, glossary_terms)
-    
-    # Step 3: Embed CSS
-    print("Embedding CSS...")
-    css_file = base_dir / 'templates' / 'book_html.css'
-    with open(css_file, 'r', encoding='utf-8') as f:
-        css_content = f.read()
-    
-    # Insert CSS into HTML head
-    html_content = html_content.replace(
-        '</head>',
-        f'<style>{css_content}</style>\n</head>'
-    )
-    
-    # Step 4: Add header and sidebar navigation
-    print("Adding header and sidebar navigation...")
-    html_content = add_header_and_sidebar(html_content)
-    
-    # Write final output
-    with open(output_html, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"✓ HTML with glossary links generated: {output_html}")
-    print(f"  Size: {output_html.stat().st_size / 1024:.1f} KB")
+    log(f"✓ HTML with glossary links generated: {output_html}")
+    log(f"  Size: {output_html.stat().st_size / 1024:.1f} KB")
+    record_document('html', output_html, post_key, cached=False)
     
     # Clean up temp file
     if html_file.exists() and html_file != output_html:
@@ -274,5 +189,20 @@ def main():
     
     return 0
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the Terran Society book HTML.')
+    build_profile.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        build_profile.start('generate_html', args.profile, args.profile_top)
+    try:
+        with build_lock('html'):
+            return build_html()
+    finally:
+        build_profile.finish()
+
 if __name__ == '__main__':
     sys.exit(main())
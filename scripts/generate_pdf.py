@@ -3,257 +3,258 @@
 Generate PDF from markdown using Pandoc + WeasyPrint (HTML→PDF).
 WeasyPrint is lightweight and produces good book formatting.
 """
+import argparse
 import subprocess
 import sys
-import re
 from pathlib import Path
 
-def get_glossary_terms():
-    """Get all glossary terms from the database."""
-    import psycopg2
-    
-    conn = psycopg2.connect(
-        host='localhost',
-        database='db_terran_society',
-        user='rock',
-        password='river'
-    )
-    cur = conn.cursor()
-    
-    glossary_terms = set()
-    
-    # Get role names
-    cur.execute('SELECT DISTINCT role_name FROM scm_terran_society.role ORDER BY role_name')
-    for row in cur.fetchall():
-        glossary_terms.add(row[0])
-    
-    # Get institution names
-    cur.execute('SELECT DISTINCT institution_name FROM scm_terran_society.institution ORDER BY institution_name')
-    for row in cur.fetchall():
-        glossary_terms.add(row[0])
-    
-    # Common terms
-    common_terms = [
-        'District', 'Region', 'World', 'Tier', 'Branch',
-        'Elder', 'Representative', 'Fair Witness', 'Arbitrator',
-        'Jury', 'Cooperative'
-    ]
-    glossary_terms.update(common_terms)
-    
-    conn.close()
-    return glossary_terms
+from lxml import etree
 
-def add_glossary_links_to_pdf(html_content, glossary_terms):
-    """Add glossary links to PDF HTML using BeautifulSoup."""
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        print("Note: BeautifulSoup not installed - skipping glossary links in PDF")
-        return html_content
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Check if glossary section exists
-    glossary_section = soup.find(id='glossary')
-    if not glossary_section:
-        return html_content
-    
-    # Sort terms by length (longest first)
-    sorted_terms = sorted(glossary_terms, key=len, reverse=True)
-    
-    # Find all paragraph and list item elements
-    content_tags = soup.find_all(['p', 'li'])
-    
-    for tag in content_tags:
-        # Skip if in TOC or glossary
-        if tag.find_parent(id='TOC') or tag.find_parent(id='glossary'):
-            continue
-        
-        # Process text nodes
-        for text_node in tag.find_all(string=True, recursive=True):
-            if text_node.find_parent('a'):
-                continue
-            
-            text = str(text_node)
-            
-            for term in sorted_terms:
-                pattern = r'\b(' + re.escape(term) + r')\b'
-                if re.search(pattern, text, re.IGNORECASE):
-                    # Create anchor ID
-                    anchor_id = 'glossary-' + term.lower().replace(' ', '-').replace('/', '-').replace('(', '').replace(')', '')
-                    # Create link
-                    new_html = re.sub(
-                        pattern,
-                        rf'<a href="#{anchor_id}" class="glossary-term" title="See glossary: \1">\1</a>',
-                        text,
-                        count=1,
-                        flags=re.IGNORECASE
-                    )
-                    if new_html != text:
-                        new_soup = BeautifulSoup(new_html, 'html.parser')
-                        text_node.replace_with(new_soup)
-                        break
-    
-    return str(soup)
+import build_profile
+from artifact_cache import ArtifactCache, artifact_key, atomic_output, tool_version
+from book_db import build_lock
+from build_events import emit, log, stage
+from build_history import record_document
+from html_postprocess import (blank_page, detach, find_by_id, get_glossary_terms, glossary_links,
+                              is_blank_page, is_page_break, next_element, postprocess)
+from manuscript_ast import ensure_ast
+from parallel_pdf import PageNumbersUnsettled, render_pdf_parallel
 
-def fix_html_formatting(html_file):
-    """Post-process HTML to fix TOC placement, hide Pandoc title block, and add blank pages."""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    # 1. Hide Pandoc's title-block-header (we use custom cover page instead)
-    html = html.replace(
-        '<header id="title-block-header">',
-        '<header id="title-block-header" style="display: none;">'
-    )
-    
-    # 2. Extract TOC section
-    import re
-    toc_match = re.search(r'(<nav id="TOC"[^>]*>.*?</nav>)', html, re.DOTALL)
-    if not toc_match:
-        print("Warning: Could not find TOC in HTML")
+def hide_title_block(doc):
+    """Hide Pandoc's title-block-header (we use custom cover page instead)."""
+    title_block = find_by_id(doc, 'title-block-header')
+    if title_block is not None:
+        title_block.set('style', 'display: none;')
+
+def move_toc_after_dedication(doc):
+    """Move the TOC, with a heading and a blank page before it, after the dedication page break."""
+    toc = find_by_id(doc, 'TOC')
+    if toc is None or toc.tag != 'nav':
+        log("Warning: Could not find TOC in HTML", level='warning')
         return
     
-    toc_html = toc_match.group(1)
-    
-    # Add "Table of Contents" heading to TOC
-    toc_html = toc_html.replace(
-        '<nav id="TOC"',
-        '<nav id="TOC" style="page-break-before: always;"'
-    )
-    if '<h1>' not in toc_html:
-        toc_html = toc_html.replace(
-            '<nav id="TOC" style="page-break-before: always;" role="doc-toc">',
-            '<nav id="TOC" style="page-break-before: always;" role="doc-toc"><h1>Table of Contents</h1>'
-        )
-    
-    # 3. Remove TOC from original position
-    html = html.replace(toc_match.group(1), '<!-- TOC MOVED -->')
-    
-    # 4. Find dedication section and insert blank page + TOC after it
-    dedication_pos = html.find('id="dedication"')
-    if dedication_pos == -1:
-        print("Warning: Could not find dedication section")
+    dedication = find_by_id(doc, 'dedication')
+    if dedication is None:
+        log("Warning: Could not find dedication section", level='warning')
         return
+    if dedication.tag != 'section':
+        dedication = next(dedication.iterancestors('section'), dedication)
     
-    # Find the page-break-after div after dedication (may have whitespace/newlines)
-    dedication_end_pattern = re.search(r'(</section>\s*<div style="page-break-after: always;">\s*</div>)', html[dedication_pos:], re.DOTALL)
-    if not dedication_end_pattern:
-        print("Warning: Could not find dedication end")
+    # The page-break-after div that follows the dedication section
+    page_break = next_element(dedication)
+    if not is_page_break(page_break, 'page-break-after: always;'):
+        log("Warning: Could not find dedication end", level='warning')
         return
     
-    # Insert: blank page + TOC after dedication's page break
-    actual_dedication_end = dedication_pos + dedication_end_pattern.end()
-    html = html[:actual_dedication_end] + '\n<div class="blank-page"></div>\n' + toc_html + html[actual_dedication_end:]
-    
-    # 5. Add blank page after cover
-    html = re.sub(
-        r'(<section id="terran-society" class="cover-page">.*?</section>\s*<div style="page-break-after: always;">\s*</div>)',
-        r'\1\n<div class="blank-page"></div>',
-        html,
-        count=1,
-        flags=re.DOTALL
-    )
-    
-    # 6. Remove duplicate page breaks
-    # Remove page-break-before after TOC (it will be right before Introduction H1)
-    html = re.sub(
-        r'(</nav>)\s*<div style="page-break-before: always;">\s*</div>',
-        r'\1',
-        html,
-        flags=re.DOTALL
-    )
-    
-    # Remove duplicate blank pages (two consecutive blank-page divs)
-    while '<div class="blank-page"></div>\n<div class="blank-page"></div>' in html:
-        html = html.replace(
-            '<div class="blank-page"></div>\n<div class="blank-page"></div>',
-            '<div class="blank-page"></div>'
-        )
-    
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Add "Table of Contents" heading to TOC
+    toc.set('style', 'page-break-before: always;')
+    if toc.find('h1') is None:
+        heading = etree.Element('h1')
+        heading.text = 'Table of Contents'
+        heading.tail = toc.text
+        toc.text = None
+        toc.insert(0, heading)
     
-    print("✓ HTML formatted: TOC moved after dedication, blank pages added, title block hidden")
+    # Insert: blank page + TOC after dedication's page break
+    detach(toc)
+    page_break.addnext(toc)
+    page_break.addnext(blank_page())
+
+def add_blank_page_after_cover(doc):
+    """Add a blank page after the cover page break."""
+    cover = find_by_id(doc, 'terran-society')
+    if cover is None or cover.tag != 'section' or cover.get('class') != 'cover-page':
+        return
+    page_break = next_element(cover)
+    if is_page_break(page_break, 'page-break-after: always;'):
+        page_break.addnext(blank_page())
+
+def remove_duplicate_page_breaks(doc):
+    """Remove the page break right after the TOC and consecutive blank pages."""
+    toc = find_by_id(doc, 'TOC')
+    if toc is not None:
+        # The TOC is followed by the page-break-before of the Introduction H1
+        following = next_element(toc)
+        if is_page_break(following, 'page-break-before: always;'):
+            detach(following)
+    
+    for div in list(doc.iter('div')):
+        if is_blank_page(div) and div.getparent() is not None:
+            following = next_element(div)
+            while is_blank_page(following):
+                detach(following)
+                following = next_element(div)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the Terran Society book PDF.')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='lay out chapters on N worker processes and merge them (default: 1)')
+    build_profile.add_arguments(parser)
+    return parser.parse_args(argv)
 
-def main():
+def write_pdf(html_file, output_pdf):
+    """Lay out html_file with WeasyPrint and replace output_pdf with the result."""
+    from weasyprint import HTML
+    
+    document = HTML(filename=str(html_file)).render()
+    emit('pages_laid_out', pages=len(document.pages))
+    with atomic_output(output_pdf) as tmp_pdf:
+        document.write_pdf(str(tmp_pdf))
+
+def build_pdf(args):
     base_dir = Path(__file__).parent.parent
     manuscript = base_dir / 'book' / 'manuscript.md'
+    ast_file = base_dir / 'book' / 'manuscript.json'
     html_file = base_dir / 'book' / 'TerranSocietyBook_pdf.html'  # PDF-specific HTML
     output_pdf = base_dir / 'book' / 'TerranSocietyBook.pdf'
+    css_file = base_dir / 'templates' / 'book.css'
+    cache = ArtifactCache()
     
     if not manuscript.exists():
-        print(f"Error: {manuscript} not found. Generate the book first.")
+        log(f"Error: {manuscript} not found. Generate the book first.", level='error')
         return 1
     
-    print(f"Generating HTML from {manuscript}...")
+    # Step 1: Parse the manuscript once (shared with the other formats)
+    try:
+        with stage('pandoc_ast') as details:
+            details['cached'] = not ensure_ast(manuscript, ast_file, cache)
+        if not details['cached']:
+            log(f"✓ Manuscript parsed: {ast_file}")
+    except FileNotFoundError:
+        log("Error: pandoc not found.", level='error')
+        log("Install with: sudo apt-get install pandoc", level='error')
+        return 1
+    except RuntimeError as e:
+        log(f"Error parsing manuscript: {e}", level='error')
+        return 1
     
-    # Step 1: Convert markdown to HTML with Pandoc
+    # Step 2: Write HTML from the AST with Pandoc
     html_cmd = [
         'pandoc',
-        str(manuscript),
+        str(ast_file),
         '-o', str(html_file),
+        '-f', 'json',
         '--standalone',
         '--toc',
         '--toc-depth=3',
-        '--css', str(base_dir / 'templates' / 'book.css'),
+        '--css', str(css_file),
         '--metadata', 'title=Terran Society',
     ]
+    pandoc_key = artifact_key('pandoc-pdf-html', tool_version('pandoc'), ' '.join(html_cmd[4:]), ast_file)
+    
+    # The glossary terms are the role and institution names the manuscript's
+    # glossary is rendered from plus COMMON_TERMS, so pandoc_key (through the
+    # manuscript) and html_postprocess.py already cover them; a cached build
+    # never queries the database
+    post_key = artifact_key('pdf-html', pandoc_key, Path(__file__),
+                            Path(__file__).with_name('glossary_linker.py'),
+                            Path(__file__).with_name('html_postprocess.py'), tool_version('lxml'))
+    # Parallel rendering splits, renumbers and merges parts, so its code and
+    # the part layout (single process when pypdf is missing) shape the PDF too
+    pypdf_version = tool_version('pypdf')
+    layout = f'parallel-{args.jobs}-pypdf-{pypdf_version}' if args.jobs > 1 and pypdf_version != 'missing' else 'single'
+    pdf_key = artifact_key('weasyprint-pdf', post_key, css_file, tool_version('weasyprint'),
+                           Path(__file__).with_name('parallel_pdf.py'), layout)
+    
+    if cache.restore(pdf_key, output_pdf):
+        log(f"✓ PDF unchanged, restored from cache: {output_pdf}")
+        record_document('pdf', output_pdf, pdf_key, cached=True)
+        return 0
     
-    try:
-        result = subprocess.run(
-            html_cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(base_dir)
-        )
-        
-        if result.returncode != 0:
-            print(f"Error generating HTML: {result.stderr}")
-            return 1
+    log(f"Generating HTML from {manuscript}...")
+    
+    if cache.restore(post_key, html_file):
+        log(f"✓ Formatted HTML restored from cache: {html_file}")
+    else:
+        with stage('pandoc') as details:
+            details['cached'] = cache.restore(pandoc_key, html_file)
+            if details['cached']:
+                log(f"✓ HTML restored from cache: {html_file}")
+            else:
+                try:
+                    result = subprocess.run(
+                        html_cmd,
+                        capture_output=True,
+                        text=True,
+                        cwd=str(base_dir)
+                    )
+                    
+                    if result.returncode != 0:
+                        log(f"Error generating HTML: {result.stderr}", level='error')
+                        return 1
+                    
+                    log(f"✓ HTML generated: {html_file}")
+                    
+                except FileNotFoundError:
+                    log("Error: pandoc not found.", level='error')
+                    log("Install with: sudo apt-get install pandoc", level='error')
+                    return 1
+                cache.put(pandoc_key, html_file)
         
-        print(f"✓ HTML generated: {html_file}")
+        with stage('db_load'):
+            glossary_terms = get_glossary_terms()
+        log(f"Found {len(glossary_terms)} glossary terms")
         
-    except FileNotFoundError:
-        print("Error: pandoc not found.")
-        print("Install with: sudo apt-get install pandoc")
-        return 1
-    
-    # Step 2: Add glossary links
-    print("Adding glossary term links...")
-    glossary_terms = get_glossary_terms()
-    print(f"Found {len(glossary_terms)} glossary terms")
-    
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    html_content = add_glossary_links_to_pdf(html_content, glossary_terms)
-    
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    # Step 3: Post-process HTML formatting
-    fix_html_formatting(html_file)
+        # Step 3: Post-process HTML - one parse, ordered tree transforms, one serialisation
+        with stage('postprocess', "Adding glossary links and formatting HTML..."):
+            with open(html_file, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+            
+            html_content = postprocess(html_content, [
+                glossary_links(glossary_terms),
+                hide_title_block,
+                move_toc_after_dedication,
+                add_blank_page_after_cover,
+                remove_duplicate_page_breaks,
+            ])
+            
+            with atomic_output(html_file) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            cache.put(post_key, html_file)
+        log("✓ HTML formatted: TOC moved after dedication, blank pages added, title block hidden")
     
     # Step 4: Convert HTML to PDF with WeasyPrint
-    print(f"Converting HTML to PDF...")
-    
     try:
-        from weasyprint import HTML
+        import weasyprint  # noqa: F401
         
-        HTML(filename=str(html_file)).write_pdf(str(output_pdf))
+        with stage('weasyprint', "Converting HTML to PDF..."):
+            if args.jobs > 1:
+                try:
+                    parts = render_pdf_parallel(html_file, output_pdf, css_file, args.jobs)
+                    log(f"  Rendered {parts} parts on {args.jobs} processes")
+                except ImportError:
+                    log("Note: pypdf not installed - rendering on a single process")
+                    log("Install with: pip3 install pypdf")
+                    write_pdf(html_file, output_pdf)
+                except PageNumbersUnsettled as e:
+                    log(f"Warning: {e} - rendering on a single process", level='warning')
+                    write_pdf(html_file, output_pdf)
+            else:
+                write_pdf(html_file, output_pdf)
+        cache.put(pdf_key, output_pdf)
         
-        print(f"✓ PDF generated successfully: {output_pdf}")
-        print(f"  Size: {output_pdf.stat().st_size / 1024:.1f} KB")
+        log(f"✓ PDF generated successfully: {output_pdf}")
+        log(f"  Size: {output_pdf.stat().st_size / 1024:.1f} KB")
+        record_document('pdf', output_pdf, pdf_key, cached=False, jobs=args.jobs)
         return 0
         
     except ImportError:
-        print("Error: WeasyPrint not found.")
-        print("Install with: pip3 install weasyprint")
+        log("Error: WeasyPrint not found.", level='error')
+        log("Install with: pip3 install weasyprint", level='error')
         return 1
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}", level='error')
         return 1
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        build_profile.start('generate_pdf', args.profile, args.profile_top)
+    try:
+        with build_lock('pdf'):
+            return build_pdf(args)
+    finally:
+        build_profile.finish()
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Glossary term linking shared by the HTML and PDF builds.
+
+All glossary terms go into one case-insensitive Aho-Corasick automaton, so
+each text node is scanned once no matter how many terms there are.  The
+rules are the ones the per-term regex scan used:
+
+- a term only matches on word boundaries (like \\b in a regex),
+- the longest matching term in a text node wins, at its first occurrence
+  (ties go to the earliest match),
+- each text node gets at most one link,
+- text in the TOC, in the glossary itself, inside links and in headings
+  is left alone.
+"""
+from collections import deque
+
+# Elements whose text, and their descendants' text, is never linked
+SKIPPED_TAGS = frozenset({'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+
+def glossary_anchor(term):
+    """Return the id of a term's entry in the glossary chapter."""
+    return 'glossary-' + term.lower().replace(' ', '-').replace('/', '-').replace('(', '').replace(')', '')
+
+
+def _fold(ch):
+    """Lowercase one character, keeping string offsets aligned."""
+    folded = ch.lower()
+    return folded if len(folded) == 1 else ch
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _at_boundary(text, i):
+    """True where a regex \\b would match between text[i-1] and text[i]."""
+    before = i > 0 and _is_word(text[i - 1])
+    after = i < len(text) and _is_word(text[i])
+    return before != after
+
+
+class GlossaryLinker:
+    """Aho-Corasick automaton over a set of glossary terms."""
+
+    def __init__(self, terms):
+        # Node 0 is the root; goto[n] maps a character to the next node,
+        # out[n] holds (length, term) for every term ending at node n.
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for term in sorted(set(terms)):
+            if not term:
+                continue
+            node = 0
+            for ch in term:
+                ch = _fold(ch)
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            if not any(length == len(term) for length, _ in self.out[node]):
+                self.out[node].append((len(term), term))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """Return (start, end, term) of the match to link in text, or None."""
+        best = None
+        node = 0
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = ''.join(_fold(ch) for ch in text)
+        for i, ch in enumerate(folded):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, term in self.out[node]:
+                end = i + 1
+                start = end - length
+                if best is not None and length <= best[1] - best[0]:
+                    continue
+                if _at_boundary(text, start) and _at_boundary(text, end):
+                    best = (start, end, term)
+        return best
+
+
+def _skipped(el):
+    """True for text inside a link or heading (SKIPPED_TAGS)."""
+    return el.tag in SKIPPED_TAGS or any(a.tag in SKIPPED_TAGS for a in el.iterancestors())
+
+
+def _text_slots(tag):
+    """Yield (element, attribute) for every run of text inside tag.
+
+    lxml keeps text in element.text (before the first child) and in
+    child.tail (after each child); text inside links, headings and comments
+    is skipped.
+    """
+    for el in tag.iter():
+        if isinstance(el.tag, str) and el.text and not _skipped(el):
+            yield el, 'text'
+        if el is not tag and el.tail and not _skipped(el.getparent()):
+            yield el, 'tail'
+
+
+def link_glossary_terms(doc, linker):
+    """Link glossary terms in the paragraphs and list items of an lxml document.
+
+    Returns the number of links added.
+    """
+    from lxml import etree
+
+    slots = []
+    seen = set()
+    for tag in doc.iter('p', 'li'):
+        if any(a.get('id') in ('TOC', 'glossary') for a in tag.iterancestors()):
+            continue
+        for slot in _text_slots(tag):
+            key = (id(slot[0]), slot[1])
+            if key not in seen:
+                seen.add(key)
+                slots.append(slot)
+
+    links = 0
+    for el, attr in slots:
+        text = getattr(el, attr)
+        match = linker.find(text)
+        if match is None:
+            continue
+        start, end, term = match
+        link = etree.Element('a', {
+            'href': f'#{glossary_anchor(term)}',
+            'class': 'glossary-term',
+            'title': f'See glossary: {text[start:end]}',
+        })
+        link.text = text[start:end]
+        link.tail = text[end:] or None
+        setattr(el, attr, text[:start] or None)
+        if attr == 'text':
+            el.insert(0, link)
+        else:
+            el.addnext(link)
+        links += 1
+    return links
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Single-parse post-processing of pandoc's HTML output.
+
+The pandoc output is parsed once with lxml, each transform in an ordered
+list edits the tree in place, and the result is serialised once.  The
+web-specific and print-specific transforms live in generate_html.py and
+generate_pdf.py; the ones both builds use live here.
+"""
+from lxml import etree
+import lxml.html
+
+from book_db import get_connection
+from build_events import emit, log, stage
+from glossary_linker import GlossaryLinker, link_glossary_terms
+
+# Terms linked in every build besides the role and institution names
+COMMON_TERMS = [
+    'District', 'Region', 'World', 'Tier', 'Branch',
+    'Elder', 'Representative', 'Fair Witness', 'Arbitrator',
+    'Jury', 'Cooperative'
+]
+
+
+def parse_html(html_content):
+    """Parse a whole HTML document into an lxml element tree."""
+    return lxml.html.document_fromstring(html_content)
+
+
+def serialize_html(doc):
+    """Serialise a document back to HTML, keeping its doctype."""
+    return etree.tostring(doc.getroottree(), method='html', encoding='unicode')
+
+
+def postprocess(html_content, transforms):
+    """Parse html_content, apply each transform(doc) in order and serialise."""
+    doc = parse_html(html_content)
+    for transform in transforms:
+        transform(doc)
+    return serialize_html(doc)
+
+
+def find_by_id(doc, element_id):
+    """Return the element with this id, or None."""
+    found = doc.xpath('//*[@id=$id]', id=element_id)
+    return found[0] if found else None
+
+
+def detach(el):
+    """Remove an element from the tree, keeping the text that followed it."""
+    parent = el.getparent()
+    if el.tail:
+        previous = el.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + el.tail
+        else:
+            parent.text = (parent.text or '') + el.tail
+    el.tail = None
+    parent.remove(el)
+    return el
+
+
+def next_element(el):
+    """Return the following sibling element if only whitespace separates them."""
+    if el.tail and el.tail.strip():
+        return None
+    return el.getnext()
+
+
+def is_page_break(el, style):
+    """True for an empty <div style="page-break-...: always;"> marker."""
+    return (el is not None and el.tag == 'div' and len(el) == 0
+            and not (el.text or '').strip()
+            and (el.get('style') or '').replace(' ', '') == style.replace(' ', ''))
+
+
+def is_blank_page(el):
+    return el is not None and el.tag == 'div' and el.get('class') == 'blank-page'
+
+
+def blank_page():
+    return etree.Element('div', {'class': 'blank-page'})
+
+
+def get_glossary_terms():
+    """Get all glossary terms from the database.
+
+    Reads from the build's exported snapshot when TS_BOOK_SNAPSHOT is set,
+    so the links match the manuscript they are applied to.
+    """
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        glossary_terms = set(COMMON_TERMS)
+        cur.execute('SELECT DISTINCT role_name FROM scm_terran_society.role ORDER BY role_name')
+        glossary_terms.update(row[0] for row in cur.fetchall())
+        cur.execute('SELECT DISTINCT institution_name FROM scm_terran_society.institution ORDER BY institution_name')
+        glossary_terms.update(row[0] for row in cur.fetchall())
+    finally:
+        conn.close()
+    return glossary_terms
+
+
+def glossary_links(glossary_terms):
+    """Transform: link glossary terms, if the document has a glossary."""
+    linker = GlossaryLinker(glossary_terms)
+
+    def transform(doc):
+        if find_by_id(doc, 'glossary') is None:
+            log("Warning: Glossary section not found", level='warning')
+            return
+        with stage('glossary_links'):
+            links = link_glossary_terms(doc, linker)
+        emit('glossary_linked', terms=len(set(glossary_terms)), links=links)
+    return transform
+
+
+def embed_css(css_content):
+    """Transform: embed a stylesheet in a <style> element at the end of <head>."""
+    def transform(doc):
+        style = etree.SubElement(doc.find('head'), 'style')
+        style.text = css_content
+    return transform
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Parse the manuscript once into pandoc's JSON AST.
+
+Every writer (web HTML, print HTML, ODT, EPUB) reads book/manuscript.json
+with `pandoc -f json` instead of parsing manuscript.md again.  The AST is
+kept in the artifact cache, keyed by the manuscript and the pandoc version.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+from artifact_cache import ArtifactCache, artifact_key, atomic_output, tool_version
+from build_events import log, stage
+
+BASE_DIR = Path(__file__).parent.parent
+MANUSCRIPT = BASE_DIR / 'book' / 'manuscript.md'
+AST_FILE = BASE_DIR / 'book' / 'manuscript.json'
+
+
+def ensure_ast(manuscript=MANUSCRIPT, ast_file=AST_FILE, cache=None):
+    """Make ast_file hold the AST of manuscript, parsing only on a cache miss.
+
+    Returns True if pandoc had to run.  Raises RuntimeError if it failed and
+    FileNotFoundError if pandoc is not installed.
+    """
+    cache = cache or ArtifactCache()
+    key = artifact_key('pandoc-ast', tool_version('pandoc'), Path(manuscript))
+    if cache.restore(key, ast_file):
+        return False
+    # HTML and PDF builds may parse at the same time; each replaces the file whole
+    with atomic_output(ast_file) as tmp_file:
+        result = subprocess.run(
+            ['pandoc', str(manuscript), '-f', 'markdown', '-t', 'json', '-o', str(tmp_file)],
+            capture_output=True,
+            text=True,
+            cwd=str(BASE_DIR)
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+    cache.put(key, ast_file)
+    return True
+
+
+def main():
+    if not MANUSCRIPT.exists():
+        log(f"Error: {MANUSCRIPT} not found. Generate the book first.", level='error')
+        return 1
+    try:
+        with stage('pandoc_ast') as details:
+            details['cached'] = not ensure_ast()
+    except FileNotFoundError:
+        log("Error: pandoc not found.", level='error')
+        log("Install with: sudo apt-get install pandoc", level='error')
+        return 1
+    except RuntimeError as e:
+        log(f"Error parsing manuscript: {e}", level='error')
+        return 1
+    if details['cached']:
+        log(f"✓ Manuscript unchanged, AST restored from cache: {AST_FILE}")
+    else:
+        log(f"✓ Manuscript parsed: {AST_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
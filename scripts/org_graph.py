@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for the Terran Society organisational data.
+
+Reads tier, branch, institution, role, role_duty, process and every
+*_explain table with one set-based query per table and builds an indexed,
+in-memory graph that the chapter renderers in generate_book.py read from.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2.extras
+
+SCHEMA = 'scm_terran_society'
+
+# Table name -> primary key column, in load order
+GRAPH_TABLES = {
+    'tier': 'tier_id',
+    'tier_explain': 'explain_id',
+    'branch': 'branch_id',
+    'institution': 'institution_id',
+    'institution_explain': 'explain_id',
+    'role': 'role_id',
+    'role_duty': 'duty_id',
+    'role_explain': 'explain_id',
+    'process': 'process_id',
+}
+
+
+def _ordered(rows, id_col):
+    """Sort rows like ORDER BY sort_order (NULLs last), ties broken by id."""
+    return sorted(rows, key=lambda r: (r['sort_order'] is None, r['sort_order'] or 0, r[id_col]))
+
+
+class OrgGraph:
+    """In-memory index of the organisational tables.
+
+    Every row is a plain dict.  Parent rows carry their children as ordered
+    lists (``tier['explains']``, ``institution['roles']``,
+    ``institution['explains']``, ``role['duties']``, ``role['explains']``)
+    and children carry a reference back to their parent.
+    """
+
+    def __init__(self, tables):
+        self.tiers = _ordered(tables['tier'], 'tier_id')
+        self.branches = _ordered(tables['branch'], 'branch_id')
+        self.institutions = _ordered(tables['institution'], 'institution_id')
+        self.roles = _ordered(tables['role'], 'role_id')
+        self.processes = _ordered(tables['process'], 'process_id')
+
+        self.tiers_by_id = {t['tier_id']: t for t in self.tiers}
+        self.branches_by_id = {b['branch_id']: b for b in self.branches}
+        self.institutions_by_id = {i['institution_id']: i for i in self.institutions}
+        self.institutions_by_name = {}
+        for inst in self.institutions:
+            self.institutions_by_name.setdefault(inst['institution_name'], inst)
+        self.roles_by_id = {r['role_id']: r for r in self.roles}
+
+        for tier in self.tiers:
+            tier['explains'] = []
+        for inst in self.institutions:
+            inst['tier'] = self.tiers_by_id.get(inst['tier_id'])
+            inst['branch'] = self.branches_by_id.get(inst['branch_id'])
+            inst['roles'] = []
+            inst['explains'] = []
+        for role in self.roles:
+            role['institution'] = self.institutions_by_id.get(role['institution_id'])
+            role['duties'] = []
+            role['explains'] = []
+            if role['institution'] is not None:
+                role['institution']['roles'].append(role)
+
+        for explain in _ordered(tables['tier_explain'], 'explain_id'):
+            tier = self.tiers_by_id.get(explain['tier_id'])
+            if tier is not None:
+                tier['explains'].append(explain)
+        for explain in _ordered(tables['institution_explain'], 'explain_id'):
+            inst = self.institutions_by_id.get(explain['institution_id'])
+            if inst is not None:
+                inst['explains'].append(explain)
+        for duty in _ordered(tables['role_duty'], 'duty_id'):
+            role = self.roles_by_id.get(duty['role_id'])
+            if role is not None:
+                role['duties'].append(duty)
+        for explain in _ordered(tables['role_explain'], 'explain_id'):
+            role = self.roles_by_id.get(explain['role_id'])
+            if role is not None:
+                role['explains'].append(explain)
+
+    def institution(self, institution_name):
+        """Return the institution with this name, or None."""
+        return self.institutions_by_name.get(institution_name)
+
+    def institution_desc(self, institution_name):
+        """Return an institution's description, or None if it does not exist."""
+        inst = self.institution(institution_name)
+        return inst['institution_desc'] if inst else None
+
+    def roles_of(self, institution_name):
+        """Return the roles of an institution ordered by sort_order."""
+        inst = self.institution(institution_name)
+        return inst['roles'] if inst else []
+
+    def role(self, institution_name, role_name):
+        """Return a role by institution and role name, or None."""
+        for role in self.roles_of(institution_name):
+            if role['role_name'] == role_name:
+                return role
+        return None
+
+    def duties_of(self, institution_name, role_name):
+        """Return the duties of a role ordered by sort_order."""
+        role = self.role(institution_name, role_name)
+        return role['duties'] if role else []
+
+
+def load_table(conn, table):
+    """Load every row of one organisational table."""
+    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    cur.execute(f'SELECT * FROM {SCHEMA}.{table}')
+    rows = [dict(row) for row in cur.fetchall()]
+    cur.close()
+    return rows
+
+
+def load_org_graph(conn):
+    """Load the whole organisational graph with one query per table."""
+    tables = {table: load_table(conn, table) for table in GRAPH_TABLES}
+    return OrgGraph(tables)
+
+
+def load_org_graph_pooled(pool, jobs):
+    """Load the graph with the per-table queries spread over pooled connections."""
+    def load(table):
+        conn = pool.getconn()
+        try:
+            return table, load_table(conn, table)
+        finally:
+            pool.putconn(conn)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        tables = dict(executor.map(load, GRAPH_TABLES))
+    return OrgGraph(tables)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Chapter-parallel WeasyPrint rendering for generate_pdf.py --jobs N.
+
+Laying out the whole book in one WeasyPrint call is single-threaded and is
+the slowest build step.  This splits the print HTML at the chapter page
+breaks, lays out groups of chapters in separate processes and merges the
+part PDFs with pypdf into one book:
+
+- Page numbers: every part after the first continues the numbering with
+  `@page :first { counter-increment: page N }`.  N comes from the part page
+  counts of the previous build (book/.pdf_parts.json); a part whose guess
+  turns out wrong is rendered again with the right offset.
+- TOC: target-counter() cannot see other parts, so TOC entries pointing
+  into another part carry the page number in a data-page attribute.
+- Links: links into another part are rendered as placeholder URIs and
+  turned into named-destination links after the merge.
+- Bookmarks: rebuilt for the whole book from every page's headings.
+
+If the page counts have not settled after MAX_ROUNDS renders,
+PageNumbersUnsettled is raised instead of merging a book with wrong page
+numbers; generate_pdf.py then renders it on a single process.
+
+Page counts are assumed not to depend on the starting page number, which
+holds while book.css has no :left/:right page rules.
+"""
+import copy
+import hashlib
+import json
+import multiprocessing
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lxml import etree
+
+from artifact_cache import atomic_output
+from build_events import emit
+from html_postprocess import find_by_id, is_page_break, parse_html
+
+PARTS_PATH = Path(__file__).parent.parent / 'book' / '.pdf_parts.json'
+
+# Placeholder URI scheme for links whose target is in another part
+LINK_SCHEME = 'ts-book-anchor:'
+
+# Parts per worker process, so one long chapter does not leave workers idle
+PARTS_PER_JOB = 2
+
+# Render rounds before giving up on page numbers settling
+MAX_ROUNDS = 3
+
+# CSS pixels to PDF points
+PX_TO_PT = 0.75
+
+FIRST_PAGE_RULE = re.compile(r'@page\s*:first\s*\{(?:[^{}]|\{[^{}]*\})*\}')
+
+TOC_PAGE_CSS = '#TOC a[data-page]::after { content: attr(data-page); }'
+
+
+class PageNumbersUnsettled(RuntimeError):
+    """Part page counts still changed after MAX_ROUNDS renders."""
+
+
+def split_chapters(doc):
+    """Group the body's children into chapters, splitting before each page-break-before div."""
+    chapters = [[]]
+    for child in doc.find('body'):
+        if is_page_break(child, 'page-break-before: always;') and chapters[-1]:
+            chapters.append([])
+        chapters[-1].append(child)
+    return chapters
+
+
+def group_chapters(chapters, parts):
+    """Merge consecutive chapters into at most `parts` groups of similar size."""
+    sizes = [sum(len(etree.tostring(el)) for el in chapter) for chapter in chapters]
+    target = sum(sizes) / max(parts, 1)
+    groups = [[]]
+    filled = 0
+    for chapter, size in zip(chapters, sizes):
+        if groups[-1] and filled + size / 2 > target and len(groups) < parts:
+            groups.append([])
+            filled = 0
+        groups[-1].extend(chapter)
+        filled += size
+    return groups
+
+
+def part_stylesheet(css_file, index, offset):
+    """Extra CSS for one part: TOC page numbers and, after the first part, page numbering.
+
+    Later parts get book.css without its `@page :first` rule, which would
+    otherwise hide the header and footer on each part's first page.
+    """
+    css = [TOC_PAGE_CSS]
+    if index > 0:
+        css.append(FIRST_PAGE_RULE.sub('', Path(css_file).read_text(encoding='utf-8')))
+        css.append(f'@page :first {{ counter-increment: page {offset + 1}; }}')
+    return '\n'.join(css)
+
+
+def part_html(head, elements, css_file, index, offset):
+    """Serialise one part as a standalone document."""
+    head = copy.deepcopy(head)
+    if index > 0:
+        for link in head.findall('link'):
+            if link.get('href') == str(css_file):
+                head.remove(link)
+    style = etree.SubElement(head, 'style')
+    style.text = part_stylesheet(css_file, index, offset)
+    body = ''.join(etree.tostring(el, method='html', encoding='unicode') for el in elements)
+    return ('<!DOCTYPE html>\n<html>'
+            + etree.tostring(head, method='html', encoding='unicode')
+            + f'<body>{body}</body></html>')
+
+
+def _render_part(html, base_url, pdf_path):
+    """Lay out and write one part; return its pages' sizes, anchors and bookmarks."""
+    from weasyprint import HTML
+
+    document = HTML(string=html, base_url=base_url).render()
+    document.write_pdf(pdf_path)
+    return [
+        {
+            'height': page.height,
+            'anchors': {name: list(pos) for name, pos in page.anchors.items()},
+            'bookmarks': [[level, label, x, y, state] for level, label, (x, y), state in page.bookmarks],
+        }
+        for page in document.pages
+    ]
+
+
+def load_parts_state(path=PARTS_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_parts_state(state, path=PARTS_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+
+def merge_parts(part_pdfs, layouts, output_pdf, title=None):
+    """Concatenate the part PDFs, resolve cross-part links and rebuild the bookmarks."""
+    from pypdf import PdfWriter
+    from pypdf.generic import Fit, NameObject, TextStringObject
+
+    writer = PdfWriter()
+    for pdf in part_pdfs:
+        writer.append(str(pdf), import_outline=False)
+
+    for page in writer.pages:
+        for annot in page.get('/Annots', []):
+            annot = annot.get_object()
+            action = annot.get('/A')
+            uri = action.get_object().get('/URI') if action is not None else None
+            if uri is not None and str(uri).startswith(LINK_SCHEME):
+                del annot['/A']
+                annot[NameObject('/Dest')] = TextStringObject(str(uri)[len(LINK_SCHEME):])
+
+    # Nest each heading under the nearest preceding heading of a lower level
+    parents = []
+    pages = [page for layout in layouts for page in layout]
+    for page_number, page in enumerate(pages):
+        for level, label, x, y, state in page['bookmarks']:
+            while parents and parents[-1][0] >= level:
+                parents.pop()
+            item = writer.add_outline_item(
+                label, page_number,
+                parent=parents[-1][1] if parents else None,
+                fit=Fit.xyz(left=x * PX_TO_PT, top=(page['height'] - y) * PX_TO_PT, zoom=0),
+                is_open=state != 'closed',
+            )
+            parents.append((level, item))
+
+    if title:
+        writer.add_metadata({'/Title': title})
+    with atomic_output(output_pdf) as tmp_path, open(tmp_path, 'wb') as f:
+        writer.write(f)
+
+
+def render_pdf_parallel(html_file, output_pdf, css_file, jobs, parts_path=PARTS_PATH):
+    """Render html_file to output_pdf on `jobs` processes.  Returns the number of parts."""
+    import pypdf  # noqa: F401 - fail before any rendering if the merge step is unavailable
+
+    html_file = Path(html_file)
+    doc = parse_html(html_file.read_text(encoding='utf-8'))
+    head = doc.find('head')
+    title = head.findtext('title')
+    groups = group_chapters(split_chapters(doc), jobs * PARTS_PER_JOB)
+
+    # Which part each anchor lives in, then point cross-part links at placeholders
+    part_of = {}
+    for index, group in enumerate(groups):
+        for el in group:
+            for node in el.iter():
+                if isinstance(node.tag, str) and node.get('id'):
+                    part_of.setdefault(node.get('id'), index)
+    toc = find_by_id(doc, 'TOC')
+    toc_links = {}
+    for index, group in enumerate(groups):
+        for el in group:
+            for link in el.iter('a'):
+                href = link.get('href') or ''
+                target = part_of.get(href[1:]) if href.startswith('#') else None
+                if target is not None and target != index:
+                    link.set('href', LINK_SCHEME + href[1:])
+                    if toc is not None and toc in link.iterancestors():
+                        toc_links.setdefault(index, []).append(link)
+
+    keys = [hashlib.sha256(b''.join(etree.tostring(el) for el in group)).hexdigest() for group in groups]
+    previous = load_parts_state(parts_path)
+    counts = [previous.get('counts', {}).get(key) for key in keys]
+    anchor_pages = dict(previous.get('anchors', {}))
+    layouts = [None] * len(groups)
+    rendered_with = [None] * len(groups)
+
+    output_pdf = Path(output_pdf)
+    with tempfile.TemporaryDirectory(dir=output_pdf.parent) as tmp_dir, \
+            ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+        part_pdfs = [Path(tmp_dir) / f'part-{index:03d}.pdf' for index in range(len(groups))]
+        for round_number in range(MAX_ROUNDS + 1):
+            offsets = []
+            offset = 0
+            for count in counts:
+                offsets.append(offset)
+                offset += count or 0
+
+            futures = {}
+            for index, group in enumerate(groups):
+                for link in toc_links.get(index, []):
+                    link.set('data-page', str(anchor_pages.get(link.get('href')[len(LINK_SCHEME):], '')))
+                inputs = (offsets[index], tuple(link.get('data-page') for link in toc_links.get(index, [])))
+                if layouts[index] is not None and rendered_with[index] == inputs:
+                    continue
+                if round_number == MAX_ROUNDS:
+                    futures[index] = None
+                    continue
+                html = part_html(head, group, css_file, index, offsets[index])
+                futures[index] = (inputs, executor.submit(_render_part, html, str(html_file), str(part_pdfs[index])))
+            if not futures:
+                break
+            if round_number == MAX_ROUNDS:
+                raise PageNumbersUnsettled(
+                    f"page numbers of part(s) {', '.join(str(i) for i in futures)} "
+                    f"still changing after {MAX_ROUNDS} rounds")
+
+            for index, (inputs, future) in futures.items():
+                layouts[index] = future.result()
+                rendered_with[index] = inputs
+                counts[index] = len(layouts[index])
+                emit('pages_laid_out', part=index, pages=counts[index])
+
+            # Global page number of every anchor rendered so far
+            offset = 0
+            for index, layout in enumerate(layouts):
+                for page_index, page in enumerate(layout or []):
+                    for name in page['anchors']:
+                        anchor_pages[name] = offset + page_index + 1
+                offset += counts[index] or 0
+
+        merge_parts(part_pdfs, layouts, output_pdf, title)
+
+    save_parts_state({
+        'counts': {key: count for key, count in zip(keys, counts)},
+        'anchors': anchor_pages,
+    }, parts_path)
+    return len(groups)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Long-lived render worker for the web app's build buttons.
+
+Running `python3 generate_pdf.py` for every click pays for interpreter
+start-up, the psycopg2/lxml/WeasyPrint imports and WeasyPrint's font
+discovery before any real work.  This process does all of that once and
+then runs the build scripts' main() in-process for each job it receives
+on a Unix socket (book/.render_worker.sock).
+
+Protocol: the client sends one JSON line
+    {"script": "generate_pdf.py", "args": ["--jobs", "2"], "env": {...}}
+and receives one JSON line
+    {"returncode": 0, "stdout": "...", "stderr": "..."}
+Each job runs in a child forked from the warm worker, so jobs run side by
+side - up to --concurrency at once (TS_BOOK_BUILD_CONCURRENCY, the build
+queue's own limit) - and one job's environment, output capture and
+memory never leak into another.  Further clients wait in the listen
+backlog until a child exits.
+
+The worker replaces itself with a fresh process (keeping the listening
+socket, so no client is refused) after --max-jobs jobs, once its peak RSS
+passes --max-rss-mb, or when a script in this directory changed since it
+started; the job that notices changed code is run in a subprocess instead.
+It lets its running jobs finish first.
+
+Usage:
+    python3 scripts/render_worker.py [--socket PATH] [--concurrency N] [--max-jobs N] [--max-rss-mb MB]
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import traceback
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+SOCKET_PATH = SCRIPTS_DIR.parent / 'book' / '.render_worker.sock'
+
+# Build scripts a client may run, and so the modules worth importing up front
+SCRIPTS = ('generate_book.py', 'generate_html.py', 'generate_pdf.py')
+
+DEFAULT_MAX_JOBS = 50
+DEFAULT_CONCURRENCY = int(os.environ.get('TS_BOOK_BUILD_CONCURRENCY', 2))
+DEFAULT_MAX_RSS_MB = 1024
+
+
+def preload():
+    """Import the build scripts and warm WeasyPrint's font configuration."""
+    for script in SCRIPTS:
+        importlib.import_module(Path(script).stem)
+    try:
+        from weasyprint import HTML
+        HTML(string='<p>warm-up</p>').render()
+    except Exception as e:  # a missing WeasyPrint only matters to the PDF job
+        print(f"Note: WeasyPrint not preloaded ({e})")
+
+
+def sources_mtime():
+    """Latest modification time of the Python sources the worker has loaded."""
+    return max(path.stat().st_mtime for path in SCRIPTS_DIR.glob('*.py'))
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def job_environment(env):
+    """Set environment variables for one job and restore them afterwards."""
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update({name: str(value) for name, value in env.items()})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_in_process(script, args, env):
+    """Run a build script's main() here, capturing its output like subprocess.run."""
+    import build_events
+    from artifact_cache import tool_version
+
+    module = sys.modules[Path(script).stem]
+    stdout, stderr = io.StringIO(), io.StringIO()
+    # The pandoc binary may have been upgraded since the last job
+    tool_version.cache_clear()
+    build_events.reset()
+    with job_environment(env), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            result = module.main(args)
+            returncode = result or 0
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+    return {'returncode': returncode, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def run_in_subprocess(script, args, env):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / script), *args],
+        capture_output=True,
+        text=True,
+        cwd=str(SCRIPTS_DIR.parent),
+        env={**os.environ, **{name: str(value) for name, value in env.items()}},
+    )
+    return {'returncode': result.returncode, 'stdout': result.stdout, 'stderr': result.stderr}
+
+
+def handle(conn, stale):
+    """Read one job from conn, run it and send back the result."""
+    with conn, conn.makefile('rwb') as stream:
+        try:
+            job = json.loads(stream.readline())
+            script = job['script']
+            args = [str(arg) for arg in job.get('args', [])]
+            env = job.get('env') or {}
+        except (ValueError, KeyError, TypeError) as e:
+            reply = {'returncode': 2, 'stdout': '', 'stderr': f"Bad job: {e}"}
+        else:
+            if script not in SCRIPTS:
+                reply = {'returncode': 2, 'stdout': '', 'stderr': f"Unknown script: {script}"}
+            elif stale:
+                reply = run_in_subprocess(script, args, env)
+            else:
+                reply = run_in_process(script, args, env)
+        try:
+            stream.write(json.dumps(reply).encode('utf-8') + b'\n')
+            stream.flush()
+        except OSError:
+            pass  # the client gave up waiting
+
+
+def start_job(sock, conn, stale):
+    """Run the job on conn in a forked child and return the child's pid."""
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            sock.close()
+            handle(conn, stale)
+            status = 0
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+    conn.close()
+    return pid
+
+
+def reap(running, wait=False):
+    """Forget job children that have exited; with wait, block until one has."""
+    while running:
+        pid, _ = os.waitpid(-1, 0 if wait else os.WNOHANG)
+        if not pid:
+            return
+        running.discard(pid)
+        wait = False
+
+
+def listen(path):
+    """Bind the worker socket, replacing a stale socket file left by a dead worker."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+    else:
+        sock.close()
+        raise RuntimeError(f"a render worker is already listening on {path}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    os.chmod(path, 0o600)
+    sock.listen(16)
+    return sock
+
+
+def recycle(sock, args):
+    """Replace this process with a fresh worker that inherits the listening socket."""
+    sock.set_inheritable(True)
+    argv = [sys.executable, str(Path(__file__).resolve()),
+            '--socket', str(args.socket), '--concurrency', str(args.concurrency),
+            '--max-jobs', str(args.max_jobs),
+            '--max-rss-mb', str(args.max_rss_mb), '--fd', str(sock.fileno())]
+    sys.stdout.flush()
+    os.execv(sys.executable, argv)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the warm render worker for the web app.')
+    parser.add_argument('--socket', type=Path, default=SOCKET_PATH,
+                        help=f'Unix socket to listen on (default: {SOCKET_PATH})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar='N',
+                        help=f'jobs run at once (default: TS_BOOK_BUILD_CONCURRENCY or {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--max-jobs', type=int, default=DEFAULT_MAX_JOBS, metavar='N',
+                        help=f'recycle after N jobs (default: {DEFAULT_MAX_JOBS})')
+    parser.add_argument('--max-rss-mb', type=int, default=DEFAULT_MAX_RSS_MB, metavar='MB',
+                        help=f'recycle once peak memory passes MB megabytes (default: {DEFAULT_MAX_RSS_MB})')
+    parser.add_argument('--fd', type=int, help=argparse.SUPPRESS)  # socket inherited on recycle
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.fd is not None:
+        sock = socket.socket(fileno=args.fd)
+        sock.set_inheritable(False)
+    else:
+        try:
+            sock = listen(args.socket)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            return 1
+
+    preload()
+    started = sources_mtime()
+    print(f"Render worker {os.getpid()} ready on {args.socket}")
+
+    jobs = 0
+    running = set()
+    try:
+        while True:
+            reap(running, wait=len(running) >= max(args.concurrency, 1))
+            conn, _ = sock.accept()
+            stale = sources_mtime() != started
+            running.add(start_job(sock, conn, stale))
+            jobs += 1
+            if stale or jobs >= args.max_jobs or peak_rss_mb() > args.max_rss_mb:
+                reason = ('sources changed' if stale else
+                          f'{jobs} jobs' if jobs >= args.max_jobs else f'peak RSS {peak_rss_mb():.0f} MB')
+                print(f"Recycling render worker ({reason}) once {len(running)} running job(s) finish")
+                while running:
+                    reap(running, wait=True)
+                recycle(sock, args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            Path(args.socket).unlink()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Fill scm_terran_society with a synthetic organisation of a chosen size.
+
+For benchmarks and load tests (benchmark_pipeline.py, app/load_test.py):
+tiers, branches, institutions, roles, duties, explanations, processes,
+content blocks and glossary terms in volumes set by a named scale or by
+the individual options, reproducible from --seed.  Descriptions mention
+other role and institution names, as the real text does, so glossary
+linking has work to do.
+
+Run it against a database of its own, never the real one:
+
+    createdb db_terran_society_bench   # then apply the schema scripts
+    TS_BOOK_DATABASE=db_terran_society_bench python3 scripts/synthetic_data.py --scale large --replace
+
+--replace empties the organisational tables first (TRUNCATE ... CASCADE),
+and is refused on the default database unless --force is given.
+Columns the schema lacks (tier_code, the glossary table, ...) are skipped.
+"""
+import argparse
+import random
+import sys
+
+import psycopg2.extras
+
+from book_db import DEFAULT_DATABASE, PG_SCHEMA, get_connection, pg_database
+
+# Counts per scale; roles, duties and explains are per parent row
+SCALES = {
+    'small': dict(tiers=3, branches=5, institutions=40, roles=4, duties=3, explains=1,
+                  processes=10, content_blocks=100, glossary=100),
+    'medium': dict(tiers=4, branches=6, institutions=400, roles=6, duties=4, explains=2,
+                   processes=50, content_blocks=1000, glossary=1000),
+    'large': dict(tiers=5, branches=8, institutions=2000, roles=10, duties=5, explains=2,
+                  processes=200, content_blocks=10000, glossary=5000),
+    'xlarge': dict(tiers=6, branches=10, institutions=5000, roles=20, duties=6, explains=3,
+                   processes=500, content_blocks=50000, glossary=20000),
+}
+
+# Tables emptied by --replace, children first
+TABLES = ('entity_content', 'content_block', 'glossary', 'role_explain', 'role_duty', 'role',
+          'institution_explain', 'institution', 'tier_explain', 'branch', 'tier', 'process')
+
+TIER_NAMES = ('District', 'Regional', 'Continental', 'World', 'Orbital', 'Interplanetary')
+BRANCH_NAMES = ('Executive', 'Legislative', 'Judicial', 'Fair Witness', 'Military',
+                'Treasury', 'Environmental', 'Diplomatic', 'Educational', 'Medical')
+INSTITUTION_NOUNS = ('Council', 'Assembly', 'Office', 'Court', 'Tribunal', 'Bureau',
+                     'Commission', 'Panel', 'Registry', 'Authority', 'Board', 'Agency')
+INSTITUTION_TOPICS = ('Elders', 'Records', 'Water', 'Roads', 'Arbitration', 'Elections',
+                      'Health', 'Schools', 'Trade', 'Forests', 'Archives', 'Appeals',
+                      'Militia', 'Housing', 'Energy', 'Ports', 'Audits', 'Standards')
+ROLE_TITLES = ('Chair', 'Member', 'Clerk', 'Steward', 'Delegate', 'Registrar', 'Auditor',
+               'Speaker', 'Warden', 'Arbitrator', 'Secretary', 'Treasurer', 'Inspector',
+               'Advocate', 'Examiner', 'Liaison', 'Archivist', 'Sheriff', 'Elder', 'Judge')
+ROLE_RANKS = ('', 'Senior ', 'Deputy ', 'Chief ', 'Assistant ', 'Certified ')
+DUTY_HEADERS = ('Oversight', 'Reporting', 'Review', 'Record Keeping', 'Budget', 'Hearings',
+                'Elections', 'Training', 'Inspection', 'Mediation', 'Public Notice', 'Appeals')
+WORDS = ('the', 'council', 'each', 'person', 'shall', 'serve', 'and', 'review', 'a', 'term',
+         'with', 'public', 'record', 'for', 'every', 'decision', 'in', 'community', 'of',
+         'is', 'responsible', 'to', 'citizens', 'their', 'rights', 'under', 'open', 'process')
+
+
+def table_columns(cur, table):
+    cur.execute('SELECT column_name FROM information_schema.columns '
+                'WHERE table_schema = %s AND table_name = %s', (PG_SCHEMA, table))
+    return {row[0] for row in cur.fetchall()}
+
+
+class Generator:
+    """Seeded text and name source; the same seed and counts give the same data."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.names = []  # role and institution names, mentioned in later text
+
+    def sentence(self, low=8, high=20):
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high))]
+        if self.names and self.rng.random() < 0.6:
+            words.insert(self.rng.randrange(len(words)), self.rng.choice(self.names))
+        return ' '.join(words).capitalize() + '.'
+
+    def paragraph(self, sentences=(2, 5)):
+        return ' '.join(self.sentence() for _ in range(self.rng.randint(*sentences)))
+
+
+def insert(cur, table, rows, returning=None):
+    """Insert rows (dicts) with execute_values, dropping columns the table lacks.
+
+    Returns the `returning` column of each row, in order.
+    """
+    if not rows:
+        return []
+    columns = [c for c in rows[0] if c in table_columns(cur, table)]
+    sql = (f"INSERT INTO {PG_SCHEMA}.{table} ({', '.join(columns)}) VALUES %s"
+           + (f" RETURNING {returning}" if returning else ''))
+    result = psycopg2.extras.execute_values(cur, sql, [tuple(row[c] for c in columns) for row in rows],
+                                            page_size=1000, fetch=bool(returning))
+    return [row[0] for row in result] if returning else []
+
+
+def explains(gen, parent_col, parent_ids, per_parent):
+    return [{parent_col: parent_id, 'explain_header': f'Explanation {i + 1}',
+             'explain_desc': gen.paragraph(), 'sort_order': i + 1}
+            for parent_id in parent_ids for i in range(per_parent)]
+
+
+def generate(conn, counts, seed=1, replace=False):
+    """Fill the organisational tables; returns {table: rows inserted}."""
+    gen = Generator(seed)
+    cur = conn.cursor()
+    existing = {table for table in TABLES if table_columns(cur, table)}
+    cur.execute(f'SELECT count(*) FROM {PG_SCHEMA}.institution')
+    if cur.fetchone()[0] and not replace:
+        raise RuntimeError(f"{pg_database()} already has institutions; pass --replace to empty it first")
+    if replace:
+        cur.execute('TRUNCATE ' + ', '.join(f'{PG_SCHEMA}.{t}' for t in TABLES if t in existing)
+                    + ' RESTART IDENTITY CASCADE')
+    inserted = {}
+
+    tier_names = [TIER_NAMES[i] if i < len(TIER_NAMES) else f'Tier {i + 1}' for i in range(counts['tiers'])]
+    tier_ids = insert(cur, 'tier', [
+        {'tier_name': name, 'tier_code': f'T{i + 1}', 'sort_order': i + 1}
+        for i, name in enumerate(tier_names)], 'tier_id')
+    insert(cur, 'tier_explain', explains(gen, 'tier_id', tier_ids, counts['explains']))
+
+    branch_names = [BRANCH_NAMES[i] if i < len(BRANCH_NAMES) else f'Branch {i + 1}'
+                    for i in range(counts['branches'])]
+    branch_ids = insert(cur, 'branch', [
+        {'branch_name': name, 'branch_code': f'B{i + 1}', 'branch_header': f'{name} Branch',
+         'branch_desc': gen.paragraph(), 'sort_order': i + 1}
+        for i, name in enumerate(branch_names)], 'branch_id')
+
+    institutions = []
+    seen = set()
+    for i in range(counts['institutions']):
+        tier = gen.rng.randrange(len(tier_ids))
+        name = (f'{tier_names[tier]} {gen.rng.choice(INSTITUTION_NOUNS)} '
+                f'of {gen.rng.choice(INSTITUTION_TOPICS)}')
+        if name in seen:
+            name = f'{name} {i + 1}'
+        seen.add(name)
+        gen.names.append(name)
+        institutions.append({'institution_name': name, 'tier_id': tier_ids[tier],
+                             'branch_id': gen.rng.choice(branch_ids),
+                             'institution_header': f'The {name}',
+                             'institution_desc': gen.paragraph(), 'sort_order': i + 1})
+    institution_ids = insert(cur, 'institution', institutions, 'institution_id')
+    insert(cur, 'institution_explain', explains(gen, 'institution_id', institution_ids, counts['explains']))
+
+    roles = []
+    for institution_id in institution_ids:
+        # Role names only need to be unique within their institution
+        taken = set()
+        for i in range(counts['roles']):
+            name = f'{gen.rng.choice(ROLE_RANKS)}{gen.rng.choice(ROLE_TITLES)}'
+            if name in taken:
+                name = f'{name} {i + 1}'
+            taken.add(name)
+            gen.names.append(name)
+            roles.append({'role_name': name, 'institution_id': institution_id,
+                          'role_desc': gen.paragraph(), 'sort_order': i + 1})
+    role_ids = insert(cur, 'role', roles, 'role_id')
+    insert(cur, 'role_duty', [
+        {'role_id': role_id, 'duty_header': gen.rng.choice(DUTY_HEADERS),
+         'duty_desc': gen.paragraph((1, 3)), 'sort_order': i + 1}
+        for role_id in role_ids for i in range(counts['duties'])])
+    insert(cur, 'role_explain', explains(gen, 'role_id', role_ids, counts['explains']))
+
+    insert(cur, 'process', [
+        {'process_name': f'{gen.rng.choice(DUTY_HEADERS)} Process {i + 1}',
+         'process_header': f'Process {i + 1}', 'process_desc': gen.paragraph(), 'sort_order': i + 1}
+        for i in range(counts['processes'])])
+
+    if 'content_block' in existing:
+        block_ids = insert(cur, 'content_block', [
+            {'block_type': 'text', 'content_text': gen.paragraph(), 'sort_order': i + 1}
+            for i in range(counts['content_blocks'])], 'block_id')
+        insert(cur, 'entity_content', [
+            {'entity_type': 'institution', 'entity_id': gen.rng.choice(institution_ids),
+             'block_id': block_id, 'section_name': 'Overview', 'sort_order': i + 1}
+            for i, block_id in enumerate(block_ids)])
+
+    if 'glossary' in existing:
+        terms = sorted(set(gen.names))[:counts['glossary']]
+        insert(cur, 'glossary', [
+            {'term': term, 'short_def': gen.sentence(), 'long_def': gen.paragraph(),
+             'category': 'Institution' if term in seen else 'Role', 'sort_order': i + 1}
+            for i, term in enumerate(terms)])
+
+    # The manuscript needs its front matter
+    cur.execute(f'SELECT count(*) FROM {PG_SCHEMA}.book_metadata')
+    if not cur.fetchone()[0]:
+        cur.execute(f"INSERT INTO {PG_SCHEMA}.book_metadata (title, subtitle, dedication_text) "
+                    f"VALUES ('Synthetic Society', 'Benchmark Edition', 'For the benchmarks.')")
+
+    for table in TABLES:
+        if table in existing:
+            cur.execute(f'SELECT count(*) FROM {PG_SCHEMA}.{table}')
+            inserted[table] = cur.fetchone()[0]
+    conn.commit()
+    cur.close()
+    return inserted
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic organisational data.')
+    parser.add_argument('--scale', choices=SCALES, default='small',
+                        help='preset volumes (default: small)')
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, metavar='N',
+                            help=f'override the scale\'s {name.replace("_", " ")} count')
+    parser.add_argument('--seed', type=int, default=1, help='random seed (default: 1)')
+    parser.add_argument('--replace', action='store_true',
+                        help='empty the organisational tables first')
+    parser.add_argument('--force', action='store_true',
+                        help=f'allow --replace on {DEFAULT_DATABASE}')
+    return parser.parse_args(argv)
+
+
+def counts_for(args):
+    counts = dict(SCALES[args.scale])
+    counts.update({name: getattr(args, name) for name in counts if getattr(args, name) is not None})
+    return counts
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = counts_for(args)
+    if args.replace and pg_database() == DEFAULT_DATABASE and not args.force:
+        print(f"Error: refusing to replace the data in {DEFAULT_DATABASE}; "
+              f"set TS_BOOK_DATABASE to a scratch database (or pass --force)")
+        return 1
+    conn = get_connection()
+    try:
+        inserted = generate(conn, counts, args.seed, args.replace)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"Filled {pg_database()} ({args.scale}, seed {args.seed}):")
+    for table, count in inserted.items():
+        print(f"  {table:<20} {count:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())